@@ -425,7 +425,7 @@ class StreamDefinition(QtWidgets.QWidget):
             else:
                 values = self.stream.mezcla.fraccion
 
-        if values:
+        if values is not None:
             for value, widget in zip(values, self.xi):
                 widget.setValue(value.config())
 
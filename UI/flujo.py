@@ -26,7 +26,6 @@ from functools import partial
 from datetime import datetime
 import tempfile
 import os
-import json
 import subprocess
 from copy import deepcopy
 from xml.dom import minidom
@@ -35,7 +34,9 @@ from PyQt5 import QtCore, QtGui, QtSvg, QtWidgets
 
 from lib import unidades
 from lib.project import Project
+from lib import projectFile
 from lib.thread import WaitforClick
+from lib import config
 from lib.config import Preferences
 from lib.corriente import Corriente
 from UI import texteditor, UI_corriente
@@ -63,7 +64,7 @@ class SelectStreamProject(QtWidgets.QDialog):
             "pychemqt", "Select pychemqt project file")
         patrones = []
         patrones.append(QtWidgets.QApplication.translate(
-            "pychemqt", "pychemqt project file") + " (*.pcq)")
+            "pychemqt", "pychemqt project file") + " (*.pcq *.pcqz)")
         patron = ";;".join(patrones)
         self.filename = PathConfig(label + ":", msg=msg, patron=patron)
         self.filename.valueChanged.connect(self.changeproject)
@@ -91,8 +92,7 @@ class SelectStreamProject(QtWidgets.QDialog):
         self.status.setText(st)
         QtWidgets.QApplication.processEvents()
         try:
-            with open(path, "r") as file:
-                self.project = json.load(file)
+            self.project = projectFile.load(path)
         except Exception as e:
             print(e)
             self.status.setText(QtGui.QApplication.translate(
@@ -708,10 +708,10 @@ class EquipmentItem(QtSvg.QGraphicsSvgItem, GraphicsEntity):
                     punto = self.input
                     self.scene().down = self
                     x = self.up_used
-                self.scene().Pos.append(self.mapToScene(punto[x].rect().center()))
                 self.scene().points.append(punto[x])
+                self.scene().addClick(self.mapToScene(punto[x].rect().center()))
             else:
-                self.scene().Pos.append(event.pos())
+                self.scene().addClick(event.pos())
 
     def mouseMoveEvent(self, event=None):
         if event:
@@ -937,16 +937,36 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
     points = []
     addObj = False
     addType = ""
-    project = Project()
+    _project = Project()
     objects = {"txt": [], "square": [], "ellipse": [], "stream": {}, "in": {}, "out": {}, "equip": {}}
 
     def __init__(self, parent=None):
         super(GraphicsScene, self).__init__(parent)
+        self.project = self._project
+
+    @property
+    def project(self):
+        return self._project
+
+    @project.setter
+    def project(self, project):
+        """Attach the project to scene, calculating the independent equipments
+        in the process pool configured in preferences and keeping the GUI
+        responsive while wait the results"""
+        project.idle = QtWidgets.QApplication.processEvents
+        project.workers = config.Preferences.getint(
+            "General", "Workers", fallback=max((os.cpu_count() or 1)-1, 0))
+        self._project = project
 
     def mousePressEvent(self, event):
         QtWidgets.QGraphicsScene.mousePressEvent(self, event)
         if self.addObj and self.addType != "stream":
-            self.Pos.append(event.scenePos())
+            self.addClick(event.scenePos())
+
+    def addClick(self, pos):
+        """Save the click position while adding a object"""
+        self.Pos.append(pos)
+        self.clickCollector.check(len(self.Pos))
 
     def addActions(self, menu, pos=None):
         menu.addAction(QtWidgets.QApplication.translate("pychemqt", "Redraw"), self.update)
@@ -20,7 +20,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 from configparser import ConfigParser
 from functools import partial
-import json
 import os
 import platform
 import subprocess
@@ -36,12 +35,13 @@ from UI.widgets import createAction, ClickableLabel
 from lib import config
 from lib.config import conf_dir, setMainWindowConfig, IMAGE_PATH, Preferences
 from lib.project import Project
+from lib import projectFile
 from lib.EoS import K, H
 import equipment
 from tools import (UI_confComponents, UI_Preferences, UI_confTransport,
                    UI_confThermo, UI_confUnits, UI_confResolution, UI_databank,
                    UI_Tables, UI_unitConverter, UI_psychrometry, costIndex,
-                   doi, dependences)
+                   doi, dependences, UI_profiling)
 
 __version__ = "0.1.0"
 
@@ -459,6 +459,12 @@ class UI_pychemqt(QtWidgets.QMainWindow):
             tip=QtWidgets.QApplication.translate(
                 "pychemqt", "Show External Programs Status"),
             parent=self)
+        profilingAction = createAction(
+            QtWidgets.QApplication.translate("pychemqt", "Profiling"),
+            slot=self.profiling,
+            tip=QtWidgets.QApplication.translate(
+                "pychemqt", "Show the calculation profiling report"),
+            parent=self)
         saveAsImage = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Save PFD as image"),
             slot=self.savePFDImage,
@@ -981,6 +987,7 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         self.menuHerramientas.addAction(self.menuCharts.menuAction())
         self.menuHerramientas.addSeparator()
         self.menuHerramientas.addAction(externalProgramAction)
+        self.menuHerramientas.addAction(profilingAction)
         self.menubar.addAction(self.menuHerramientas.menuAction())
 
         self.menuVentana = QtWidgets.QMenu(
@@ -1339,46 +1346,45 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         if not self.filename[indice]:
             self.fileSaveAs()
         else:
-            with open(self.filename[indice], "w") as file:
-                data = {}
-                self.getScene(indice).project.writeToJSON(data)
-
-                PFD = {}
-                win = self.centralwidget.currentWidget().subWindowList()[0]
-                PFD["x"] = win.pos().x()
-                PFD["y"] = win.pos().y()
-                PFD["height"] = win.size().height()
-                PFD["width"] = win.size().width()
-                self.currentScene.writeToJSON(PFD)
-                data["PFD"] = PFD
-
-                other = {}
-                ventanas = self.centralwidget.currentWidget().subWindowList()
-                for ind, win in enumerate(ventanas[1:]):
-                    ventana = {}
-                    ventana["class"] = win.widget().__class__.__name__
-                    ventana["x"] = win.pos().x()
-                    ventana["y"] = win.pos().y()
-                    ventana["height"] = win.size().height()
-                    ventana["width"] = win.size().width()
-
-                    widget = {}
-                    win.widget().writeToJSON(widget)
-                    ventana["window"] = widget
-                    other[ind] = ventana
-
-                    # Add dependences from other windows
-                    if widget.get("external_dependences", None):
-                        data["external_dependences"].add(
-                            widget["external_dependences"])
-
-                data["other"] = other
-
-                # python set are not serializable so convert to list
-                data["external_dependences"] = list(
-                    data["external_dependences"])
-
-                json.dump(data, file, indent=4)
+            data = {}
+            self.getScene(indice).project.writeToJSON(data)
+
+            PFD = {}
+            win = self.centralwidget.currentWidget().subWindowList()[0]
+            PFD["x"] = win.pos().x()
+            PFD["y"] = win.pos().y()
+            PFD["height"] = win.size().height()
+            PFD["width"] = win.size().width()
+            self.currentScene.writeToJSON(PFD)
+            data["PFD"] = PFD
+
+            other = {}
+            ventanas = self.centralwidget.currentWidget().subWindowList()
+            for ind, win in enumerate(ventanas[1:]):
+                ventana = {}
+                ventana["class"] = win.widget().__class__.__name__
+                ventana["x"] = win.pos().x()
+                ventana["y"] = win.pos().y()
+                ventana["height"] = win.size().height()
+                ventana["width"] = win.size().width()
+
+                widget = {}
+                win.widget().writeToJSON(widget)
+                ventana["window"] = widget
+                other[ind] = ventana
+
+                # Add dependences from other windows
+                if widget.get("external_dependences", None):
+                    data["external_dependences"].add(
+                        widget["external_dependences"])
+
+            data["other"] = other
+
+            # python set are not serializable so convert to list
+            data["external_dependences"] = list(
+                data["external_dependences"])
+
+            projectFile.save(data, self.filename[indice])
 
             self.dirty[self.idTab] = False
             self.updateStatus(
@@ -1394,17 +1400,30 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         fname = QtWidgets.QFileDialog.getSaveFileName(
             self,
             QtWidgets.QApplication.translate("pychemqt", "Save project"),
-            dir, "pychemqt project file (*.pcq)")
-        if fname:
+            dir, ";;".join(self.projectFilters()))
+        if fname[0]:
             name = fname[0]
-            if name.split(".")[-1] != "pcq":
-                name += ".pcq"
+            if name.split(".")[-1] not in projectFile.EXTENSIONS:
+                if "pcqz" in fname[1]:
+                    name += ".pcqz"
+                else:
+                    name += ".pcq"
             self.addRecentFile(name)
             self.filename[indice] = name
             self.fileSave(indice)
             self.centralwidget.setTabText(
                 indice, os.path.splitext(os.path.basename(name))[0])
 
+    @staticmethod
+    def projectFilters():
+        """File dialog filters for supported project file formats"""
+        return [
+            QtWidgets.QApplication.translate(
+                "pychemqt", "pychemqt project file") + " (*.pcq)",
+            QtWidgets.QApplication.translate(
+                "pychemqt", "pychemqt compressed project file") +
+            " (*.pcqz)"]
+
     def fileSaveAll(self):
         for tab in range(self.centralwidget.count()):
             if self.dirty[tab]:
@@ -1420,7 +1439,8 @@ class UI_pychemqt(QtWidgets.QMainWindow):
                 self,
                 QtWidgets.QApplication.translate("pychemqt", "Open project"),
                 dir, QtWidgets.QApplication.translate(
-                    "pychemqt", "pychemqt project file") + " (*.pcq)")[0]
+                    "pychemqt", "pychemqt project file") +
+                " (*.pcq *.pcqz)")[0]
         if fname:
             try:
                 self.loadFile(fname)
@@ -1448,8 +1468,7 @@ class UI_pychemqt(QtWidgets.QMainWindow):
                 return
 
         if fname:
-            with open(fname, "r") as file:
-                data = json.load(file)
+            data = projectFile.load(fname)
 
             # Check availability of optional dependences necessary for the file
             if "external_dependences" in data:
@@ -1638,7 +1657,7 @@ class UI_pychemqt(QtWidgets.QMainWindow):
             self.systemtray.show()
         else:
             self.systemtray.hide()
-        config.Preferences = Preferences
+        config.setPreferences(Preferences)
 
     def activeControl(self, boolean):
         self.fileSaveAsAction.setEnabled(boolean)
@@ -1764,6 +1783,10 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         dialog = dependences.ShowDependences()
         dialog.exec_()
 
+    def profiling(self):
+        dialog = UI_profiling.Profiling(self)
+        dialog.exec_()
+
     def conversor_unidades(self):
         Conversor = UI_unitConverter.UI_unitConverter()
         self.updateStatus(QtWidgets.QApplication.translate(
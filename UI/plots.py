@@ -61,7 +61,7 @@ class Binary_distillation(QtWidgets.QDialog):
         self.Comp1.currentIndexChanged.connect(self.calculo)
         self.Comp2.currentIndexChanged.connect(self.calculo)
 
-        if x and y:
+        if x is not None and y is not None:
             self.rellenar(x, y)
         else:
             self.calculo()
@@ -69,7 +69,7 @@ class Binary_distillation(QtWidgets.QDialog):
     def rellenar(self, x, y):
         self.x=x
         self.y=y
-        self.plot.axes2D.clear()
+        self.plot.ax.clear()
         self.plot.data([0, 1], [0, 1], x, y, 'ro')
 
         self.tabla.setData(transpose([x, y]))
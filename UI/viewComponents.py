@@ -861,6 +861,20 @@ class View_Component(QtWidgets.QDialog):
                 os.path.join(IMAGE_PATH, "button", "arrow-right-double.png"))))
             self.btnLast.clicked.connect(partial(self.change, "last"))
             lytTitle.addWidget(self.btnLast)
+            lytTitle.addItem(QtWidgets.QSpacerItem(
+                10, 10, QtWidgets.QSizePolicy.Expanding,
+                QtWidgets.QSizePolicy.Fixed))
+            self.searchText = QtWidgets.QLineEdit(self)
+            self.searchText.setPlaceholderText(
+                QtWidgets.QApplication.translate("pychemqt", "Search"))
+            self.searchText.setToolTip(QtWidgets.QApplication.translate(
+                "pychemqt", "Search by name, formula, synonym or CAS number, "
+                "press Enter again to go to the next coincidence"))
+            self.searchText.returnPressed.connect(self.search)
+            lytTitle.addWidget(self.searchText)
+            self.searchResults = []
+            self.searchIndex = 0
+            self.searchLast = ""
         lyt.addItem(lytTitle)
 
         tabWidget = QtWidgets.QTabWidget()
@@ -1627,6 +1641,19 @@ class View_Component(QtWidgets.QDialog):
             self.fill(index)
         self.index = index
 
+    def search(self):
+        """Go to the compound with the best match of search text, next
+        coincidences in the successive searchs of the same text"""
+        text = self.searchText.text()
+        if text != self.searchLast:
+            self.searchLast = text
+            self.searchResults = sql.search(text)
+            self.searchIndex = 0
+        elif self.searchResults:
+            self.searchIndex = (self.searchIndex+1) % len(self.searchResults)
+        if self.searchResults:
+            self.change(self.searchResults[self.searchIndex])
+
     def setDirty(self):
         self.dirty = True
 
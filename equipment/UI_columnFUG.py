@@ -34,6 +34,7 @@ from lib.unidades import Pressure, Volume, Length, Power, Density, Currency
 from tools.costIndex import CostData
 from equipment.parents import UI_equip
 from equipment.distillation import ColumnFUG
+from UI.plots import Binary_distillation
 from UI.widgets import Entrada_con_unidades
 
 
@@ -138,6 +139,10 @@ class UI_equipment(UI_equip):
             QtWidgets.QApplication.translate("pychemqt", "McCabe-Thiele"))
         self.buttonMcCabe.clicked.connect(self.mcCabe)
         lyt.addWidget(self.buttonMcCabe, 10, 0)
+        self.buttonXY = QtWidgets.QPushButton(
+            QtWidgets.QApplication.translate("pychemqt", "x-y Diagram"))
+        self.buttonXY.clicked.connect(self.diagramaXY)
+        lyt.addWidget(self.buttonXY, 10, 1)
 
         groupBox_Calculo = QtWidgets.QGroupBox(
             QtWidgets.QApplication.translate("pychemqt", "Results"))
@@ -330,7 +335,30 @@ class UI_equipment(UI_equip):
             self.setEquipment(equipment)
 
     def mcCabe(self):
-        self.Equipment.McCabe()
+        try:
+            self.Equipment.McCabe()
+        except ValueError as e:
+            self.mcCabeError(e)
+
+    def diagramaXY(self):
+        """Show the equilibrium data of key components calculated for the
+        McCabe-Thiele diagram"""
+        try:
+            data = self.Equipment.mcCabeData()
+        except ValueError as e:
+            self.mcCabeError(e)
+            return
+        componentes = self.Equipment.kwargs["entrada"].componente
+        keys = (self.Equipment.kwargs["LK"], self.Equipment.kwargs["HK"])
+        dialog = Binary_distillation(
+            [componentes[i].id for i in keys],
+            [componentes[i].name for i in keys],
+            x=data["x"], y=data["y"], parent=self)
+        dialog.exec_()
+
+    def mcCabeError(self, error):
+        title = QtWidgets.QApplication.translate("pychemqt", "Error")
+        QtWidgets.QMessageBox.warning(self, title, str(error))
 
     def mostrarSubclasificacion(self, ind):
         self.groupBox_Pisos.setVisible(not ind)
@@ -339,6 +367,7 @@ class UI_equipment(UI_equip):
 
     def rellenar(self):
         self.buttonMcCabe.setEnabled(self.Equipment.statusMcCabe)
+        self.buttonXY.setEnabled(self.Equipment.statusMcCabe)
         UI_equip.rellenar(self)
 
 
@@ -168,6 +168,21 @@ class UI_equipment(UI_equip):
         self.orientacion.currentIndexChanged.connect(
             partial(self.changeParams, "orientacion"))
         lyt.addWidget(self.orientacion, 3, 2)
+        lyt.addWidget(QtWidgets.QLabel(
+            QtWidgets.QApplication.translate("pychemqt", "Method")), 1, 4)
+        self.metodo = QtWidgets.QComboBox()
+        for txt in self.Equipment.TEXT_METODO:
+            self.metodo.addItem(txt)
+        self.metodo.currentIndexChanged.connect(
+            partial(self.changeParams, "metodo"))
+        lyt.addWidget(self.metodo, 1, 5)
+        lyt.addWidget(QtWidgets.QLabel(
+            QtWidgets.QApplication.translate("pychemqt", "Segments")), 2, 4)
+        self.segments = Entrada_con_unidades(
+            int, width=60, spinbox=True, step=1, min=1)
+        self.segments.valueChanged.connect(
+            partial(self.changeParams, "segments"))
+        lyt.addWidget(self.segments, 2, 5)
 
         lyt.addItem(QtWidgets.QSpacerItem(
             10, 10, QtWidgets.QSizePolicy.Fixed,
@@ -23,18 +23,30 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 # - Flash
 # - Tower
 # - ColumnFUG
+# - ColumnMESH
+# - McCabe-Thiele diagram and batch distillation
 ###############################################################################
 
 
 import os
 
+from numpy import abs as npabs, exp as npexp, log as nplog
+from numpy import (arange, array, clip, concatenate, errstate, eye, indices,
+                   interp, maximum, where, zeros)
 from scipy import log, exp, pi, log10, linspace
-from scipy.optimize import fsolve
+from scipy.constants import R
+from scipy.integrate import solve_ivp
+from scipy.linalg import solve_banded
+from scipy.optimize import brentq, fsolve
 from PyQt5.QtWidgets import QApplication
 
 from lib import unidades
 from lib.corriente import Corriente
+from lib.EoS.cubic import Cubic
+from lib.EoS.Grayson_Streed import Grayson_Streed
+from lib.mezcla import Mezcla
 from lib.plot import Plot
+from lib.thread import checkCancel
 from equipment.parents import equipment
 from equipment.heatExchanger import Heat_Exchanger
 
@@ -351,6 +363,104 @@ class Flash(equipment):
         self.salida = [None]
 
 
+def mcCabeThiele(A, B, P, xF, xD, xB, R=0, R_Rmin=0, n=100, maxStage=500):
+    """McCabe-Thiele method for binary distillation with ideal equilibrium
+    and saturated liquid feed
+
+    Parameters
+    ----------
+    A : Componente
+        Light component
+    B : Componente
+        Heavy component
+    P : float
+        Pressure, [Pa]
+    xF : float
+        Molar fraction of light component in feed, [-]
+    xD : float
+        Molar fraction of light component in distillate, [-]
+    xB : float
+        Molar fraction of light component in bottom, [-]
+    R : float
+        Reflux ratio
+    R_Rmin : float
+        Reflux ratio respect to the minimum, used if R isn't defined
+    n : int
+        Number of points of equilibrium curve
+    maxStage : int
+        Maximum number of stages
+
+    Returns
+    -------
+    data : dict
+        Dict with the diagram data:
+
+            * T, x, y: Arrays with the equilibrium curve, temperature and
+              molar fraction of light component in liquid and vapor phases
+            * xB, xF, xD: Molar fraction of light component in products
+              and feed
+            * yF: Vapor molar fraction in equilibrium with feed
+            * zF: Intersection of operating lines
+            * Rmin, R, S: Minimum reflux ratio, reflux ratio and reboil ratio
+            * xStage, yStage: Arrays with the liquid and vapor composition
+              leaving the stages, starting from the distillate
+            * nTray: Number of trays, without reboiler
+
+    Notes
+    -----
+    The equilibrium curve is calculated in a single sweep of temperature
+    between the boiling points of components, the stages are stepped
+    interpolating in that curve, so only the boiling temperatures need an
+    iterative solution. The x, y arrays can be used directly in
+    :class:`UI.plots.Binary_distillation`.
+
+    Examples
+    --------
+    Benzene-toluene separation at atmospheric pressure
+
+    >>> from lib.compuestos import Componente
+    >>> data = mcCabeThiele(Componente(40), Componente(41), 101325, 0.5,
+    ...                     0.95, 0.05, R_Rmin=1.5)
+    >>> "%0.3f %0.3f %i" % (data["Rmin"], data["R"], data["nTray"])
+    '1.104 1.656 11'
+    """
+    P = float(P)
+    TA = fsolve(lambda T: A.Pv(T)-P, A.Tb)[0]
+    TB = fsolve(lambda T: B.Pv(T)-P, B.Tb)[0]
+    T = linspace(TA, TB, n)
+    PA = array([A.Pv(t) for t in T])
+    PB = array([B.Pv(t) for t in T])
+    x = clip((P-PB)/(PA-PB), 0, 1)
+    y = x*PA/P
+
+    # Arrays with increasing molar fractions for interpolation
+    xi = x[::-1]
+    yi = y[::-1]
+    yF = interp(xF, xi, yi)
+    Eslope = (xD-yF)/(xD-xF)
+    Rmin = Eslope/(1-Eslope)
+    if not R:
+        R = R_Rmin*Rmin
+    if R <= Rmin:
+        raise ValueError("Reflux ratio lower than minimum")
+
+    zF = xD-R*(xD-xF)/(R+1)
+    Sslope = (zF-xB)/(xF-xB)
+    S = 1/(Sslope-1)
+
+    xStage = [xD]
+    yStage = [xD]
+    while xStage[-1] > xB and len(xStage) <= maxStage:
+        xP = interp(yStage[-1], yi, xi)
+        xStage.append(xP)
+        yStage.append(min(xD-R/(R+1)*(xD-xP), xB+(S+1)/S*(xP-xB)))
+
+    return {"T": T, "x": x, "y": y, "xB": xB, "xF": xF, "xD": xD, "yF": yF,
+            "zF": zF, "Rmin": Rmin, "R": R, "S": S,
+            "xStage": array(xStage), "yStage": array(yStage),
+            "nTray": len(xStage)-2}
+
+
 class Tower(equipment):
     """Clase general que define las propiedades comunes de las unidades de destilación"""
     title="Torre de destilación"
@@ -400,50 +510,43 @@ class Tower(equipment):
         return unidades.Volume(pi/4*self.kwargs["Di"]**2*self.kwargs["h"])
 
 
-    def McCabe(self, LK=0, HK=1):
-        A = self.kwargs["entrada"].componente[LK].nombre
-        B = self.kwargs["entrada"].componente[HK].nombre
-        P = self.kwargs["entrada"].P
-        Psat = dict()
-        Psat[A] = self.kwargs["entrada"].componente[LK].Pv
-        Psat[B] = self.kwargs["entrada"].componente[HK].Pv
-        Tsat = dict()
-        for i, s in enumerate(Psat.keys()):
-            Tsat[s] = lambda P, s=s: fsolve(lambda T: Psat[s](T)-P,self.kwargs["entrada"].componente[i].Tb)[0]
-
-        T = linspace(Tsat[A](P),Tsat[B](P))
-
-        x = lambda T: (P-Psat[B](T))/(Psat[A](T)-Psat[B](T))
-        y = lambda T: x(T)*Psat[A](T)/P
-
-        xB = 1-self.kwargs["HKsplit"]
-        xF = self.kwargs["entrada"].fraccion[LK]
-        xD = self.kwargs["LKsplit"]
-        Tbub = fsolve(lambda T:x(T) - xF,T[25])
-        yF = y(Tbub)
-
-        if self.kwargs["R"]:
-            R=self.kwargs["R"]
-        else:
-            Eslope = (xD-yF)/(xD-xF)
-            Rmin = Eslope/(1-Eslope)
-            R=self.kwargs["R_Rmin"]*Rmin
+    def mcCabeData(self, LK=0, HK=1):
+        """Return the McCabe-Thiele data of the key components calculated
+        with :func:`mcCabeThiele`, the data are saved in mcCabe attribute and
+        reused until the column is calculated again, for the diagram and the
+        :class:`UI.plots.Binary_distillation` dialog"""
+        data = getattr(self, "mcCabe", None)
+        if data is None or (data["LK"], data["HK"]) != (LK, HK):
+            entrada = self.kwargs["entrada"]
+            data = mcCabeThiele(
+                entrada.componente[LK], entrada.componente[HK], entrada.P,
+                entrada.fraccion[LK], self.kwargs["LKsplit"],
+                1-self.kwargs["HKsplit"], self.kwargs["R"],
+                self.kwargs["R_Rmin"])
+            data["LK"] = LK
+            data["HK"] = HK
+            self.mcCabe = data
+        return data
 
-        zF = xD-R*(xD-xF)/(R+1)
-        Sslope = (zF-xB)/(xF-xB)
-        S = 1/(Sslope-1)
-        xP = xD
-        yP = xD
+    def McCabe(self, LK=0, HK=1):
+        """Show the McCabe-Thiele diagram of the key components"""
+        data = self.mcCabeData(LK, HK)
+        entrada = self.kwargs["entrada"]
+        A = entrada.componente[LK]
+        B = entrada.componente[HK]
+        P = entrada.P
+        xB, xF, xD = data["xB"], data["xF"], data["xD"]
+        yF, zF, S = data["yF"], data["zF"], data["S"]
 
         dialog=Plot()
         dialog.plot.ax.grid(True)
-        dialog.plot.ax.set_title(QApplication.translate("pychemqt", "x-y Diagram for") + "{:s}/{:s} P={:s}".format(A,B,P.str), size="x-large")
-        dialog.plot.ax.set_xlabel(QApplication.translate("pychemqt", "Liquid Mole Fraction")+" {:s}".format(A), size="x-large")
-        dialog.plot.ax.set_ylabel(QApplication.translate("pychemqt", "Vapor Mole Fraction")+" {:s}".format(B), size="x-large")
+        dialog.plot.ax.set_title(QApplication.translate("pychemqt", "x-y Diagram for") + "{:s}/{:s} P={:s}".format(A.name, B.name, P.str), size="x-large")
+        dialog.plot.ax.set_xlabel(QApplication.translate("pychemqt", "Liquid Mole Fraction")+" {:s}".format(A.name), size="x-large")
+        dialog.plot.ax.set_ylabel(QApplication.translate("pychemqt", "Vapor Mole Fraction")+" {:s}".format(A.name), size="x-large")
         dialog.plot.ax.set_xticks(linspace(0,1.0,21))
         dialog.plot.ax.set_yticks(linspace(0.05,1.0,20))
         dialog.addData([0,1],[0,1],'b--')
-        dialog.addData(list(map(x,T)),list(map(y,T)))
+        dialog.addData(data["x"], data["y"])
         dialog.addData([xB,xB],[0,xB],'r--')
         dialog.addData(xB,xB,'ro',ms=5)
         dialog.addText(xB+0.005,0.02,'xB = {:0.3f}'.format(float(xB)))
@@ -458,31 +561,21 @@ class Tower(equipment):
         dialog.addData([xD,xF],[xD,zF],'r-')
         dialog.addData([xB,xF],[xB,xB + (S+1)*(xF-xB)/S],'r-')
 
-        nTray = 0
-        while xP > xB:
-            nTray += 1
-            Tdew = fsolve(lambda T:y(T) - yP, T[25])
-            xQ = xP
-            xP = x(Tdew)
-            dialog.addData([xQ,xP],[yP,yP],'r')
-            dialog.addData(xP,yP,'ro',ms=5)
-            dialog.addText(xP-0.03,yP,nTray)
+        # Staircase of stages, each stage with a horizontal step to the
+        # equilibrium curve and a vertical step to the operating line
+        xs, ys = data["xStage"], data["yStage"]
+        dialog.addData(xs.repeat(2)[1:], ys.repeat(2)[:-1], 'r')
+        dialog.addData(xs[1:], ys[:-1], 'ro', ms=5)
+        for i, (xP, yP) in enumerate(zip(xs[1:], ys[:-1])):
+            dialog.addText(xP-0.03, yP, i+1)
 
-            yQ = yP
-            yP = min([xD - (R/(R+1))*(xD-xP),xB + ((S+1)/S)*(xP-xB)])
-            dialog.addData([xP,xP],[yQ,yP],'r')
-
-        nTray -= 1
-
-        dialog.addText(0.1,0.90,'Rmin = {:0.2f}'.format(float(Rmin)), size="large")
-        dialog.addText(0.1,0.85,'R = {:0.2f}'.format(float(R)), size="large")
+        dialog.addText(0.1,0.90,'Rmin = {:0.2f}'.format(float(data["Rmin"])), size="large")
+        dialog.addText(0.1,0.85,'R = {:0.2f}'.format(float(data["R"])), size="large")
         dialog.addText(0.1,0.80,'S = {:0.2f}'.format(float(S)), size="large")
-        dialog.addText(0.1,0.75,'nTrays = {:d}'.format(int(nTray)), size="large")
-
+        dialog.addText(0.1,0.75,'nTrays = {:d}'.format(int(data["nTray"])), size="large")
 
         dialog.exec_()
 
-
     def coste(self):
         self.tipo_pisos=kwargs.get("tipo_pisos", 0)
         self.material_columna=kwargs.get("material_columna", 0)
@@ -551,6 +644,11 @@ class ColumnFUG(Tower):
         Pd: Presión de diseño de la columna, si no se especifica se usa la presión de la entrada
         DeltaP: Caida de presión en la columna
 
+    La iteración de Fenske usa los valores K de los productos calculados
+    directamente con el modelo de equilibrio de la entrada, las corrientes
+    de productos solo se calculan en la convergencia, limitada a MAXITER
+    iteraciones
+
     Coste:
         proceso: tipo de proceso
             0   -   Absorción
@@ -623,6 +721,8 @@ class ColumnFUG(Tower):
     calculateValue=("DutyCondenser", "DutyReboiler", "Rmin", "RCalculada", "Nmin", "NTray", "N_feed")
     indiceCostos=3
 
+    MAXITER=100
+
     TEXT_FEED=["Kirkbride", "Fenske"]
     TEXT_CONDENSER=[QApplication.translate("pychemqt", "Total"),
                                             QApplication.translate("pychemqt", "Partial")]
@@ -683,6 +783,7 @@ class ColumnFUG(Tower):
 
 
     def calculo(self):
+        self.mcCabe = None
         self.entrada=self.kwargs["entrada"]
         self.LKsplit=unidades.Dimensionless(self.kwargs["LKsplit"])
         self.HKsplit=unidades.Dimensionless(self.kwargs["HKsplit"])
@@ -695,61 +796,52 @@ class ColumnFUG(Tower):
         self.DeltaP=unidades.Pressure(self.kwargs["DeltaP"])
 
         #Estimate splits of components
-        b=[]
-        d=[]
-        for i, caudal_i in enumerate(self.entrada.caudalunitariomolar):
-            if i==self.kwargs["LK"]:
-                b.append(caudal_i*(1-self.LKsplit))
-                d.append(caudal_i*self.LKsplit)
-            elif i==self.kwargs["HK"]:
-                d.append(caudal_i*(1-self.HKsplit))
-                b.append(caudal_i*self.HKsplit)
-            elif self.entrada.eos.Ki[i]>self.entrada.eos.Ki[self.kwargs["LK"]]:
-                b.append(0)
-                d.append(caudal_i)
-            elif self.entrada.eos.Ki[i]<self.entrada.eos.Ki[self.kwargs["HK"]]:
-                d.append(0)
-                b.append(caudal_i)
-            else:
-                d.append(caudal_i*0.5)
-                b.append(caudal_i*0.5)
-
+        LK=self.kwargs["LK"]
+        HK=self.kwargs["HK"]
+        z=array(self.entrada.caudalunitariomolar, dtype=float)
+        Kf=self._Ki(self.entrada.fraccion)
+        d=where(Kf>Kf[LK], z, where(Kf<Kf[HK], 0, z*0.5))
+        d[LK]=z[LK]*self.LKsplit
+        d[HK]=z[HK]*(1-self.HKsplit)
+        b=z-d
+
+        #Fenske iteration, only the K values of products are calculated in
+        #each iteration, the products streams are defined at convergence
+        Kd=Kb=None
+        self.iterations=0
         while True:
-            bo=b
-            do=d
-
-            xt=[Q/sum(d) for Q in d]
-            xb=[Q/sum(b) for Q in b]
-            Qt=sum([di*comp.M for di, comp in zip(d, self.entrada.componente)])
-            Qb=sum([bi*comp.M for bi, comp in zip(b, self.entrada.componente)])
-            destilado=Corriente(T=self.entrada.T, P=self.Pd, caudalMasico=Qt, fraccionMolar=xt)
-            residuo=Corriente(T=self.entrada.T, P=self.Pd, caudalMasico=Qb, fraccionMolar=xb)
+            self.iterations+=1
+            Kd=self._Ki(d/d.sum(), Kd)
+            Kb=self._Ki(b/b.sum(), Kb)
             #TODO: Add algorithm to calculate Pd and condenser type fig 12.4 pag 230
 
             #Fenske equation for Nmin
-            alfam=(destilado.eos.Ki[self.kwargs["LK"]]/destilado.eos.Ki[self.kwargs["HK"]]*residuo.eos.Ki[self.kwargs["LK"]]/residuo.eos.Ki[self.kwargs["HK"]])**0.5
-            Nmin=log10(destilado.caudalunitariomolar[self.kwargs["LK"]]/destilado.caudalunitariomolar[self.kwargs["HK"]] * residuo.caudalunitariomolar[self.kwargs["HK"]]/residuo.caudalunitariomolar[self.kwargs["LK"]]) / log10(alfam)
+            alfa=(Kd/Kd[HK]*Kb/Kb[HK])**0.5
+            Nmin=log10(d[LK]/d[HK]*b[HK]/b[LK])/log10(alfa[LK])
 
             #Evaluación composición salidas
-            b=[]
-            d=[]
-            for i in range(len(self.entrada.ids)):
-                if i in [self.kwargs["LK"], self.kwargs["HK"]]:
-                    b.append(bo[i])
-                    d.append(do[i])
-                else:
-                    alfa=(destilado.eos.Ki[i]/destilado.eos.Ki[self.kwargs["HK"]]*residuo.eos.Ki[i]/residuo.eos.Ki[self.kwargs["HK"]])**0.5
-                    b.append(self.entrada.caudalunitariomolar[i]/(1+do[self.kwargs["HK"]]/bo[self.kwargs["HK"]]*alfa**Nmin))
-                    d.append(self.entrada.caudalunitariomolar[i]*do[self.kwargs["HK"]]/bo[self.kwargs["HK"]]*alfa**Nmin/(1+do[self.kwargs["HK"]]/bo[self.kwargs["HK"]]*alfa**Nmin))
-
-            res=sum([abs(inicial-final) for inicial, final in zip(bo, b)]) + sum([abs(inicial-final) for inicial, final in zip(do, d)])
+            r=d[HK]/b[HK]*alfa**Nmin
+            dn=z*r/(1+r)
+            bn=z/(1+r)
+            dn[[LK, HK]]=d[[LK, HK]]
+            bn[[LK, HK]]=b[[LK, HK]]
+
+            res=npabs(bn-b).sum()+npabs(dn-d).sum()
+            b, d=bn, dn
             if res<1e-10:
-                self.Nmin=Nmin-self.kwargs["condenser"]+1
                 break
+            if self.iterations>=self.MAXITER:
+                self.status=3
+                self.msg=QApplication.translate("pychemqt", "Fenske iteration don't converge, error %g") % res
+                break
+        self.Nmin=Nmin-self.kwargs["condenser"]+1
 
+        M=array([comp.M for comp in self.entrada.componente])
+        destilado=Corriente(T=self.entrada.T, P=self.Pd, caudalMasico=(d*M).sum(), ids=self.entrada.ids, fraccionMolar=list(d/d.sum()))
+        residuo=Corriente(T=self.entrada.T, P=self.Pd, caudalMasico=(b*M).sum(), ids=self.entrada.ids, fraccionMolar=list(b/b.sum()))
 
         #Calculo de la razón de reflujo mínima, ecuación de Underwood
-        alfa=self.entrada.eos.Ki[self.kwargs["LK"]]/self.entrada.eos.Ki[self.kwargs["HK"]]
+        alfa=Kf[LK]/Kf[HK]
         self.Rmin=unidades.Dimensionless(abs(float(destilado.caudalmolar/self.entrada.caudalmolar*(destilado.fraccion[self.kwargs["LK"]]/self.entrada.Liquido.fraccion[self.kwargs["LK"]]-alfa*destilado.fraccion[self.kwargs["HK"]]/self.entrada.Liquido.fraccion[self.kwargs["HK"]])/(alfa-1))))
 
         #Cálculo del número de etapas reales, ecuación de Gilliland
@@ -761,9 +853,9 @@ class ColumnFUG(Tower):
 
         #Cálculo del piso de la alimentación
         if self.kwargs["feed"]:       #Ec. de Fenske
-            alfa_b=residuo.eos.Ki[self.kwargs["LK"]]/residuo.eos.Ki[self.kwargs["HK"]]
-            alfa_d=destilado.eos.Ki[self.kwargs["LK"]]/destilado.eos.Ki[self.kwargs["HK"]]
-            alfa_f=self.entrada.eos.Ki[self.kwargs["LK"]]/self.entrada.eos.Ki[self.kwargs["HK"]]
+            alfa_b=Kb[LK]/Kb[HK]
+            alfa_d=Kd[LK]/Kd[HK]
+            alfa_f=Kf[LK]/Kf[HK]
             ratio=log(destilado.fraccion[self.kwargs["LK"]]/self.entrada.fraccion[self.kwargs["LK"]]*self.entrada.fraccion[self.kwargs["HK"]]/destilado.fraccion[self.kwargs["HK"]])/log(self.entrada.fraccion[self.kwargs["LK"]]/residuo.fraccion[self.kwargs["LK"]]*residuo.fraccion[self.kwargs["HK"]]/self.entrada.fraccion[self.kwargs["HK"]])*log((alfa_b*alfa_f)**0.5)/log((alfa_d*alfa_f)**0.5)
         else:                               #Ec. de Kirkbride
             ratio=(self.entrada.fraccion[self.kwargs["HK"]]/self.entrada.fraccion[self.kwargs["LK"]]*residuo.fraccion[self.kwargs["LK"]]**2/destilado.fraccion[self.kwargs["HK"]]**2*residuo.caudalmolar/destilado.caudalmolar)**0.206
@@ -782,8 +874,6 @@ class ColumnFUG(Tower):
 
 #FIXME: o el ejemplo está mal planteado o este valor es ilógico
         ToutReboiler=residuo.eos._Bubble_T()
-        ToutReboiler2=residuo.eos._Dew_T()
-        print((ToutReboiler, ToutReboiler2, Tin, Tout))
         SalidaResiduo=residuo.clone(T=ToutReboiler)
         self.salida=[SalidaDestilado, SalidaResiduo]
 
@@ -803,6 +893,24 @@ class ColumnFUG(Tower):
         self.LKName=self.salida[0].componente[self.kwargs["LK"]].nombre
         self.HKName=self.salida[0].componente[self.kwargs["HK"]].nombre
 
+    def _Ki(self, fraccion, Ki0=None):
+        """K values of a composition at column pressure and feed temperature,
+        calculated directly with the phase equilibrium model of input stream,
+        without the transport properties of a full stream calculation"""
+        K, H=self.entrada._methodEoS()
+        #The components absent in product are kept as traces, the flash
+        #iteration fail with null fugacities
+        fraccion=maximum(array(fraccion, dtype=float), 1e-10)
+        mezcla=Mezcla(tipo=5, ids=self.entrada.ids, fraccionMolar=list(fraccion), caudalMolar=1)
+        kw={}
+        if Ki0 is not None:
+            kw["Ki0"]=Ki0
+        eos=K(self.entrada.T, self.Pd, mezcla, **kw)
+        return array(eos.Ki, dtype=float)
+
+    def mcCabeData(self):
+        return Tower.mcCabeData(self, self.kwargs["LK"], self.kwargs["HK"])
+
     def McCabe(self):
         return Tower.McCabe(self, self.kwargs["LK"], self.kwargs["HK"])
 
@@ -864,35 +972,662 @@ class ColumnFUG(Tower):
 
 
 
-def batch():
-    # Plugging-in contant values
-    D = 10
-    a = 2.41
-    W_int = 100
-    x_w_int = 0.5
-
-    t = list(range(0, 6, 1))
-
-    # Defining function for integration
-    def batch(x_w, t):
-        W_t = -D*t + W_int
-        y = a*x_w/ (1.0 + x_w*(a-1.0))
-
-        dx_wdt = -(D/W_t)*(y - x_w)
-        return dx_wdt
-
-    x_w_sol = odeint(batch, x_w_int, t)
-
-    # Plotting the solution
-    figure()
-    plot(t, x_w_sol, '-o')
-    xlabel('Time, hours')
-    ylabel('x_w')
-    grid()
-    plt.show()
-
+class ColumnMESH(object):
+    """Rigorous tray by tray distillation column, the MESH equations of all
+    stages are solved simultaneously with the Naphtali-Sandholm method [1]_
+
+    Parameters
+    ----------
+    ids : list
+        Index of components in database
+    N : int
+        Number of equilibrium stages, counting the condenser as first stage
+        and the reboiler as last stage
+    feeds : list
+        Feeds to column, each one as a tuple (stage, T, P, flows), with the
+        index of feed stage counted from the condenser, the temperature [K],
+        the pressure [Pa] and the molar flow of components [kmol/s]
+    P : float
+        Condenser pressure, [Pa]
+    R : float
+        Reflux ratio
+    D : float
+        Distillate molar flow, [kmol/s]
+    K : class
+        Phase equilibrium model, a cubic equation of state or Grayson-Streed
+    DeltaP : float
+        Pressure drop between condenser and reboiler, [Pa]
+    condenser : int
+        Condenser type:
+
+            * 0 - Total
+            * 1 - Partial
+
+    tol : float
+        Tolerance in the sum of squares of scaled equations
+    maxiter : int
+        Maximum number of iterations
+
+    Notes
+    -----
+    The variables of each stage are the component vapor flows, the
+    temperature and the component liquid flows, with the component mass
+    balances, the equilibrium relations and the energy balance as equations.
+    In the condenser the energy balance is replaced by the reflux ratio
+    specification, or the bubble point of liquid for total condenser, and in
+    the reboiler by the bottom flow specification, the duties are calculated
+    with the converged profiles.
+
+    The equations of a stage only depend of the adjacent stages, so the
+    jacobian is block tridiagonal and the Newton step is solved as a banded
+    system with cost proportional to N·c³. The K values are calculated with
+    the fugacity coefficients of equilibrium model at the stage compositions,
+    the jacobian include its derivatives with temperature and compositions
+    by finite differences. The enthalpy of phases is the ideal gas enthalpy
+    of components, less the heat of vaporization for the liquid phase.
+
+    The initial profiles are calculated with the bubble point method [2]_,
+    starting from the product compositions estimated with the Wilson K
+    values. Specifications with a sharp split, the distillate flow equal to
+    the flow of the lighter components in feed, are ill-conditioned in
+    columns with many stages and can fail to converge.
+
+    After solve the profiles are saved as arrays ordered from the condenser:
+
+        * T: Temperature of stages, [K]
+        * P: Pressure of stages, [Pa]
+        * L, V: Liquid and vapor molar flow leaving the stages, [kmol/s]
+        * x, y: Liquid and vapor molar fraction in stages
+        * d, b: Component molar flow in distillate and bottom, [kmol/s]
+        * Qc, Qr: Condenser duty, heat removed, and reboiler duty, [W]
+
+    and the convergence diagnostic in status, msg, iterations and err, as
+    in :class:`equipment.pipe.PipeNetwork`
+
+    References
+    ----------
+    .. [1] Naphtali, L.M., Sandholm, D.P. Multicomponent Separation
+        Calculations by Linearization. AIChE Journal 17(1) (1971) 148-153
+    .. [2] Wang, J.C., Henke, G.E. Tridiagonal Matrix for Distillation.
+        Hydrocarbon Processing 45(8) (1966) 155-163
+
+    Examples
+    --------
+    Depropanizer of a light hydrocarbon mixture
+
+    >>> from lib.EoS.Cubic import PR
+    >>> flows = [0.002, 0.010, 0.004, 0.008, 0.003, 0.003]
+    >>> column = ColumnMESH(ids=[3, 4, 5, 6, 7, 8], N=20,
+    ...                     feeds=[(10, 330, 1.6e6, flows)], P=1.6e6, R=2.5,
+    ...                     D=0.012, K=PR)
+    >>> column.solve()
+    >>> column.msg
+    'Converged in 2 iterations'
+    >>> "%0.1f %0.1f" % (column.T[0], column.T[-1])
+    '305.7 381.8'
+    >>> "%0.4f %0.4f" % (column.d[1]/flows[1], column.b[4]/flows[4])
+    '0.9636 1.0000'
+    >>> "%0.0f %0.0f" % (column.Qc/1e3, column.Qr/1e3)
+    '576 726'
+    """
 
+    MAXDT = 10
+    MAXSTEP = 50
+    MAXITER = 50
+
+    def __init__(self, ids, N, feeds, P, R, D, K, DeltaP=0, condenser=0,
+                 tol=1e-10, maxiter=50):
+        if not issubclass(K, (Cubic, Grayson_Streed)):
+            raise TypeError(
+                "Equilibrium model without fugacity coefficients, K must be "
+                "a cubic equation of state or Grayson-Streed")
+
+        self.ids = ids
+        self.N = N
+        self.feeds = feeds
+        self.Pd = P
+        self.DeltaP = DeltaP
+        self.R = R
+        self.D = D
+        self.condenser = condenser
+        self.tol = tol
+        self.maxiter = maxiter
+
+        z = sum(array(flows, dtype=float) for stage, T, P_, flows in feeds)
+        z = maximum(z/z.sum(), 1e-10)
+        self.mezcla = Mezcla(tipo=5, ids=ids, fraccionMolar=list(z/z.sum()),
+                             caudalMolar=1)
+        self.componente = self.mezcla.componente
+        self.c = len(ids)
+        self.eos = K(feeds[0][1], P, self.mezcla)
+
+        self._cp = array([cmp.cp for cmp in self.componente])
+
+    def _lnphi(self, x, y, T, P):
+        """Logarithm of fugacity coefficients of components in the liquid
+        and vapor phases of a stage"""
+        tital, titav = self.eos._fug(x, y, T, P)
+        return nplog(array(tital).real), nplog(array(titav).real)
+
+    def _K(self, x, y, T, P):
+        """K values of stages from the fugacity coefficients of phases, in
+        the stages where the equation of state has a single root for both
+        phases, the trivial solution, the Wilson correlation is used"""
+        K = zeros(x.shape)
+        for j, (xj, yj, Tj, Pj) in enumerate(zip(x, y, T, P)):
+            lnphiL, lnphiV = self._lnphi(xj, yj, Tj, Pj)
+            if npabs(lnphiL-lnphiV).max() < 1e-3:
+                K[j] = self._wilson(Tj, Pj)
+            else:
+                K[j] = npexp(lnphiL-lnphiV)
+        return K
+
+    def _dlnK(self, l, v, T, y0):
+        """Derivatives of logarithm of K values respect to the component
+        flows of liquid and vapor, by finite differences, each component is
+        perturbed in both phases at once as the fugacity coefficients of a
+        phase only depend of its composition"""
+        N, c = l.shape
+        dl = zeros((N, c, c))
+        dv = zeros((N, c, c))
+        for j in range(N):
+            x = l[j]/l[j].sum()
+            if j == 0 and not self.condenser:
+                y = y0
+            else:
+                y = v[j]/v[j].sum()
+            lnphiL, lnphiV = self._lnphi(x, y, T[j], self.P[j])
+            if npabs(lnphiL-lnphiV).max() < 1e-3:
+                continue
+            hl = 1e-7*l[j].sum()
+            hv = 1e-7*v[j].sum()
+            for k in range(c):
+                xk = l[j].copy()
+                xk[k] += hl
+                if j == 0 and not self.condenser:
+                    yk = y0
+                else:
+                    yk = v[j].copy()
+                    yk[k] += hv
+                    yk = yk/yk.sum()
+                lnL, lnV = self._lnphi(xk/xk.sum(), yk, T[j], self.P[j])
+                dl[j, :, k] = (lnL-lnphiL)/hl
+                if hv:
+                    dv[j, :, k] = -(lnV-lnphiV)/hv
+        return dl, dv
+
+    def _hV(self, T):
+        """Ideal gas enthalpy of components, [J/mol]"""
+        k = arange(1, 7)
+        To = 298.15
+        return 4.184*((T[:, None, None]**k-To**k)/k*self._cp).sum(-1)
+
+    def _cpV(self, T):
+        """Ideal gas heat capacity of components, [J/mol·K]"""
+        k = arange(6)
+        return 4.184*(T[:, None, None]**k*self._cp).sum(-1)
+
+    def _Hv(self, T):
+        """Heat of vaporization of components, [J/mol]
+
+        Over 0.9·Tc the heat of vaporization is extended with an exponential
+        decay with the value and slope at that temperature, so the liquid
+        enthalpy of light components, even supercritical, is smooth"""
+        Hv = zeros((len(T), self.c))
+        for i, cmp in enumerate(self.componente):
+            Tr = 0.9*cmp.Tc
+            sub = T < Tr
+            Hv[sub, i] = self._Hvi(cmp, T[sub])
+            if not sub.all():
+                H, H2 = self._Hvi(cmp, array([Tr, Tr-0.01]))
+                dH = (H-H2)/0.01
+                Hv[~sub, i] = H*exp(dH*(T[~sub]-Tr)/H)
+        return Hv
+
+    @staticmethod
+    def _Hvi(cmp, T):
+        """Heat of vaporization of a component below its critical
+        temperature, [J/mol]"""
+        if cmp._dipprHv:
+            return array([cmp.Hv_DIPPR(t)*cmp.M/1000 for t in T])
+
+        # Pitzer acentric factor correlation
+        tau = 1-T/cmp.Tc
+        return R*cmp.Tc*(7.08*tau**0.354+10.95*cmp.f_acent*tau**0.456)
+
+    def _enthalpy(self, T):
+        """Molar enthalpy of components in vapor and liquid phases and its
+        temperature derivatives"""
+        hV = self._hV(T)
+        cpV = self._cpV(T)
+        hL = hV-self._Hv(T)
+        cpL = cpV-(self._Hv(T+0.01)-self._Hv(T-0.01))/0.02
+        return hV, cpV, hL, cpL
+
+    def _flash(self, z, T, P):
+        """Isothermal flash of a feed, return the vapor fraction and the
+        phases compositions"""
+        z = array(z, dtype=float)/sum(z)
+        K = array([cmp.Pc/P*exp(5.37*(1+cmp.f_acent)*(1-cmp.Tc/T))
+                   for cmp in self.componente])
+        for i in range(self.MAXITER):
+            if (z*(K-1)).sum() <= 0:
+                q = 0
+            elif (z*(K-1)/K).sum() >= 0:
+                q = 1
+            else:
+                q = brentq(lambda q: (z*(K-1)/(1+q*(K-1))).sum(), 0, 1)
+            x = z/(1+q*(K-1))
+            y = K*x
+            Kn = self._K((x/x.sum())[None], (y/y.sum())[None], [T], [P])[0]
+            if npabs(Kn/K-1).max() < 1e-10:
+                break
+            K = Kn
+        return q, x/x.sum(), y/y.sum()
+
+    def _wilson(self, T, P):
+        """K values of components with the Wilson correlation"""
+        return array([cmp.Pc/P*exp(5.37*(1+cmp.f_acent)*(1-cmp.Tc/T))
+                      for cmp in self.componente])
+
+    def _saturation(self, z, P, dew=False):
+        """Bubble or dew point temperature of a composition and the
+        composition of incipient phase, the Wilson correlation estimation is
+        refined with the equilibrium model"""
+        if dew:
+            def f(T):
+                return log((z/self._wilson(T, P)).sum())
+        else:
+            def f(T):
+                return -log((z*self._wilson(T, P)).sum())
+        Tc = [cmp.Tc for cmp in self.componente]
+        T = brentq(f, 0.2*min(Tc), max(Tc))
+        K = self._wilson(T, P)
+
+        for i in range(self.MAXITER):
+            if dew:
+                x, y = z/K, z
+                x = x/x.sum()
+            else:
+                x, y = z, z*K
+                y = y/y.sum()
+            K = self._K(x[None], y[None], [T], [P])[0]
+            K2 = self._K(x[None], y[None], [T+0.01], [P])[0]
+            if dew:
+                g = log((z/K).sum())
+                dg = (log((z/K2).sum())-g)/0.01
+            else:
+                g = -log((z*K).sum())
+                dg = (-log((z*K2).sum())-g)/0.01
+            dT = max(min(-g/dg, self.MAXDT), -self.MAXDT)
+            T += dT
+            if abs(dT) < 1e-6:
+                break
+        if dew:
+            return T, x
+        return T, y
+
+    def _initial(self, F, Fv, D):
+        """Initial estimation of profiles with the bubble point method [2]_,
+        starting from constant molar overflow and the products estimated
+        distributing the components in volatility order"""
+        N = self.N
+        P = self.P
+        B = F.sum()-D
+        L = self.R*D+(F.sum(1)-Fv).cumsum()
+        V = zeros(N)
+        V[1:] = (self.R+1)*D-Fv.cumsum()[:-1]
+        V[0] = D*self.condenser
+        L[-1] = B
+        V[-1] = L[-2]-B
+        L = maximum(L, 1e-3*D)
+        V[1:] = maximum(V[1:], 1e-3*D)
+
+        z = F.sum(0)
+        Tm = sum(T for stage, T, P_, flows in self.feeds)/len(self.feeds)
+        Kw = self._wilson(Tm, P.mean())
+        d = zeros(self.c)
+        rest = D
+        for i in Kw.argsort()[::-1]:
+            d[i] = min(z[i], rest)
+            rest -= d[i]
+        xD = maximum(d/D, 1e-6)
+        xB = maximum((z-d)/B, 1e-6)
+        xD /= xD.sum()
+        xB /= xB.sum()
+
+        Ttop, yD = self._saturation(xD, P[0])
+        Tbottom, yB = self._saturation(xB, P[-1])
+        T = linspace(Ttop, Tbottom, N)
+        x = xD+(xB-xD)*linspace(0, 1, N)[:, None]
+        y = yD+(yB-yD)*linspace(0, 1, N)[:, None]
+
+        # Bubble point iterations, the component balances with the K values
+        # fixed are tridiagonal systems in the liquid flows, the temperature
+        # is corrected with a Newton step of bubble point equation and the
+        # vapor flows with the energy balances of stages
+        ab = zeros((3, N))
+        ab[2, :-1] = -1
+        Fc = F.sum(1).cumsum()
+        for i in range(self.MAXITER):
+            K = self._K(x, y, T, P)
+            dK = (self._K(x, y, T+0.01, P)-K)/0.01
+            S = K*(V/L)[:, None]
+            if not self.condenser:
+                S[0] = 0
+            l = zeros((N, self.c))
+            for k in range(self.c):
+                ab[0, 1:] = -S[1:, k]
+                ab[1] = 1+self._sL+S[:, k]
+                l[:, k] = solve_banded((1, 1), ab, F[:, k])
+            l = maximum(l, 1e-300)
+            x = l/l.sum(1)[:, None]
+            Kx = (K*x).sum(1)
+            dT = clip(-log(Kx)/((dK*x).sum(1)/Kx), -self.MAXDT, self.MAXDT)
+            T = T+dT
+            y = K*x/Kx[:, None]
+
+            hV, cpV, hL, cpL = self._enthalpy(T)
+            hL = (x*hL).sum(1)
+            hV = (y*hV).sum(1)
+            Vn = V.copy()
+            for j in range(1, N-1):
+                Vn[j+1] = ((Vn[j]-D+Fc[j-1])*hL[j-1]-Vn[j]*hV[j]+self._HF[j]
+                           - (Fc[j]-D)*hL[j])/(hL[j]-hV[j+1])
+            Vn[1:] = maximum(Vn[1:], 1e-3*D)
+            dV = npabs(Vn-V).max()
+            V = Vn
+            L[:-1] = maximum(V[1:]-D+Fc[:-1], 1e-3*D)
+            if npabs(dT).max() < 0.1 and dV < 1e-3*D:
+                break
 
+        return l, S*l, T, y[0]
+
+    def _equations(self, l, v, T, y0):
+        """Evaluate the MESH equations of all stages, return the scaled
+        equations and a dict with the stage properties used in jacobian"""
+        F, HF, sL, P = self._F, self._HF, self._sL, self.P
+        total = not self.condenser
+        Lj = l.sum(1)
+        Vj = v.sum(1)
+        x = l/Lj[:, None]
+        y = v/maximum(Vj, 1e-300)[:, None]
+        if total:
+            # The vapor in equilibrium with condensate liquid
+            y[0] = y0
+        K = self._K(x, y, T, P)
+        hV, cpV, hL, cpL = self._enthalpy(T)
+        HL = (l*hL).sum(1)
+        HV = (v*hV).sum(1)
+
+        Mres = (1+sL)[:, None]*l+v-F
+        Mres[1:] -= l[:-1]
+        Mres[:-1] -= v[1:]
+        Eres = K*x*Vj[:, None]-v
+        Hres = (1+sL)*HL+HV-HF
+        Hres[1:] -= HL[:-1]
+        Hres[:-1] -= HV[1:]
+        Hres /= self.Hs
+        if total:
+            Eres[0] = v[0]
+            Hres[0] = (K[0]*x[0]).sum()-1
+        else:
+            Hres[0] = Lj[0]-self.R*Vj[0]
+        Hres[-1] = Lj[-1]-self._B
+
+        f = concatenate((Mres, Hres[:, None], Eres), axis=1)
+        state = {"L": Lj, "V": Vj, "x": x, "y": y, "K": K, "hV": hV,
+                 "cpV": cpV, "hL": hL, "cpL": cpL, "HL": HL, "HV": HV}
+        return f, state
+
+    def _jacobian(self, l, v, T, s):
+        """Jacobian of equations in banded storage, the blocks A with the
+        derivatives respect to the variables of previous stage, Bd respect
+        the own variables and C respect the next stage"""
+        N = self.N
+        c = self.c
+        n = 2*c+1
+        Hs = self.Hs
+        sL = self._sL
+        I = eye(c)
+        V_, T_, L_ = slice(0, c), c, slice(c+1, n)
+        M_, H_, E_ = slice(0, c), c, slice(c+1, n)
+        Lj, Vj, x, K = s["L"], s["V"], s["x"], s["K"]
+        hV, cpV, hL, cpL = s["hV"], s["cpV"], s["hL"], s["cpL"]
+        dK = (self._K(x, s["y"], T+0.01, self.P)-K)/0.01
+
+        A = zeros((N, n, n))
+        Bd = zeros((N, n, n))
+        C = zeros((N, n, n))
+        Bd[:, M_, V_] = I
+        Bd[:, M_, L_] = (1+sL)[:, None, None]*I
+        A[:, M_, L_] = -I
+        C[:, M_, V_] = -I
+
+        dlnKl, dlnKv = self._dlnK(l, v, T, s["y"][0])
+        KxV = (K*x*Vj[:, None])[:, :, None]
+        Bd[:, E_, V_] = (K*x)[:, :, None]-I+KxV*dlnKv
+        Bd[:, E_, T_] = dK*x*Vj[:, None]
+        Bd[:, E_, L_] = (K*(Vj/Lj)[:, None])[:, :, None]*(I-x[:, :, None]) + \
+            KxV*dlnKl
+
+        Bd[:, H_, V_] = hV/Hs
+        Bd[:, H_, T_] = ((1+sL)*(l*cpL).sum(1)+(v*cpV).sum(1))/Hs
+        Bd[:, H_, L_] = (1+sL)[:, None]*hL/Hs
+        A[1:, H_, T_] = -(l*cpL).sum(1)[:-1]/Hs
+        A[1:, H_, L_] = -hL[:-1]/Hs
+        C[:-1, H_, T_] = -(v*cpV).sum(1)[1:]/Hs
+        C[:-1, H_, V_] = -hV[1:]/Hs
+
+        Bd[0, H_] = 0
+        C[0, H_] = 0
+        if not self.condenser:
+            Bd[0, E_] = 0
+            Bd[0, E_, V_] = I
+            Bd[0, H_, T_] = (dK[0]*x[0]).sum()
+            Bd[0, H_, L_] = (K[0]-(K[0]*x[0]).sum())/Lj[0] + \
+                (K[0]*x[0]).dot(dlnKl[0])
+        else:
+            Bd[0, H_, V_] = -self.R
+            Bd[0, H_, L_] = 1
+        Bd[-1, H_] = 0
+        A[-1, H_] = 0
+        Bd[-1, H_, L_] = 1
+
+        ab = zeros((2*self._band+1, N*n))
+        for block, (valid, r, col) in zip((A, Bd, C), self._bands):
+            ab[r, col] = block.ravel()[valid]
+        return ab
+
+    def solve(self):
+        """Solve the column"""
+        N = self.N
+        c = self.c
+        n = 2*c+1
+        self.Hs = 1e4
+
+        self.P = linspace(self.Pd, self.Pd+self.DeltaP, N)
+        F = zeros((N, c))
+        Fv = zeros(N)
+        HF = zeros(N)
+        for stage, T, Pf, flows in self.feeds:
+            flows = array(flows, dtype=float)
+            q, xf, yf = self._flash(flows, T, Pf)
+            hV, cpV, hL, cpL = self._enthalpy(array([T]))
+            F[stage] += flows
+            Fv[stage] += q*flows.sum()
+            HF[stage] += flows.sum()*(q*yf*hV[0]+(1-q)*xf*hL[0]).sum()
+
+        # The equations are solved with the flows scaled with the total feed
+        # and the energy balance scaled with Hs
+        Ft = F.sum()
+        if not 0 < self.D < Ft:
+            raise ValueError("Distillate flow out of range")
+        self._F = F/Ft
+        self._HF = HF/Ft
+        self._B = 1-self.D/Ft
+        total = not self.condenser
+        self._sL = zeros(N)
+        if total:
+            self._sL[0] = 1/self.R
+
+        l, v, T, y0 = self._initial(self._F, Fv/Ft, self.D/Ft)
+        if total:
+            v[0] = 0
+
+        # Index of elements of jacobian blocks in the banded storage
+        self._band = 2*n-1
+        j, q, p = [i.ravel() for i in indices((N, n, n))]
+        rows = j*n+q
+        self._bands = []
+        for offset in (-1, 0, 1):
+            valid = (j+offset >= 0) & (j+offset < N)
+            cols = (j+offset)*n+p
+            self._bands.append(
+                (valid, self._band+rows[valid]-cols[valid], cols[valid]))
+
+        self.status = 0
+        self.iterations = 0
+        f, s = self._equations(l, v, T, y0)
+        self.err = float((f**2).sum())
+        err0 = self.err
+        while True:
+            checkCancel()
+            if self.err < self.tol:
+                self.status = 1
+                self.msg = "Converged in %i iterations" % self.iterations
+                break
+            if not self.err < 1e3*err0:
+                self.status = 0
+                self.msg = "Newton method diverged, error %g" % self.err
+                break
+            if self.iterations >= self.maxiter:
+                self.status = 3
+                self.msg = "Maximum iterations reached, error %g" % self.err
+                break
+            self.iterations += 1
+
+            ab = self._jacobian(l, v, T, s)
+            delta = solve_banded((self._band, self._band), ab, -f.ravel())
+            delta = delta.reshape(N, n)
+            dv, dT, dl = delta[:, :c], delta[:, c], delta[:, c+1:]
+            if total:
+                y0 = s["K"][0]*s["x"][0]/(s["K"][0]*s["x"][0]).sum()
+
+            # Damped step, scaled to limit the temperature change and reduced
+            # while the equations error increase, the flows that would be
+            # negative are reduced exponentially
+            t = min(1, self.MAXSTEP/npabs(dT).max())
+            for i in range(5):
+                vn = v+t*dv
+                ln = l+t*dl
+                vn = where(vn > 0, vn, v*exp(t*dv/maximum(v, 1e-300)))
+                ln = where(ln > 0, ln, l*exp(t*dl/maximum(l, 1e-300)))
+                Tn = T+t*dT
+                fn, sn = self._equations(ln, vn, Tn, y0)
+                err = float((fn**2).sum())
+                if err < self.err:
+                    break
+                t /= 2
+            l, v, T, f, s, self.err = ln, vn, Tn, fn, sn, err
+
+        self.T = T
+        self.L = s["L"]*Ft
+        self.V = s["V"]*Ft
+        self.x = s["x"]
+        self.y = s["y"]
+        if total:
+            self.d = l[0]/self.R*Ft
+        else:
+            self.d = v[0]*Ft
+        self.b = l[-1]*Ft
+        HL, HV = s["HL"], s["HV"]
+        self.Qc = float(
+            HV[1]+self._HF[0]-(1+self._sL[0])*HL[0]-HV[0])*Ft*1000
+        self.Qr = float(HL[-1]+HV[-1]-HL[-2]-self._HF[-1])*Ft*1000
+
+
+def batchDistillation(W, x, alfa, D, t, Wend=None):
+    """Simple batch distillation with constant relative volatility and
+    constant distillate flow, integrating the Rayleigh equation
+
+    .. math::
+        \\frac{dW_i}{dt} = -Dy_i \\quad
+        y_i = \\frac{\\alpha_ix_i}{\\sum_j\\alpha_jx_j}
+
+    Parameters
+    ----------
+    W : float
+        Initial charge of still, [kmol]
+    x : list
+        Initial molar fraction of components in still, [-]
+    alfa : list
+        Relative volatility of components respect to any reference component
+    D : float
+        Distillate molar flow, [kmol/s]
+    t : list
+        Times to report the state of still, [s]
+    Wend : float
+        Final charge of still to stop the distillation, [kmol]
+
+    Returns
+    -------
+    t : array
+        Time, [s]
+    W : array
+        Charge of still, [kmol]
+    x : array
+        Molar fraction of components in still, one row for each time, [-]
+    xD : array
+        Molar fraction of components in the accumulated distillate, [-]
+
+    Notes
+    -----
+    The component holdups are integrated with :func:`scipy.integrate.solve_ivp`
+    with a right-hand side vectorized over several states, the calculation
+    stop when the still charge reach Wend, by default a 1% of initial charge.
+
+    Examples
+    --------
+    Binary mixture compared with the analytical integration of Rayleigh
+    equation
+
+    >>> t, W, x, xD = batchDistillation(100, [0.5, 0.5], [2.41, 1], 10,
+    ...                                 [0, 1, 2, 3, 4, 5])
+    >>> "%0.0f %0.4f %0.4f" % (W[-1], x[-1][0], xD[-1][0])
+    '50 0.3518 0.6482'
+    >>> from math import log
+    >>> x0, x1 = 0.5, x[-1][0]
+    >>> "%0.4f" % (1/1.41*log(x1*(1-x0)/x0/(1-x1))+log((1-x0)/(1-x1)))
+    '-0.6931'
+    >>> "%0.4f" % log(W[-1]/W[0])
+    '-0.6931'
+    """
+    x = array(x, dtype=float)
+    alfa = array(alfa, dtype=float)[:, None]
+    W0 = x*W
+    if Wend is None:
+        Wend = 0.01*W
+
+    def rhs(t, n):
+        xi = n/n.sum(0)
+        y = alfa*xi/(alfa*xi).sum(0)
+        return -D*y
+
+    def end(t, n):
+        return n.sum()-Wend
+    end.terminal = True
+
+    t = array(t, dtype=float)
+    sol = solve_ivp(rhs, (t[0], t[-1]), W0, t_eval=t, events=end,
+                    vectorized=True, rtol=1e-8, atol=1e-10*W)
+    n = sol.y.T
+    W = n.sum(1)
+    x = n/W[:, None]
+    D = W0-n
+    with errstate(invalid="ignore"):
+        xD = D/D.sum(1)[:, None]
+    return sol.t, W, x, xD
 
 
 if __name__ == '__main__':
@@ -922,9 +1657,3 @@ if __name__ == '__main__':
     flash = Flash(entrada=entrada)
     print(flash.propTxt())
 
-#    from scipy import *
-#    from scipy.integrate import odeint
-#    from pylab import *
-#    import matplotlib.pyplot as plt
-#    batch()
-
@@ -29,7 +29,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 import os
 
 from PyQt5.QtWidgets import QApplication
-from scipy.optimize import fsolve
 
 from lib.corriente import Corriente
 from lib import unidades
@@ -342,17 +341,14 @@ class Mixer(equipment):
                     massUnitFlow[i] += caudal
         To /= sum(massUnitFlow)
 
-        def f(T):
-            output = Corriente(T=T, P=self.Pout,
-                               caudalUnitarioMasico=massUnitFlow)
-            return output.h-h_in
-        T = fsolve(f, To)[0]
+        # The mixed stream at the mean temperature is the initial state
+        salida = Corriente(T=To, P=self.Pout,
+                           caudalUnitarioMasico=massUnitFlow).clonePh(h_in)
 
         # TODO: Add solid mixer capability
         if self.entrada[0].solido:
             pass
 
-        salida = Corriente(T=T, P=self.Pout, caudalUnitarioMasico=massUnitFlow)
         self.salida = [salida]
 
         # Calculate other properties
@@ -27,12 +27,18 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 ###############################################################################
 
 
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 import os
 
 from PyQt5.QtWidgets import QApplication
+from numpy import (argsort, array, asarray, column_stack, concatenate,
+                   digitize, errstate, floor, interp, isfinite, linspace,
+                   maximum, meshgrid, minimum, nonzero, unique, where,
+                   zeros)
 from scipy import sqrt, exp, log, pi, arccos, sin, cos, tanh
+from scipy.optimize import brentq
 from scipy.constants import g
-from scipy.optimize import fsolve
 
 from lib import unidades
 from lib.adimensional import Re, Pr, Gr, Gz
@@ -146,18 +152,20 @@ class Heat_Exchanger(equipment):
             self.salida = [entrada.clone(T=Tout, P=entrada.P-self.deltaP)]
             self.HeatCalc = unidades.Power(self.salida[0].h-entrada.h)
         else:
-            if self.modo == 2:
-                self.HeatCalc = unidades.Power(0)
-            else:
+            salida = None
+            if self.modo == 3:
                 self.HeatCalc = unidades.Power(A*U*(Text-entrada.T))
 
-            def f():
-                output = entrada.clone(T=T, P=entrada.P-self.deltaP)
-                return output.h-entrada.h-self.HeatCalc
-            T = fsolve(f, entrada.T)[0]
-            if T > max(Text, entrada.T) or T < min(Text, entrada.T):
-                T = self.Text
-            self.salida = [entrada.clone(T=T, P=entrada.P-self.deltaP)]
+                # The outlet temperature can't cross the external temperature
+                limit = entrada.clone(T=Text, P=entrada.P-self.deltaP)
+                if abs(self.HeatCalc) > abs(limit.h-entrada.h):
+                    salida = limit
+                    self.HeatCalc = unidades.Power(salida.h-entrada.h)
+
+            if salida is None:
+                salida = entrada.clonePh(
+                    entrada.h+self.HeatCalc, P=entrada.P-self.deltaP)
+            self.salida = [salida]
 
         self.Tin = entrada.T
         self.ToutCalc = self.salida[0].T
@@ -346,10 +354,8 @@ class Fired_Heater(equipment):
 
         if self.Hmax and Heat > self.Hmax:
             self.Heat = unidades.Power(self.Hmax)
-            To = (entrada.T+self.Tout)/2
-            T = fsolve(lambda T: entrada.clone(
-                T=T, P=entrada.P-self.deltaP).h-Ho-self.Hmax, To)[0]
-            self.salida = [entrada.clone(T=T, P=entrada.P-self.deltaP)]
+            self.salida = [entrada.clonePh(
+                Ho+self.Hmax, P=entrada.P-self.deltaP)]
         else:
             self.Heat = Heat
             self.salida = [salida]
@@ -541,9 +547,10 @@ class Hairpin(equipment):
             0 - Horizontal
             1 - Vertical, internal down
             2 - Vertical, internal up
-        metodo:
+        metodo: Rating method
             0 - Mean temperature
             1 - Split the pipe in segments
+        segments: Number of segments of pipe in segmented rating
         tubesideLaminar: Method to calculate the global heat transfer
             coefficient in laminar flow for tubeside
             0 - Eubank-Proctor
@@ -598,8 +605,26 @@ class Hairpin(equipment):
                             annulliFouling=0.000352, tubeFouling=0.000176)
     >>> print("%6g %6g" % (Cambiador.ReTube, Cambiador.ReAnnulli))
     27783.3 1277.55
-    >>> print("%6g %6g" % (Cambiador.hTube.kWm2K, Cambiador.hAnnulli.kWm2K))
-    1555.53 52.8267
+    >>> print("%6g %6g" % (Cambiador.hTube, Cambiador.hAnnulli))
+    1555.53 157.58
+
+    Rating splitting the pipe in segments
+
+    >>> Cambiador(metodo=1, segments=10)
+    >>> print("%0.1f %0.2f %0.2f" % (
+    ...     Cambiador.Q, Cambiador.ToutTube, Cambiador.ToutAnnulli))
+    4029.6 360.49 300.09
+    >>> print("%0.2f %0.2f" % (Cambiador.deltaPTube, Cambiador.deltaPAnnulli))
+    17.79 26.13
+
+    Condensing steam in tubeside, the dew point is a node of the properties
+    tabulation
+
+    >>> vapor = Corriente(T=395, P=2e5, caudalMasico=0.01, **kw)
+    >>> Cambiador(entradaTubo=vapor, tubeFouling=0)
+    >>> print("%0.1f %0.2f %0.3f" % (
+    ...     Cambiador.Q, Cambiador.ToutTube, Cambiador.outTube.x))
+    5034.3 393.36 0.773
     """
     title = QApplication.translate("pychemqt", "Hairpin Heat Exchanger")
     help = ""
@@ -613,6 +638,7 @@ class Hairpin(equipment):
         "tubesideLaminar": 0,
         "tubesideTurbulent": 0,
         "metodo": 0,
+        "segments": 10,
         "phase": 0,
 
         "DeeTube": 0.0,
@@ -649,8 +675,8 @@ class Hairpin(equipment):
     kwargsInput = ("entradaTubo", "entradaExterior")
     kwargsValue = ("DeTube", "DiTube", "wTube", "rTube", "kTube", "LTube",
                    "nTube", "tubeFouling", "annulliFouling", "P_dis",
-                   "tubeTout", "annulliTout")
-    kwargsList = ("modo", "flujo", "orientacion")
+                   "tubeTout", "annulliTout", "segments")
+    kwargsList = ("modo", "flujo", "orientacion", "metodo")
     kwargsCheck = ("tubeFinned", )
     calculateValue = ("Q", "ToutAnnulli", "ToutTube", "U", "A", "L",
                       "deltaPTube", "deltaPAnnulli", "CF")
@@ -667,12 +693,19 @@ class Hairpin(equipment):
         QApplication.translate("pychemqt", "Horizontal"),
         QApplication.translate("pychemqt", "Vertical, (in down)"),
         QApplication.translate("pychemqt", "Vertical, (in up)")]
+    TEXT_METODO = [
+        QApplication.translate("pychemqt", "Mean temperature"),
+        QApplication.translate("pychemqt", "Segments")]
     TEXT_MATERIAL = [
         QApplication.translate("pychemqt", "Carbon steel/carbon steel"),
         QApplication.translate("pychemqt", "Carbon steel/304 stainless"),
         QApplication.translate("pychemqt", "Carbon steel/316 stainless")]
     CODE_FLUJO = ("CF", "PF")
 
+    # Maximum number of nodes to tabulate the fluid properties in segmented
+    # rating, below it a node is used for each segment end
+    NODES = 51
+
     @property
     def isCalculable(self):
         self.status = 1
@@ -790,14 +823,17 @@ class Hairpin(equipment):
         else:
             self.design()
 
-        eD = unidades.Dimensionless(self.kwargs["rTube"]/self.Di)
-        f = f_friccion(self.ReTube, eD)
-        dp_tube = self.L*self.VTube**2/self.Di*f*self.rhoTube/2
-        self.deltaPTube = unidades.DeltaP(dp_tube)
+        # The segmented rating integrate the pressure drop along the pipe
+        if not self.kwargs["modo"] or self.kwargs["metodo"] == 0:
+            eD = unidades.Dimensionless(self.kwargs["rTube"]/self.Di)
+            f = _darcy(self.ReTube, eD)
+            dp_tube = self.L*self.VTube**2/self.Di*f*self.rhoTube/2
+            self.deltaPTube = unidades.DeltaP(dp_tube)
 
-        f_a = f_friccion(self.ReAnnulli, geometry=6)
-        dp_annulli = self.L*self.VAnnulli**2/self.De*f_a*self.rhoAnnulli/2
-        self.deltaPAnnulli = unidades.DeltaP(dp_annulli)
+            f_a = _darcy(self.ReAnnulli, 0, 0, 6, self.De, self.Dee)
+            dh = self.Dee-self.De
+            dp_annulli = self.L*self.VAnnulli**2/dh*f_a*self.rhoAnnulli/2
+            self.deltaPAnnulli = unidades.DeltaP(dp_annulli)
 
         self.salida = [
             self.outTube.clone(P=self.outTube.P-self.deltaPTube),
@@ -847,15 +883,195 @@ class Hairpin(equipment):
                 QTube = -self.Q
                 QAnnulli = self.Q
 
-            def f(T):
-                return inTube.clone(T=T).h-inTube.h+QTube
-            T = fsolve(f, inTube.T)[0]
-            self.outTube = inTube.clone(T=T)
+            self.outTube = inTube.clonePh(inTube.h-QTube)
+            self.outAnnulli = inAnnulli.clonePh(inAnnulli.h-QAnnulli)
 
-            def f(T):
-                return inAnnulli.clone(T=T).h-inAnnulli.h+QAnnulli
-            T = fsolve(f, inAnnulli.T)[0]
-            self.outAnnulli = inAnnulli.clone(T=T)
+        # Segmented method
+        else:
+            self._ratingSegments(inTube, inAnnulli)
+
+    def _ratingSegments(self, inTube, inAnnulli):
+        """Rating splitting the pipe in segments, the local heat transfer
+        coefficients and pressure drop are integrated along the pipe.
+
+        The fluid properties of both streams are tabulated versus the heat
+        transfered in a node for each segment end, up to NODES, and in the
+        dew and bubble points of pure component streams, so the change of
+        slope of T(q) and the two phase multiplier of heat transfer
+        coefficient are resolved. The correlations are evaluated in the
+        nodes and interpolated in the segments"""
+        N = self.kwargs["segments"]
+        self.A = unidades.Area(self.L*pi*self.De)
+        dA = self.A/N
+        dL = self.L/N
+
+        # Direction of heat flux and maximum heat transferable
+        if inTube.T > inAnnulli.T:
+            sign = 1
+        else:
+            sign = -1
+        Qmax = min(sign*(inTube.h-inTube.clone(T=inAnnulli.T).h),
+                   sign*(inAnnulli.clone(T=inTube.T).h-inAnnulli.h))
+        q = linspace(0, Qmax, min(N+1, self.NODES))
+        q = unique(concatenate((
+            q, self._saturationHeat(inTube, sign, Qmax),
+            self._saturationHeat(inAnnulli, -sign, Qmax))))
+
+        tube = self._nodes(inTube, float(inTube.h)-sign*q)
+        annulli = self._nodes(inAnnulli, float(inAnnulli.h)+sign*q)
+
+        # Local heat transfer coefficient and pressure drop gradient
+        G = inTube.caudalmasico*4/pi/self.Di**2
+        tube["Re"] = G*self.Di/tube["mu"]
+        Nu = self._NuTube(tube["Re"], tube["Prandt"], cold=sign < 0)
+        tube["h"] = Nu*tube["k"]/self.Di*tube["phi"]
+        eD = self.kwargs["rTube"]/self.Di
+        f = _darcy(tube["Re"], eD)
+        tube["dPdL"] = f*G**2/2/tube["rho"]/self.Di
+        tube["V"] = G/tube["rho"]
+
+        dh = self.Dee-self.De
+        G = inAnnulli.caudalmasico*4/pi/(self.Dee**2-self.De**2)
+        annulli["Re"] = G*dh/annulli["mu"]
+        Nu = self._NuAnnulli(annulli["Re"], annulli["Prandt"])
+        annulli["h"] = Nu*annulli["k"]/dh*annulli["phi"]
+        f = _darcy(annulli["Re"], 0, 0, 6, self.De, self.Dee)
+        annulli["dPdL"] = f*G**2/2/annulli["rho"]/dh
+        annulli["V"] = G/annulli["rho"]
+
+        def local(qt, qa):
+            """Local heat flux per unit area with the heat transfered from
+            tube inlet qt and from annulli inlet qa"""
+            hi = interp(qt, q, tube["h"])
+            ho = interp(qa, q, annulli["h"])
+            ni, no = self.rendimientoAletas(hi, ho)
+            U, Uc = self._U(hi, ni, ho, no)
+            DT = interp(qt, q, tube["T"])-interp(qa, q, annulli["T"])
+            return sign*U*DT, hi, ho, U, Uc
+
+        def march(Q):
+            """Integrate the heat transfered along the pipe, with midpoint
+            method, Q is the total heat transfered used for the annulli side
+            state in counterflow"""
+            qt = zeros(N+1)
+            for i in range(N):
+                if self.kwargs["flujo"]:
+                    qa = qt[i]
+                else:
+                    qa = Q-qt[i]
+                dq = local(qt[i], qa)[0]*dA
+                if self.kwargs["flujo"]:
+                    qa += dq/2
+                else:
+                    qa -= dq/2
+                qt[i+1] = qt[i]+local(qt[i]+dq/2, qa)[0]*dA
+            return qt
+
+        if Qmax <= 0:
+            qt = zeros(N+1)
+        elif self.kwargs["flujo"]:
+            qt = march(0)
+        else:
+            # Counterflow, shooting in the total heat transfered to meet
+            # the annulli inlet condition at the end of pipe
+            Q = brentq(lambda Q: march(Q)[-1]-Q, 0, Qmax, xtol=Qmax*1e-8)
+            qt = march(Q)
+        Q = qt[-1]
+        self.Q = unidades.Power(Q)
+
+        # Local values in the middle of each segment
+        qt = (qt[1:]+qt[:-1])/2
+        if self.kwargs["flujo"]:
+            qa = qt
+        else:
+            qa = Q-qt
+        flux, hi, ho, U, Uc = local(qt, qa)
+        self.z = [unidades.Length(z) for z in linspace(dL/2, self.L-dL/2, N)]
+        self.TTubeSegments = [unidades.Temperature(T)
+                              for T in interp(qt, q, tube["T"])]
+        self.TAnnulliSegments = [unidades.Temperature(T)
+                                 for T in interp(qa, q, annulli["T"])]
+        self.USegments = [unidades.HeatTransfCoef(u) for u in U]
+
+        self.hTube = unidades.HeatTransfCoef(hi.mean())
+        self.hAnnulli = unidades.HeatTransfCoef(ho.mean())
+        self.U = unidades.HeatTransfCoef(U.mean())
+        self.CF = unidades.Dimensionless((U/Uc).mean())
+        self.OS = unidades.Dimensionless(Uc.mean()*(self.fi+self.fo))
+        self.VTube = unidades.Speed(interp(qt, q, tube["V"]).mean())
+        self.rhoTube = unidades.Density(interp(qt, q, tube["rho"]).mean())
+        self.ReTube = unidades.Dimensionless(
+            interp(qt, q, tube["Re"]).mean())
+        self.VAnnulli = unidades.Speed(interp(qa, q, annulli["V"]).mean())
+        self.rhoAnnulli = unidades.Density(
+            interp(qa, q, annulli["rho"]).mean())
+        self.ReAnnulli = unidades.Dimensionless(
+            interp(qa, q, annulli["Re"]).mean())
+        self.deltaPTube = unidades.DeltaP(
+            interp(qt, q, tube["dPdL"]).sum()*dL)
+        self.deltaPAnnulli = unidades.DeltaP(
+            interp(qa, q, annulli["dPdL"]).sum()*dL)
+
+        self.outTube = inTube.clonePh(inTube.h-sign*self.Q)
+        self.outAnnulli = inAnnulli.clonePh(inAnnulli.h+sign*self.Q)
+        self.phaseTube = self.ThermalPhase(inTube, self.outTube)
+        self.phaseAnnulli = self.ThermalPhase(inAnnulli, self.outAnnulli)
+
+    @staticmethod
+    def _saturationHeat(stream, sign, Qmax):
+        """Heat transfered where a pure component stream reach the bubble or
+        dew point, sign is the direction of heat flux, 1 if the stream is
+        cooled"""
+        if len(stream.ids) != 1 or stream._thermo == "eos" or \
+                stream.P >= stream.Pc or Qmax <= 0:
+            return []
+        Tsat, liquid, gas = stream._saturation(stream.P, "h")
+        q = [sign*(stream.h-h*stream.caudalmasico) for h in (liquid, gas)]
+        return [float(qi) for qi in q if 0 < qi < Qmax]
+
+    def _nodes(self, stream, h):
+        """Tabulate the properties of stream in the enthalpy values h, the
+        liquid properties are used in two phase region with the Shah
+        correlation multiplier for the heat transfer coefficient and the
+        homogeneous density for the pressure drop"""
+        prop = {key: [] for key in ("T", "rho", "mu", "k", "Prandt", "phi")}
+        for i, hi in enumerate(h):
+            if i:
+                state = stream.clonePh(hi)
+            else:
+                state = stream
+            fluid = _fluid(state)
+            if 0 < state.x < 1:
+                x = state.x
+                Pr = state.P/state.Pc
+                phi = (1-x)**0.8+3.8*x**0.76*(1-x)**0.04/Pr**0.38
+                rho = 1/(x/state.Gas.rho+(1-x)/state.Liquido.rho)
+            else:
+                phi = 1
+                rho = fluid.rho
+            prop["T"].append(state.T)
+            prop["rho"].append(rho)
+            prop["mu"].append(fluid.mu)
+            prop["k"].append(fluid.k)
+            prop["Prandt"].append(fluid.Prandt)
+            prop["phi"].append(phi)
+        return {key: array(value, dtype=float) for key, value in prop.items()}
+
+    def _NuTube(self, re, pr, cold=False):
+        """Nusselt number in tubeside for arrays of Reynolds and Prandtl
+        number, used in segmented rating"""
+        return NuTube(re, pr, self.Di, self.L, self.kwargs["tubesideLaminar"],
+                      self.kwargs["tubesideTurbulent"], cold)
+
+    def _NuAnnulli(self, re, pr):
+        """Nusselt number in annulliside for arrays of Reynolds and Prandtl
+        number"""
+        a = self.Dee/self.De
+        with errstate(all="ignore"):
+            lam = h_anulli_Laminar(re, pr, a)
+            turb = h_anulli_Turbulent(re, pr, a)
+            trans = h_anulli_Transition(re, pr, a)
+        return where(re <= 2300, lam, where(re >= 1e4, turb, trans))
 
     def design(self):
         """Design a pipe to meet the specified heat transfer requeriments"""
@@ -863,96 +1079,95 @@ class Hairpin(equipment):
         inTube = self.kwargs["entradaTubo"]
         inAnnulli = self.kwargs["entradaExterior"]
 
-        # Metodo temperaturas medias
-        if self.kwargs["metodo"] == 0:
-
-            # Calculate output condition and sensible/latent thermal situation,
-            # global thermal balance
-            if self.statusOut == 1:
-                if self.kwargs["tubeTout"]:
-                    self.outTube = inTube.clone(T=self.kwargs["tubeTout"])
-                else:
-                    self.outTube = inTube.clone(x=self.kwargs["tubeXout"])
-                if self.kwargs["annulliTout"]:
-                    Tout = self.kwargs["annulliTout"]
-                    self.outAnnulli = inAnnulli.clone(T=Tout)
-                else:
-                    Xout = self.kwargs["annulliXout"]
-                    self.outAnnulli = inAnnulli.clone(x=Xout)
+        # Mean temperature method, the segmented method is only used in
+        # rating mode
+        # Calculate output condition and sensible/latent thermal situation,
+        # global thermal balance
+        if self.statusOut == 1:
+            if self.kwargs["tubeTout"]:
+                self.outTube = inTube.clone(T=self.kwargs["tubeTout"])
+            else:
+                self.outTube = inTube.clone(x=self.kwargs["tubeXout"])
+            if self.kwargs["annulliTout"]:
+                Tout = self.kwargs["annulliTout"]
+                self.outAnnulli = inAnnulli.clone(T=Tout)
+            else:
+                Xout = self.kwargs["annulliXout"]
+                self.outAnnulli = inAnnulli.clone(x=Xout)
 
-                Qo = abs(self.outAnnulli.h-inAnnulli.h)
-                Qi = abs(self.outTube.h-inTube.h)
-                self.Q = unidades.Power((Qo+Qi)/2.)
+            Qo = abs(self.outAnnulli.h-inAnnulli.h)
+            Qi = abs(self.outTube.h-inTube.h)
+            self.Q = unidades.Power((Qo+Qi)/2.)
 
-            elif self.statusOut == 2:
-                if self.kwargs["tubeTout"]:
-                    self.outTube = inTube.clone(T=self.kwargs["tubeTout"])
-                else:
-                    self.outTube = inTube.clone(x=self.kwargs["tubeXout"])
+        elif self.statusOut == 2:
+            if self.kwargs["tubeTout"]:
+                self.outTube = inTube.clone(T=self.kwargs["tubeTout"])
+            else:
+                self.outTube = inTube.clone(x=self.kwargs["tubeXout"])
 
-                Qi = abs(self.outTube.h-inTube.h)
-                self.Q = unidades.Power(Qi)
+            Qi = abs(self.outTube.h-inTube.h)
+            self.Q = unidades.Power(Qi)
 
-                def f(T):
-                    return inAnnulli.clone(T=T).h-inAnnulli.h-Qi
-                T = fsolve(f, inAnnulli.T)[0]
-                self.outAnnulli = inAnnulli.clone(T=T)
+            self.outAnnulli = inAnnulli.clonePh(inAnnulli.h+Qi)
 
-            elif self.statusOut == 3:
-                if self.kwargs["annulliTout"]:
-                    Tout = self.kwargs["annulliTout"]
-                    self.outAnnulli = inAnnulli.clone(T=Tout)
-                else:
-                    Xout = self.kwargs["annulliXout"]
-                    self.outAnnulli = inAnnulli.clone(x=Xout)
+        elif self.statusOut == 3:
+            if self.kwargs["annulliTout"]:
+                Tout = self.kwargs["annulliTout"]
+                self.outAnnulli = inAnnulli.clone(T=Tout)
+            else:
+                Xout = self.kwargs["annulliXout"]
+                self.outAnnulli = inAnnulli.clone(x=Xout)
 
-                Qo = abs(self.outAnnulli.h-inAnnulli.h)
-                self.Q = unidades.Power(Qo)
+            Qo = abs(self.outAnnulli.h-inAnnulli.h)
+            self.Q = unidades.Power(Qo)
 
-                def f(T):
-                    return inTube.clone(T=T).h-inTube.h-Qi
-                T = fsolve(f, inTube.T)[0]
-                self.outTube = inTube.clone(T=T)
+            self.outTube = inTube.clonePh(inTube.h+Qo)
 
-            self.phaseTube = self.ThermalPhase(inTube, self.outTube)
-            self.phaseAnnulli = self.ThermalPhase(inAnnulli, self.outAnnulli)
+        self.phaseTube = self.ThermalPhase(inTube, self.outTube)
+        self.phaseAnnulli = self.ThermalPhase(inAnnulli, self.outAnnulli)
 
-            fluidTube = inTube.clone(T=(inTube.T+self.outTube.T)/2.)
-            T = (inAnnulli.T+self.outAnnulli.T)/2.
-            fluidAnnulli = inAnnulli.clone(T=T)
+        fluidTube = inTube.clone(T=(inTube.T+self.outTube.T)/2.)
+        T = (inAnnulli.T+self.outAnnulli.T)/2.
+        fluidAnnulli = inAnnulli.clone(T=T)
 
-            hi = self._hTube(fluidTube)
-            ho = self._hAnnulli(fluidAnnulli)
-            ni, no = self.rendimientoAletas(hi, ho)
-            self.Ug(hi, ni, ho, no)
+        hi = self._hTube(fluidTube)
+        ho = self._hAnnulli(fluidAnnulli)
+        ni, no = self.rendimientoAletas(hi, ho)
+        self.Ug(hi, ni, ho, no)
 
-            if self.kwargs["flujo"]:
-                DTin = abs(inAnnulli.T-inTube.T)
-                DTout = abs(self.kwargs["tubeTout"]-self.kwargs["annulliTout"])
-            else:
-                DTin = abs(self.kwargs["tubeTout"]-inAnnulli.T)
-                DTout = abs(self.kwargs["annulliTout"]-inTube.T)
-            if DTin == DTout:
-                DTm = DTin
-            else:
-                DTm = (DTin-DTout)/log(DTin/DTout)
+        if self.kwargs["flujo"]:
+            DTin = abs(inAnnulli.T-inTube.T)
+            DTout = abs(self.kwargs["tubeTout"]-self.kwargs["annulliTout"])
+        else:
+            DTin = abs(self.kwargs["tubeTout"]-inAnnulli.T)
+            DTout = abs(self.kwargs["annulliTout"]-inTube.T)
+        if DTin == DTout:
+            DTm = DTin
+        else:
+            DTm = (DTin-DTout)/log(DTin/DTout)
 
         self.A = unidades.Area(self.Q/self.U/DTm)
         self.L = unidades.Length(self.A/2/pi)
 
     def Ug(self, hi, ni, ho, no):
         """Calculate global heat transfer coefficient"""
-        Ui = self.De/self.Di/hi/ni
-        Ufi = self.De*self.fi/self.Di/ni
-        k = self.De*log(self.De/self.Di)/2/self.k
-        U = 1/(Ui+Ufi+k+self.fo/no+1/ho/no)
-        Uc = 1/(Ui+k+1/ho/no)
+        U, Uc = self._U(hi, ni, ho, no)
         self.hTube = unidades.HeatTransfCoef(hi)
         self.hAnnulli = unidades.HeatTransfCoef(ho)
         self.U = unidades.HeatTransfCoef(U)
         self.CF = unidades.Dimensionless(U/Uc)
         self.OS = unidades.Dimensionless(Uc*(self.fi+self.fo))
 
+    def _U(self, hi, ni, ho, no):
+        """Return the global heat transfer coefficient with and without
+        fouling, referred to external area of internal pipe"""
+        Ui = self.De/self.Di/hi/ni
+        Ufi = self.De*self.fi/self.Di/ni
+        k = self.De*log(self.De/self.Di)/2/self.k
+        U = 1/(Ui+Ufi+k+self.fo/no+1/ho/no)
+        Uc = 1/(Ui+k+1/ho/no)
+        return U, Uc
+
     def ThermalPhase(self, input, output):
         # Calculate thermal fundamentals
         if input.x == output.x:
@@ -1097,7 +1312,7 @@ class Hairpin(equipment):
         else:
             Nu = h_anulli_Transition(re, pr, a)
 
-        return unidades.HeatTransfCoef(Nu*k/self.Di)
+        return unidades.HeatTransfCoef(Nu*k/dh)
 
     def coste(self):
         self.material = self.kwargs["material"]
@@ -1351,6 +1566,507 @@ class Hairpin(equipment):
         self.salida = [None]
 
 
+# Shell and tube heat exchanger design procedures, the correlations are
+# evaluated with numpy arrays to rate a batch of candidate geometries in
+# each call
+def NuTube(re, pr, D, L, laminar=0, turbulent=4, cold=False):
+    """Nusselt number in tubeside for arrays of Reynolds and Prandtl number
+
+    Parameters
+    ----------
+    re : array
+        Reynolds number, [-]
+    pr : array
+        Prandtl number, [-]
+    D : float
+        Internal diameter of tube, [m]
+    L : float
+        Tube length, [m]
+    laminar : int
+        Index of correlation in laminar flow, same options of
+        tubesideLaminar kwarg of :class:`Hairpin`
+    turbulent : int
+        Index of correlation in turbulent flow, same options of
+        tubesideTurbulent kwarg of :class:`Hairpin`
+    cold : boolean
+        The tubeside fluid is heated, used in Dittus-Boelter correlation
+
+    Notes
+    -----
+    The natural convection in laminar flow is neglected and the VDI
+    correlation for tube banks is replaced by Gnielinski
+    """
+    gz = re*pr*D/L
+    with errstate(all="ignore"):
+        if laminar == 0:
+            lam = h_tubeside_laminar_Eubank_Proctor(
+                Pr=pr, Gz=gz, Gr=0, D=D, L=L)
+        elif laminar == 1:
+            lam = h_tubeside_laminar_VDI(Re=re, Pr=pr, D=D, L=L)
+        elif laminar == 2:
+            lam = h_tubeside_laminar_Hausen(Gz=gz)
+        else:
+            lam = h_tubeside_laminar_Sieder_Tate(Gz=gz, Gr=0)
+
+        if turbulent == 0:
+            turb = h_tubeside_turbulent_Sieder_Tate(Re=re, Pr=pr)
+        elif turbulent == 1:
+            turb = h_tubeside_turbulent_Colburn(Re=re, Pr=pr)
+        elif turbulent == 2:
+            turb = h_tubeside_turbulent_Dittus_Boelter(
+                Re=re, Pr=pr, calentamiento=cold)
+        elif turbulent == 3:
+            turb = h_tubeside_turbulent_ESDU(Re=re, Pr=pr)
+        else:
+            turb = h_tubeside_turbulent_Gnielinski(Re=re, Pr=pr, D=D, L=L)
+    return where(re < 2300, lam, turb)
+
+
+# Coefficients of ideal tube bank correlations for j and f factor used in
+# Bell-Delaware method, Serth Table 6.1, one row for each tube layout (30º,
+# 45º, 90º) and one column for each Reynolds range limited by _BD_Re
+_BD_Re = [10, 100, 1000, 10000]
+_BD_a1 = array([[1.4, 1.36, 0.593, 0.321, 0.321],
+                [1.55, 0.498, 0.73, 0.37, 0.37],
+                [0.97, 0.9, 0.408, 0.107, 0.37]])
+_BD_a2 = array([[-0.667, -0.657, -0.477, -0.388, -0.388],
+                [-0.667, -0.656, -0.5, -0.396, -0.396],
+                [-0.667, -0.631, -0.46, -0.266, -0.395]])
+_BD_a34 = array([[1.45, 0.519], [1.93, 0.5], [1.187, 0.37]])
+_BD_b1 = array([[48., 45.1, 4.57, 0.486, 0.372],
+                [32., 26.2, 3.5, 0.333, 0.303],
+                [35., 32.1, 6.09, 0.0815, 0.391]])
+_BD_b2 = array([[-1., -0.973, -0.476, -0.152, -0.123],
+                [-1., -0.913, -0.476, -0.136, -0.126],
+                [-1., -0.963, -0.602, 0.022, -0.148]])
+_BD_b34 = array([[7., 0.5], [6.59, 0.52], [6.3, 0.378]])
+
+# Index of layout in coefficient tables for each tube distribution, the
+# rotated triangular layout use the triangular coefficients
+_BD_layout = array([0, 1, 0, 2])
+
+
+def BellDelaware(mo, rho, mu, cp, Pr, DShell, DeTube, NTube, pitch, layout,
+                 LTube, baffleSpacing, baffleCut, baffleSpacingIn=0,
+                 baffleSpacingOut=0, clearanceTubeBaffle=0,
+                 clearanceShellBaffle=0, clearanceShellBundle=0,
+                 sealingStrips=0, fi=1):
+    """Shellside heat transfer coefficient and pressure drop of segmental
+    baffled shell and tube heat exchanger with the Bell-Delaware method,
+    Serth Cap. 6
+
+    All the geometric parameters can be numpy arrays, so the method rate a
+    batch of candidate geometries in a single call
+
+    Parameters
+    ----------
+    mo : float
+        Shellside mass flow, [kg/s]
+    rho : float
+        Shellside fluid density, [kg/m³]
+    mu : float
+        Shellside fluid viscosity, [Pa·s]
+    cp : float
+        Shellside fluid heat capacity, [J/kg·K]
+    Pr : float
+        Shellside fluid Prandtl number, [-]
+    DShell : array
+        Shell internal diameter, [m]
+    DeTube : array
+        Tube external diameter, [m]
+    NTube : array
+        Tube count, [-]
+    pitch : array
+        Tube pitch, [m]
+    layout : array
+        Tube distribution, same options of distribucionTube kwarg of
+        :class:`Shell_Tube`
+    LTube : array
+        Tube length, [m]
+    baffleSpacing : array
+        Central baffle spacing, [m]
+    baffleCut : array
+        Baffle cut as fraction of shell diameter, [-]
+    baffleSpacingIn : array
+        Inlet baffle spacing, default the central spacing, [m]
+    baffleSpacingOut : array
+        Outlet baffle spacing, default the central spacing, [m]
+    clearanceTubeBaffle : array
+        Radial clearance between tube and baffle hole, [m]
+    clearanceShellBaffle : array
+        Radial clearance between shell and baffle, [m]
+    clearanceShellBundle : array
+        Radial clearance between shell and tube bundle, [m]
+    sealingStrips : array
+        Pairs of sealing strips, [-]
+    fi : float
+        Viscosity correction factor (mu/mu_w)**0.14, [-]
+
+    Returns
+    -------
+    prop : dict
+        Dict with the heat transfer coefficient "h", the pressure drop "DP",
+        the pressure drop in crossflow "DPc", windows "DPw" and end zones
+        "DPe" and the correction factors "Jc", "Jl", "Jb", "Jr", "Js"
+
+    Examples
+    --------
+    Rating of four baffle spacing in a single call, the result is the same
+    of each geometry rated alone
+
+    >>> kw = {"mo": 20, "rho": 800, "mu": 1e-3, "cp": 2200, "Pr": 10,
+    ...       "DShell": 0.5, "DeTube": 0.01905, "NTube": 300,
+    ...       "pitch": 0.0254, "layout": 3, "LTube": 5, "baffleCut": 0.25,
+    ...       "clearanceTubeBaffle": 4e-4, "clearanceShellBaffle": 2e-3,
+    ...       "clearanceShellBundle": 6e-3}
+    >>> B = array([0.1, 0.2, 0.3, 0.5])
+    >>> batch = BellDelaware(baffleSpacing=B, **kw)
+    >>> print(" ".join("%0.1f" % h for h in batch["h"]))
+    2083.5 1835.1 1538.3 1178.3
+    >>> print(" ".join("%0.0f" % dp for dp in batch["DP"]))
+    108932 31810 14829 5367
+    >>> single = BellDelaware(baffleSpacing=0.3, **kw)
+    >>> "%0.1f %0.0f" % (single["h"], single["DP"])
+    '1538.3 14829'
+    """
+    DShell, DeTube, NTube, pitch, LTube, B, Bc = [
+        asarray(x, dtype=float) for x in (
+            DShell, DeTube, NTube, pitch, LTube, baffleSpacing, baffleCut)]
+    layout = asarray(layout, dtype=int)
+    Bin = where(asarray(baffleSpacingIn) > 0, baffleSpacingIn, B)
+    Bout = where(asarray(baffleSpacingOut) > 0, baffleSpacingOut, B)
+
+    # Pitch parallel to flow direction and effective pitch in crossflow
+    angle = array([30, 45, 60, 90])[layout]*pi/180
+    Pt_ = where(layout < 3, pitch*cos(angle), pitch)
+    Ptef = where((layout == 1) | (layout == 2), pitch/2**0.5, pitch)
+
+    # Tube rows crossed in crossflow and windows sections
+    Nc = DShell*(1-2*Bc)/Pt_
+    Ncw = 0.8*Bc*DShell/Pt_
+
+    # Flow areas
+    Dotl = DShell-2*clearanceShellBundle
+    Dctl = Dotl-DeTube
+    Sm = B*(DShell-Dotl+Dctl/Ptef*(pitch-DeTube))
+    tita_ctl = 2*arccos(DShell*(1-2*Bc)/Dctl)
+    Fc = 1+1./pi*(sin(tita_ctl)-tita_ctl)
+    Fw = 1./2/pi*(tita_ctl-sin(tita_ctl))
+    Stb = pi/8*((DeTube+2*clearanceTubeBaffle)**2-DeTube**2)*NTube*(1+Fc)
+    tita_ds = 2*arccos(1-2*Bc)
+    Ssb = DShell*clearanceShellBaffle*(pi-0.5*tita_ds)
+    Sb = B*(DShell-Dotl)
+    Sw = 1./8*DShell**2*(tita_ds-sin(tita_ds))-1./4*NTube*Fw*pi*DeTube**2
+    Dw = 4*Sw/(pi*DeTube*NTube*Fw+DShell*tita_ds/2)
+
+    G = mo/Sm
+    Re = DeTube*G/mu
+    laminar = Re < 100
+
+    # Ideal tube bank j and f factors
+    row = _BD_layout[layout]
+    col = digitize(Re, _BD_Re)
+    a = _BD_a34[row, 0]/(1+0.14*Re**_BD_a34[row, 1])
+    b = _BD_b34[row, 0]/(1+0.14*Re**_BD_b34[row, 1])
+    j = _BD_a1[row, col]*(1.33*DeTube/pitch)**a*Re**_BD_a2[row, col]
+    f = _BD_b1[row, col]*(1.33*DeTube/pitch)**b*Re**_BD_b2[row, col]
+
+    # Baffle cut correction factor
+    Jc = 0.55+0.72*Fc
+
+    # Baffle leakage correction factors
+    with errstate(invalid="ignore", divide="ignore"):
+        rs = where(Ssb+Stb > 0, Ssb/(Ssb+Stb), 0)
+    rl = (Ssb+Stb)/Sm
+    Jl = 0.44*(1-rs)+(1-0.44*(1-rs))*exp(-2.2*rl)
+    Rl = exp(-1.33*(1+rs)*rl**(0.8-0.15*(1+rs)))
+
+    # Bundle bypass correction factors
+    rss = sealingStrips/Nc
+    Cj = where(laminar, 1.35, 1.25)
+    Cr = where(laminar, 4.5, 3.7)
+    ss = where(rss < 0.5, 1-(2*minimum(rss, 0.5))**(1./3), 0)
+    Jb = exp(-Cj*Sb/Sm*ss)
+    Rb = exp(-Cr*Sb/Sm*ss)
+
+    # Unequal end baffle spacing correction factors
+    nb = maximum((LTube-Bin-Bout)/B+1, 1)
+    n1 = where(laminar, 1./3, 0.6)
+    n2 = where(laminar, 1., 0.2)
+    Js = (nb-1+(Bin/B)**(1-n1)+(Bout/B)**(1-n1))/(nb-1+Bin/B+Bout/B)
+    Rs = 0.5*((B/Bin)**(2-n2)+(B/Bout)**(2-n2))
+
+    # Adverse temperature gradient correction factor in laminar flow
+    Nct = (nb+1)*(Nc+Ncw)
+    Jr20 = minimum((10/Nct)**0.18, 1)
+    Jr = where(Re <= 20, Jr20,
+               where(Re >= 100, 1, Jr20+(1-Jr20)*(Re-20)/80))
+
+    hid = j*cp*G*fi/Pr**(2./3)
+    h = hid*Jc*Jl*Jb*Jr*Js
+
+    DPideal = 2*f*Nc*G**2/rho/fi
+    DPc = (nb-1)*DPideal*Rl*Rb
+    DPwt = (2+0.6*Ncw)*mo**2/2/rho/Sm/Sw
+    DPwl = 26*mu*mo/rho/(Sm*Sw)**0.5*(Ncw/(pitch-DeTube)+B/Dw**2) + \
+        mo**2/rho/Sm/Sw
+    DPw = nb*where(laminar, DPwl, DPwt)*Rl
+    DPe = 2*DPideal*(1+Ncw/Nc)*Rb*Rs
+
+    return {"h": h, "DP": DPc+DPw+DPe, "DPc": DPc, "DPw": DPw, "DPe": DPe,
+            "Re": Re, "Jc": Jc, "Jl": Jl, "Jb": Jb, "Jr": Jr, "Js": Js}
+
+
+def tubeCount(DShell, DeTube, pitch, layout, NPases=1,
+              clearanceShellBundle=0):
+    """Estimate the tube count that fit in a shell, HEDH 3.3.5
+
+    The parameters can be numpy arrays, the pass lanes reduce the count a
+    3% for each additional pass"""
+    Dctl = DShell-2*clearanceShellBundle-DeTube
+    C1 = where((asarray(layout) == 0) | (asarray(layout) == 2), 0.866, 1.)
+    N = 0.78*Dctl**2/C1/pitch**2*(1-0.03*(asarray(NPases)-1))
+    return floor(maximum(N, 0))
+
+
+def optimizeShellTube(entradaTubo, entradaCarcasa, Q, DShell, DeTube,
+                      pitchRatio=(1.25, ), layout=(0, 3), baffleRatio=(
+                          0.2, 0.3, 0.5, 0.7, 1.), baffleCut=(0.25, ),
+                      NPases=(1, 2, 4), wTube=0.002, kTube=50.,
+                      foulingTube=0., foulingShell=0., clearanceTubeBaffle=0.,
+                      clearanceShellBaffle=0., clearanceShellBundle=0.,
+                      LD=(3, 15), DPTubeMax=None, DPShellMax=None,
+                      workers=0):
+    """Search the geometries of a TEMA E shell and tube heat exchanger to
+    transfer the heat Q between the streams, all the combinations of the
+    geometric parameters are rated and the Pareto set of area versus tube
+    and shell pressure drop is returned
+
+    The fluid properties are evaluated at the mean temperature of each
+    stream, so it's a model for sensible heat services. The tube count of
+    each geometry is estimated with :func:`tubeCount` and the tube length is
+    the necessary to get the heat transfer area. The shellside is rated with
+    :func:`BellDelaware`.
+
+    Parameters
+    ----------
+    entradaTubo : Corriente
+        Tubeside inlet stream
+    entradaCarcasa : Corriente
+        Shellside inlet stream
+    Q : float
+        Heat to transfer, [W]
+    DShell : list
+        Shell diameters to study, [m]
+    DeTube : list
+        Tube external diameters to study, [m]
+    pitchRatio : list
+        Tube pitch as ratio of tube diameter, [-]
+    layout : list
+        Tube distributions, same options of distribucionTube kwarg of
+        :class:`Shell_Tube`
+    baffleRatio : list
+        Baffle spacing as ratio of shell diameter, [-]
+    baffleCut : list
+        Baffle cut as fraction of shell diameter, [-]
+    NPases : list
+        Tube passes count, [-]
+    wTube : float
+        Tube wall thickness, [m]
+    kTube : float
+        Tube thermal conductivity, [W/m·K]
+    foulingTube, foulingShell : float
+        Fouling factor at tubeside and shellside, [m²K/W]
+    clearanceTubeBaffle, clearanceShellBaffle, clearanceShellBundle : float
+        Radial clearances used in Bell-Delaware method, [m]
+    LD : tuple
+        Range of ratio between tube length and shell diameter allowed
+    DPTubeMax, DPShellMax : float
+        Maximum pressure drop allowed in tubeside and shellside, [Pa]
+    workers : int
+        Number of process to rate the geometries in parallel, 0 to rate all
+        in current process
+
+    Returns
+    -------
+    pareto : list
+        List of dict with the geometry and the rating of each design in the
+        Pareto set ordered by area
+
+    Examples
+    --------
+    Cooling of water with water
+
+    >>> from lib.corriente import Corriente
+    >>> kw = {"ids": [62], "fraccionMolar": [1.], "MEoS": True,
+    ...       "iapws": False}
+    >>> caliente = Corriente(T=360, P=5e5, caudalMasico=15, **kw)
+    >>> fria = Corriente(T=300, P=3e5, caudalMasico=20, **kw)
+    >>> designs = optimizeShellTube(
+    ...     fria, caliente, 2e6, DShell=[0.4, 0.5, 0.6, 0.7],
+    ...     DeTube=[0.01905, 0.0254], DPTubeMax=7e4, DPShellMax=7e4)
+    >>> best = designs[0]
+    >>> print("%0.1f %0.2f %i %i" % (best["A"], best["DShell"],
+    ...                                best["NTube"], best["NPases"]))
+    20.1 0.40 98 4
+    >>> all(a["A"] <= b["A"] for a, b in zip(designs, designs[1:]))
+    True
+    """
+    # Mean properties of both streams
+    if entradaTubo.T > entradaCarcasa.T:
+        sign = 1
+    else:
+        sign = -1
+    salidaTubo = entradaTubo.clonePh(entradaTubo.h-sign*Q)
+    salidaCarcasa = entradaCarcasa.clonePh(entradaCarcasa.h+sign*Q)
+
+    props = {"Q": Q, "wTube": wTube, "kTube": kTube, "fi": foulingTube,
+             "fo": foulingShell, "cold": sign < 0,
+             "clearanceTubeBaffle": clearanceTubeBaffle,
+             "clearanceShellBaffle": clearanceShellBaffle,
+             "clearanceShellBundle": clearanceShellBundle}
+    for side, entrada, salida in (("tube", entradaTubo, salidaTubo),
+                                  ("shell", entradaCarcasa, salidaCarcasa)):
+        fluid = _fluid(entrada.clone(T=(entrada.T+salida.T)/2))
+        props[side] = {"m": entrada.caudalmasico, "rho": fluid.rho,
+                       "mu": fluid.mu, "cp": fluid.cp, "k": fluid.k,
+                       "Pr": fluid.Prandt}
+
+    # Mean temperature difference with the correction factor for each
+    # passes count, the 1-1 exchanger is in counterflow
+    Tin, Tout = entradaCarcasa.T, salidaCarcasa.T
+    tin, tout = entradaTubo.T, salidaTubo.T
+    DT1, DT2 = abs(Tin-tout), abs(Tout-tin)
+    if DT1 == DT2:
+        LMTD = DT1
+    else:
+        LMTD = (DT1-DT2)/log(DT1/DT2)
+    P = (tout-tin)/(Tin-tin)
+    R = (Tin-Tout)/(tout-tin)
+    props["F"] = {n: 1 if n == 1 else CorrectionFactor(P, R, "1-2TEMAE")
+                  for n in NPases}
+    props["LMTD"] = LMTD
+
+    # Candidate geometries, all the combinations of parameters
+    grid = meshgrid(DShell, DeTube, pitchRatio, layout, baffleRatio,
+                    baffleCut, NPases, indexing="ij")
+    keys = ("DShell", "DeTube", "pitchRatio", "layout", "baffleRatio",
+            "baffleCut", "NPases")
+    geometry = {key: value.ravel() for key, value in zip(keys, grid)}
+    size = geometry["DShell"].size
+
+    if workers:
+        chunk = -(-size//workers)
+        chunks = [{key: value[i:i+chunk] for key, value in geometry.items()}
+                  for i in range(0, size, chunk)]
+        with ProcessPoolExecutor(
+                workers, mp_context=get_context("spawn")) as pool:
+            results = list(pool.map(
+                _rateShellTube, [props]*len(chunks), chunks))
+        rating = {key: concatenate([r[key] for r in results])
+                  for key in results[0]}
+    else:
+        rating = _rateShellTube(props, geometry)
+
+    # Feasible designs
+    ratio = rating["L"]/rating["DShell"]
+    valid = (rating["NTube"] > 0) & (rating["F"] > 0.75) & \
+        isfinite(rating["A"]) & (ratio >= LD[0]) & (ratio <= LD[1])
+    if DPTubeMax:
+        valid &= rating["DPTube"] <= DPTubeMax
+    if DPShellMax:
+        valid &= rating["DPShell"] <= DPShellMax
+
+    index = nonzero(valid)[0]
+    objectives = column_stack(
+        [rating[key][index] for key in ("A", "DPTube", "DPShell")])
+    index = index[pareto(objectives)]
+    index = index[argsort(rating["A"][index])]
+    return [{key: value[i].item() for key, value in rating.items()}
+            for i in index]
+
+
+def _rateShellTube(props, geometry):
+    """Rate a batch of shell and tube geometries, the tube length is
+    iterated to get the area necessary for the heat transfer"""
+    tube = props["tube"]
+    shell = props["shell"]
+    Ds = geometry["DShell"]
+    Do = geometry["DeTube"]
+    Di = Do-2*props["wTube"]
+    pitch = geometry["pitchRatio"]*Do
+    layout = geometry["layout"].astype(int)
+    Np = geometry["NPases"]
+    B = geometry["baffleRatio"]*Ds
+    F = array([props["F"][n] for n in Np], dtype=float)
+
+    Nt = tubeCount(Ds, Do, pitch, layout, Np, props["clearanceShellBundle"])
+    with errstate(all="ignore"):
+        G = tube["m"]/(Nt/Np*pi/4*Di**2)
+        Re = G*Di/tube["mu"]
+        V = G/tube["rho"]
+
+        L = 5*Ds
+        for i in range(5):
+            Nu = NuTube(Re, tube["Pr"], Di, L, cold=props["cold"])
+            hi = Nu*tube["k"]/Di
+            bd = BellDelaware(
+                shell["m"], shell["rho"], shell["mu"], shell["cp"],
+                shell["Pr"], Ds, Do, Nt, pitch, layout, L, B,
+                geometry["baffleCut"],
+                clearanceTubeBaffle=props["clearanceTubeBaffle"],
+                clearanceShellBaffle=props["clearanceShellBaffle"],
+                clearanceShellBundle=props["clearanceShellBundle"])
+            U = 1/(Do/Di/hi+Do/Di*props["fi"]+Do*log(Do/Di)/2/props["kTube"] +
+                   props["fo"]+1/bd["h"])
+            A = props["Q"]/U/F/props["LMTD"]
+            L = A/Nt/pi/Do
+
+        # Darcy friction factor, Petukhov correlation in turbulent flow,
+        # and four velocity heads for return losses in each pass
+        f = where(Re < 2300, 64/Re, (0.79*log(Re)-1.64)**-2)
+        DPTube = Np*(f*L/Di+4)*tube["rho"]*V**2/2
+
+    return {"DShell": Ds, "DeTube": Do, "pitch": pitch, "layout": layout,
+            "baffleSpacing": B, "baffleCut": geometry["baffleCut"],
+            "NPases": Np, "NTube": Nt, "L": L, "A": A, "U": U, "F": F,
+            "hTube": hi, "hShell": bd["h"], "VTube": V, "DPTube": DPTube,
+            "DPShell": bd["DP"]}
+
+
+def pareto(points):
+    """Return the index of points not dominated by other point, all the
+    objectives are minimized
+
+    >>> pareto(array([[1, 3], [2, 2], [3, 1], [3, 3], [2, 4]]))
+    array([0, 1, 2])
+    """
+    points = asarray(points)
+    dominated = zeros(len(points), dtype=bool)
+    for i, point in enumerate(points):
+        if dominated[i]:
+            continue
+        worse = (points >= point).all(axis=1) & (points > point).any(axis=1)
+        dominated |= worse
+    return nonzero(~dominated)[0]
+
+
+def _darcy(Re, eD, *args):
+    """Darcy friction factor, f_friccion return the fanning value in laminar
+    flow"""
+    f = where(asarray(Re) < 2100, 4, 1)*f_friccion(Re, eD, *args)
+    if f.ndim:
+        return f
+    return float(f)
+
+
+def _fluid(state):
+    """Return the phase of stream used for the transport properties"""
+    if state.x < 1:
+        return state.Liquido
+    return state.Gas
+
+
 class Shell_Tube(equipment):
     """Clase que define un cambiador de calor de carcasa y tubos
 
@@ -1681,7 +2397,7 @@ class Shell_Tube(equipment):
             if self.kwargs["shellsideSensible"] == 0:
                 h, DP = self.h_shellside_turbulent_Stream_Analysis()
             elif self.kwargs["shellsideSensible"] == 1:
-                self.h_shellside_turbulent_Bell_Delaware()
+                h, DP = self.h_shellside_turbulent_Bell_Delaware()
             else:
                 h = self.h_shelside_turbulent_Kern()
 
@@ -1718,232 +2434,34 @@ class Shell_Tube(equipment):
         """Coeficiente de transferencia de calor por calor sensible en el parte de la carcasa en regimen turbulento
         Serth - Process Heat Transfer - Principles and applications Cap. 6
         """
-        fi = 1
-
-        P = self.kwargs["pitch"]/self.kwargs["DeTube"]
+        fluid = self.kwargs["entradaCarcasa"].Liquido
         mo = self.kwargs["entradaCarcasa"].caudalmasico
-        if self.kwargs["distribucionTube"] == 2:
-            Ptef = self.kwargs["pitch"]/2**0.5
-        else:
-            Ptef = self.kwargs["pitch"]
-
-        if self.kwargs["distribucionTube"] < 3:
-            tita_tp = unidades.Angle([30, 45, 60][self.kwargs["distribucionTube"]], "deg")
-            Pt_ = self.kwargs["pitch"]*cos(tita_tp)
-        else:
-            Pt_ = self.kwargs["pitch"]
-        Nc = self.kwargs["DShell"]*(1-2*self.kwargs["baffleCut"])/Pt_
-        Ncw = 0.8*self.kwargs["baffleCut"]*self.kwargs["DShell"]/Pt_
-
-        Dotl = self.kwargs["DShell"]-2*self.kwargs["clearanceShellBundle"]
-        Sm = self.kwargs["baffleSpacing"]*(self.kwargs["DShell"]-Dotl+(Dotl-self.kwargs["DeTube"])/Ptef*(self.kwargs["pitch"]-self.kwargs["DeTube"]))
-
-        G = mo/Sm
-        Re = self.kwargs["DeTube"]*G/self.kwargs["entradaCarcasa"].Liquido.mu
-        Pr = self.kwargs["entradaCarcasa"].Liquido.Pr
-        rho = self.kwargs["entradaCarcasa"].Liquido.rho
-        cp = self.kwargs["entradaCarcasa"].Liquido.cp
-
-        Dctl = Dotl-self.kwargs["DeTube"]
-        tita_ctl = 2*arccos(self.kwargs["DShell"]*(1-2*self.kwargs["baffleCut"])/Dctl)
-        Fc = 1+1./pi*(sin(tita_ctl)-tita_ctl)
-        Fw = 1./2/pi*(tita_ctl-sin(tita_ctl))
-        Stb = pi/8*((self.kwargs["DeTube"]+2*self.kwargs["clearanceTubeBaffle"])**2-self.kwargs["DeTube"]**2)*self.kwargs["NTube"]*(1+Fc)
-
-        tita_ds = 2*arccos(1-2*self.kwargs["baffleCut"])
-        Ssb = self.kwargs["DShell"]*self.kwargs["clearanceShellBaffle"]*(pi-0.5*tita_ds)
-
-        Sb = self.kwargs["baffleSpacing"]*(self.kwargs["DShell"]-Dotl)
-        Sw = 1./8*self.kwargs["DShell"]**2*(tita_ds-sin(tita_ds))-1./4*self.kwargs["NTube"]*Fw*pi*self.kwargs["DeTube"]**2
-        Dw = 4*Sw/(pi*self.kwargs["DeTube"]*self.kwargs["NTube"]*0.5*(1-Fc)+self.kwargs["DShell"]*tita_ds)
-
-        Jc = 0.55+0.72*Fc
-
-        rs = Ssb/(Ssb+Stb)
-        rl = (Ssb+Stb)/Sm
-        Jl = 0.44*(1-rs)+(1-0.44*(1-rs))*exp(-2.2*rl)
-        Rl = exp(-1.33*(1+rs)*rl**(0.8-0.15*(1+rs)))
-
-        rss = self.kwargs["sealingStrips"]/Nc
-        if rss < 0.5:
-            if Re < 100:
-                Cj = 1.35
-                Cr = 4.5
-            else:
-                Cj = 1.25
-                Cr = 3.7
-            Jb = exp(-Cj*Sb/Sm*(1-(2*rss)**(1./3)))
-            Rb = exp(-Cr*Sb/Sm*(1-(2*rss)**(1./3)))
-        else:
-            Jb = 1.
-            Rb = 1.
-
-        if Re < 100:
-            n1 = 1./3
-            n2 = 1.
-        else:
-            n1 = 0.6
-            n2 = 0.2
-        nb = self.kwargs["LTube"]/self.kwargs["baffleSpacing"]
-        if self.kwargs["baffleSpacingIn"] > self.kwargs["baffleSpacing"]:
-            nb += 1
-        if self.kwargs["baffleSpacingOut"] > self.kwargs["baffleSpacing"]:
-            nb += 1
-        Js = (nb-1+(self.kwargs["baffleSpacingIn"]/self.kwargs["baffleSpacing"])**(1-n1)+(self.kwargs["baffleSpacingOut"]/self.kwargs["baffleSpacing"])**(1-n1))/(nb-1+(self.kwargs["baffleSpacingIn"]/self.kwargs["baffleSpacing"])+self.kwargs["baffleSpacingOut"]/self.kwargs["baffleSpacing"])
-        Rs = 0.5*((self.kwargs["baffleSpacing"]/self.kwargs["baffleSpacingIn"])**(2-n2)+(self.kwargs["baffleSpacing"]/self.kwargs["baffleSpacingOut"])**(2-n2))
-
-        Nct = (nb+1)*(Nc+Ncw)
-        if Re <= 20:
-            Jr = (10/Nct)**0.18
-        elif Re >= 100:
-            Jr = 1.
-        else:  # Interpolacion entre los valores de arriba
-            Jr = 0.853379+0.0014662*Re
-
-        if self.kwargs["distribucionTube"] == 1:
-            a3, a4 = 0, 0
-            if Re < 10:
-                a1 = 1.55
-                a2 = -0.667
-            elif Re < 100:
-                a1 = 0.498
-                a2 = -0.656
-            elif Re < 1000:
-                a1 = 0.73
-                a2 = -0.500
-            elif Re < 10000:
-                a1 = 0.37
-                a2 = -0.396
-            else:
-                a1 = 0.37
-                a2 = -0.396
-                a3 = 1.93
-                a4 = 0.5
-        elif self.kwargs["distribucionTube"] == 3:
-            a3, a4 = 0, 0
-            if Re < 10:
-                a1 = 0.97
-                a2 = -0.667
-            elif Re < 100:
-                a1 = 0.9
-                a2 = -0.631
-            elif Re < 1000:
-                a1 = 0.408
-                a2 = -0.46
-            elif Re < 10000:
-                a1 = 0.107
-                a2 = -0.266
-            else:
-                a1 = 0.37
-                a2 = -0.395
-                a3 = 1.187
-                a4 = 0.37
-        else:
-            a3, a4 = 0, 0
-            if Re < 10:
-                a1 = 1.4
-                a2 = -0.667
-            elif Re < 100:
-                a1 = 1.36
-                a2 = -0.657
-            elif Re < 1000:
-                a1 = 0.593
-                a2 = -0.477
-            elif Re < 10000:
-                a1 = 0.321
-                a2 = -0.388
-            else:
-                a1 = 0.321
-                a2 = -0.388
-                a3 = 1.45
-                a4 = 0.519
-
-        if self.kwargs["distribucionTube"] == 1:
-            b3, b4 = 0, 0
-            if Re < 10:
-                b1 = 32
-                b2 = -1.
-            elif Re < 100:
-                b1 = 26.2
-                b2 = -0.913
-            elif Re < 1000:
-                b1 = 3.5
-                b2 = -0.476
-            elif Re < 10000:
-                b1 = 0.333
-                b2 = -0.136
-            else:
-                b1 = 0.303
-                b2 = -0.126
-                b3 = 6.59
-                b4 = 0.52
-        elif self.kwargs["distribucionTube"] == 3:
-            b3, b4 = 0, 0
-            if Re < 10:
-                b1 = 35.0
-                b2 = -1.
-            elif Re < 100:
-                b1 = 32.1
-                b2 = -0.963
-            elif Re < 1000:
-                b1 = 6.09
-                b2 = -0.602
-            elif Re < 10000:
-                b1 = 0.0815
-                b2 = 0.022
-            else:
-                b1 = 0.391
-                b2 = -0.148
-                b3 = 6.3
-                b4 = 0.378
-        else:
-            b3, b4 = 0, 0
-            if Re < 10:
-                b1 = 48.0
-                b2 = -1.
-            elif Re < 100:
-                b1 = 45.1
-                b2 = -0.973
-            elif Re < 1000:
-                b1 = 4.570
-                b2 = -0.476
-            elif Re < 10000:
-                b1 = 0.486
-                b2 = -0.152
-            else:
-                b1 = 0.372
-                b2 = -0.123
-                b3 = 7.0
-                b4 = 0.5
-
-        a = a3/(1+0.14*Re**a4)
-        b = b3/(1+0.14*Re**b4)
-
-        j = a1*(1.33/P)**a*Re**a2
-        f = b1*(1.33/P)**b*Re**b2
-        hid = j*cp*G*fi/Pr**(2./3)
-        h = unidades.HeatTransfCoef(hid*Jc*Jl*Jb*Jr*Js)
-
-        DPideal = 2*f*Nc*G**2/g/rho/fi
-        DPc = (nb-1)*DPideal*Rl*Rb
-        if Re > 100:
-            DPwideal = (2+0.6*Ncw)*mo**2/2/g/rho/Sm/Sw
-        else:
-            DPwideal = 26*nu*mo/g/(Sm*Sw)**0.5*(Ncw/P+self.kwargs["baffleCut"]*self.kwargs["DShell"]/Dw**2)+mo**2/g/rho/Sm/Sw
-        DPw = nb*DPwideal*Rl
-        DPe = 2*DPideal*(1+Ncw/Nc)*Rb*Rs
-
-        mon = mo/self.kwargs["parallel"]
-
+        bd = BellDelaware(
+            mo, fluid.rho, fluid.mu, fluid.cp, fluid.Prandt,
+            self.kwargs["DShell"], self.kwargs["DeTube"],
+            self.kwargs["NTube"], self.kwargs["pitch"],
+            self.kwargs["distribucionTube"], self.kwargs["LTube"],
+            self.kwargs["baffleSpacing"], self.kwargs["baffleCut"],
+            self.kwargs["baffleSpacingIn"], self.kwargs["baffleSpacingOut"],
+            self.kwargs["clearanceTubeBaffle"],
+            self.kwargs["clearanceShellBaffle"],
+            self.kwargs["clearanceShellBundle"], self.kwargs["sealingStrips"])
+        h = unidades.HeatTransfCoef(bd["h"])
+
+        # Nozzles, one velocity head in turbulent flow and two in laminar
+        mon = mo/max(self.kwargs["parallel"], 1)
         DPn = 0
-        for D in self.kwargs["nozzleInShellsideDiameter"], self.kwargs["nozzleOutShellsideDiameter"]:
-            Ren = D*mon/self.kwargs["entradaCarcasa"].Liquido.mu
-            Sn = pi/4*D**2
-            if Ren > 100:
-                DPn += 2e-13*self.kwargs["serie"]*mon**2/Sn
-            else:
-                DPn += 4e-13*self.kwargs["serie"]*mon**2/Sn
-        DP = unidades.DeltaP(DPc+DPw+DPe+DPn)
+        for D in (self.kwargs["nozzleInShellsideDiameter"],
+                  self.kwargs["nozzleOutShellsideDiameter"]):
+            if D:
+                Ren = 4*mon/pi/D/fluid.mu
+                V = mon/fluid.rho/(pi/4*D**2)
+                if Ren > 100:
+                    K = 1
+                else:
+                    K = 2
+                DPn += max(self.kwargs["serie"], 1)*K*fluid.rho*V**2/2
+        DP = unidades.DeltaP(bd["DP"]+DPn)
         return h, DP
 
     @staticmethod
@@ -2099,78 +2617,6 @@ class Refrigeration(equipment):
         self.C_inst = C_inst
 
 
-def unsteady():
-#========================================================================
-#Input constants
-#========================================================================
-    dtau = 0.001 # Set dimensionless time increments
-    dx = 0.05 # Set dimensionless length increments
-    Tmax = 0.95 # Set maximum dimensionless temperature
-    M = 21 # Counter for length discretization
-#========================================================================
-#Calculate parameters
-#========================================================================
-    dx = 1.0/(M-1)
-    dx_x = 1.0/(M-1)
-    ratio = dtau/(dx**2)
-    const = 1.0 - 2.0*ratio
-#========================================================================
-#Set counters to zero
-#========================================================================
-    i = 0
-    tau = 0.0
-#========================================================================
-# Set up arrays for solution and print
-#========================================================================
-    Tnew = zeros(M, dtype = float)
-    T = zeros(M, dtype = float)
-    T[0] = 1.0
-    T[-1] = 1.0
-    print(("T initial = ", T))
-#========================================================================
-# I just pick 400 on trial and error for the total array
-#========================================================================
-    T_sol = zeros((400,M), dtype = float)
-    T_sol[:,0] = 1.0
-    T_sol[:,-1] = 1.0
-#========================================================================
-# While loop to iterate until mid-point temperature reaches Tmax
-#========================================================================
-    while T[10] < Tmax:
-        i = i + 1
-        tau = tau + dtau
-#========================================================================
-# Calculate new tempertures
-#========================================================================
-        for j in range(1,M-1):
-            Tnew[j] = ratio*(T[j-1] + T[j+1]) + const*T[j]
-#========================================================================
-# Substitute new Temperatures in array for T
-#========================================================================
-        for k in range(1,M-1):
-            T[k] = Tnew[k]
-            T_sol[i,k] = T[k]
-
-    print(("Tau and T_final =", tau, T_sol[i,:]))
-#========================================================================
-# Set up array for spatial values of x to plot
-#========================================================================
-    x = [i*dx_x for i in range(M-1)]
-    x.append(1.0)
-#========================================================================
-# Plot the solutions
-#=======================================================================
-    plot(x,T_sol[50,:])
-    plot(x,T_sol[100,:])
-    plot(x,T_sol[150,:])
-    plot(x,T_sol[250,:])
-    plot(x,T_sol[i,:])
-#legend(['Tau = 0.5','Tau = 0.1','Tau = 0.15','Tau = 0.25',
-#'Tau = final time'])
-    title('Normalized Slab Temperatures')
-    plt.show()
-    grid()
-
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
@@ -2186,8 +2632,3 @@ if __name__ == "__main__":
     # dotl=unidades.Length(0.5*(19.25-17.91), "inch")
     # cambiador = Shell_Tube(entradaTubo=aguaTubo, entradaCarcasa=aguaCarcasa, shellsideSensible=1, DShell=Ds, NTube=124, DeTube=Do, wTube=0.006, LTube=L, pitch=pt, distribucionTube=3, baffleSpacing=B, baffleSpacingIn=B, baffleSpacingOut=B, baffleCut=0.2, clearanceTubeBaffle=0.0004, clearanceShellBaffle=0.0025279, clearanceShellBundle=dotl, sealingStrips=0.1*9.24)
 
-
-#    from scipy import *
-#    from pylab import *
-#    import matplotlib.pyplot as plt
-#    unsteady()
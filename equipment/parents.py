@@ -25,20 +25,36 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ###############################################################################
 
 
+import copy
 from functools import partial
 import logging
 import os
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
-from lib.config import Entity, IMAGE_PATH
+from lib.config import Entity, getSnapshot, IMAGE_PATH
+from lib.profiling import count, span
 from lib.thread import Evaluate
+from lib.utilities import hashable, LRUCache
 from tools.costIndex import indiceBase, indiceActual
 from UI.texteditor import TextEditor
 from UI.UI_corriente import Ui_corriente
 from UI.widgets import Status
 
 
+def _copy(value):
+    """Copy of a calculated attribute to save in or restore from cache, lists
+    are copied and the entities, as streams, are shallow copied with its own
+    kwargs so a later change of the copy doesn't modify the original"""
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, Entity):
+        entity = copy.copy(value)
+        entity.kwargs = value.kwargs.copy()
+        return entity
+    return value
+
+
 class equipment(Entity):
     """General structure for equipment, each child class must define the
     properties and procedures
@@ -74,6 +90,11 @@ class equipment(Entity):
         propTxt: procedure to define text format for simple text report
         propertiesEquipment: procedure to define output values in a list
          with format (Name, kwargs name, units)
+        cache: Bounded cache with the calculated state of equipments, shared
+         by all equipments, a calculation with the same kwargs, input
+         streams state, cost index and configuration is restored from it
+        cacheExclude: Attributes of instance not saved in cache, the entity
+         definition and metadata, not calculated values
     """
     status = 0
     msg = ""
@@ -90,6 +111,10 @@ class equipment(Entity):
     calculateCostos = ()
     __doi__ = []
     salida = [None]
+    cache = LRUCache(256)
+    cacheExclude = ("kwargs", "_oldkwargs", "kwargs_forbidden",
+                    "kwargsInteger", "TEXT_FORMATING_LENG", "_bool",
+                    "_dependence", "notas", "notasPlain")
 
     def __init__(self, **kwargs):
         """Class constructor, copy kwargs for child class to instance and do
@@ -137,10 +162,61 @@ class equipment(Entity):
                 if self.kwargs[key] != value:
                     kw_new[key] = value
             logging.debug('kwarg; %s' % kw_new)
-            QtWidgets.QApplication.processEvents()
-            self.calculo()
-            if self.statusCoste:
-                self.coste()
+
+            with span(self.__class__.__name__):
+                # Reuse the calculation with the same inputs if it's available
+                key = self.cacheKey()
+                state = self.cache.get(key)
+                if state is not None:
+                    logging.debug('Restored from cache')
+                    count("cache hits")
+                    self._restore(state)
+                    return
+
+                with span("calculo"):
+                    self.calculo()
+                if self.statusCoste:
+                    with span("coste"):
+                        self.coste()
+                self.cache.set(key, self._state())
+
+    def cacheKey(self):
+        """Key with the equipment class, the kwargs, the input streams state,
+        the cost index and the configuration in use, equipments with same key
+        have the same results"""
+        kwargs = {key: value for key, value in self.kwargs.items()
+                  if key != "notas"}
+        costIndex = None
+        if self.indiceCostos:
+            costIndex = (indiceBase[self.indiceCostos],
+                         indiceActual[self.indiceCostos])
+        return (self.__class__.__name__, hashable(kwargs), costIndex,
+                hashable(getSnapshot()))
+
+    def _state(self):
+        """Copy of calculated attributes to save in cache"""
+        state = {}
+        for key, value in self.__dict__.items():
+            if key not in self.cacheExclude:
+                state[key] = _copy(value)
+        return state
+
+    def _restore(self, state):
+        """Restore the calculated attributes from a cache state, the streams
+        are copied so the equipments don't share its outlet streams
+
+        >>> from lib.corriente import Corriente
+        >>> from equipment.pump import Pump
+        >>> st = Corriente(T=300, P=101325, caudalMasico=1, ids=[62],
+        ...                fraccionMolar=[1.])
+        >>> a = Pump(entrada=st, rendimiento=0.75, deltaP=20*101325)
+        >>> a.setNotas("pump A note", "pump A note")
+        >>> b = Pump(entrada=st, rendimiento=0.75, deltaP=20*101325)
+        >>> b.notas, b.salida[0] is a.salida[0], b.power == a.power
+        ('', False, True)
+        """
+        for key, value in state.items():
+            self.__dict__[key] = _copy(value)
 
     @property
     def isCalculable(self):
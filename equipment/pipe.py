@@ -25,14 +25,22 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 import os
 
+from math import exp, floor, log
+
+from numpy import (abs as abs_, arange, array, concatenate, errstate,
+                   maximum, ones, where, zeros)
 from PyQt5.QtWidgets import QApplication
 from scipy.constants import g, pi
+from scipy.integrate import solve_ivp
+from scipy.sparse import csr_matrix, diags
+from scipy.sparse.linalg import spsolve
 
 from lib import unidades
-from lib.friction import f_friccion
+from lib.friction import f_friccion, f_list
+from lib.pipeDatabase import CATALOG
+from lib.thread import checkCancel
 from lib.adimensional import Re
 from equipment.parents import equipment
-from equipment.heatExchanger import Heat_Exchanger
 
 
 class Pipe(equipment):
@@ -47,6 +55,7 @@ class Pipe(equipment):
             3   -   Isothermic gas flow
             4   -   Multiphase flow (Método Baker)
             5   -   Multiphase flow (Método de Beggs and Brill)
+            6   -   Compressible or two phase flow (Homogeneous model)
         thermal: Thermal mode:
             0   -   Adiabatic
             1   -   Fix heat flow
@@ -81,6 +90,9 @@ class Pipe(equipment):
         T_ext: External temperatura of pipe for heat exchanger calculation
         U: Global heat transfer coeficient for pipe wall
         Q: Heat transfered by pipe wall
+        dlnP: Relative pressure step of property table, for methods with
+            integration along pipe
+        dh: Enthalpy step of property table, J/kg
 
     Coste:
         Only available for steal pipes, Ref Darby pag 217
@@ -92,6 +104,18 @@ class Pipe(equipment):
     >>> pipe=Pipe(entrada=agua, metodo=0, l=5, material=material)
     >>> print("%0.4f %6g %6g %6g" % (pipe.Di, pipe.V, pipe.Re, pipe.DeltaP))
     0.1524 0.0626815 9427.99 1.83620
+
+    Long gas line integrated along the pipe, isothermal and adiabatic
+
+    >>> gas = Corriente(T=288, P=70e5, caudalMasico=50, ids=[2], \
+                        fraccionMolar=[1.], MEoS=True, iapws=False)
+    >>> material = pipeMaterial("Steel (ANSI)", "Sch.  40", '20"')
+    >>> for metodo in (3, 6):
+    ...     pipe = Pipe(entrada=gas, metodo=metodo, l=1e5, material=material)
+    ...     print("%0.3f %0.0f %0.2f" % (pipe.Pout.MPa, pipe.DeltaP_v,
+    ...                                  pipe.Tout))
+    4.788 755 288.00
+    4.850 629 278.68
     """
     title = QApplication.translate("pychemqt", "Pipe")
     help = ""
@@ -108,6 +132,8 @@ class Pipe(equipment):
         "T_ext": 0.0,
         "U": 0.0,
         "Q": 0.0,
+        "dlnP": 0.1,
+        "dh": 0.0,
 
         "f_install": 2.8,
         "Base_index": 0.0,
@@ -128,7 +154,9 @@ class Pipe(equipment):
         QApplication.translate("pychemqt", "Isotermic gas flow"),
         QApplication.translate("pychemqt", "Two Phase flow (Baker method)"),
         QApplication.translate("pychemqt",
-                               "Two Phase flow (Beggs and Brill method)"))
+                               "Two Phase flow (Beggs and Brill method)"),
+        QApplication.translate("pychemqt",
+                               "Compressible flow (Homogeneous model)"))
     TEXT_THERMAL = (
         QApplication.translate("pychemqt", "Adiabatic"),
         QApplication.translate("pychemqt", "Heat flux"),
@@ -213,30 +241,152 @@ class Pipe(equipment):
         self.DeltaP_ac = unidades.Pressure(self.K*self.V**2/2*self.rho)
 
         self.f = f_friccion(self.Re, self.eD)
-        self.DeltaP_f = self.__DeltaP_friccion()
-        # TODO:
-        self.DeltaP_v = unidades.Pressure(0)
+        entrada = self.kwargs["entrada"]
+        if self.kwargs["metodo"] in (3, 6):
+            salida = self._march()
+        else:
+            self.DeltaP_f = self.__DeltaP_friccion()
+            # TODO:
+            self.DeltaP_v = unidades.Pressure(0)
 
-        self.DeltaP = unidades.Pressure(self.DeltaP_h + self.DeltaP_ac +
-                                        self.DeltaP_f + self.DeltaP_v)
-        self.DeltaP_100ft = self.DeltaP*100/self.L.ft
-        self.Pout = unidades.Pressure(self.kwargs["entrada"].P-self.DeltaP)
+            self.DeltaP = unidades.Pressure(self.DeltaP_h + self.DeltaP_ac +
+                                            self.DeltaP_f + self.DeltaP_v)
+            self.DeltaP_100ft = self.DeltaP*100/self.L.ft
+            self.Pout = unidades.Pressure(entrada.P-self.DeltaP)
 
-        if self.kwargs["thermal"] == 0:
-            self.Tout = self.kwargs["entrada"].T
-            self.Heat = unidades.Power(0)
-        else:
-            ch = Heat_Exchanger()
-            ch(entrada=self.kwargs["entrada"], modo=self.kwargs["thermal"],
-               Heat=self.kwargs["Q"], deltaP=self.DeltaP, A=self.A,
-               U=self.kwargs["U"], Text=self.kwargs["Text"])
-            self.Tout = ch.salida[0].T
-            self.Heat = ch.Heat
-
-        self.salida = [self.kwargs["entrada"].clone(T=self.Tout, P=self.Pout)]
+            if self.kwargs["thermal"] == 0:
+                self.Heat = unidades.Power(0)
+                salida = entrada.clone(T=entrada.T, P=self.Pout)
+            else:
+                salida = None
+                if self.kwargs["thermal"] == 1:
+                    self.Heat = unidades.Power(self.kwargs["Q"])
+                else:
+                    Text = self.kwargs["T_ext"]
+                    self.Heat = unidades.Power(
+                        self.kwargs["U"]*self.A*(Text-entrada.T))
+
+                    # The outlet temperature can't cross the external
+                    # temperature
+                    limit = entrada.clone(T=Text, P=self.Pout)
+                    if abs(self.Heat) > abs(limit.h-entrada.h):
+                        salida = limit
+                        self.Heat = unidades.Power(salida.h-entrada.h)
+
+                if salida is None:
+                    salida = entrada.clonePh(entrada.h+self.Heat,
+                                             P=self.Pout)
+
+        self.Tout = salida.T
+        self.salida = [salida]
         self.Pin = self.kwargs["entrada"].P
         self.Pout = self.salida[0].P
 
+    def _march(self):
+        r"""Integrate the pressure and enthalpy along the pipe, with the fluid
+        properties interpolated in a cached table, used for isothermal gas
+        flow and for compressible or two phase flow with homogeneous model
+
+        The momentum balance include the acceleration term, so the pressure
+        gradient is:
+
+        .. math::
+            \frac{dP}{dz}=-\frac{\frac{fG^2v}{2D}+\frac{g\sin\theta}{v}
+            +G^2\frac{\partial v}{\partial h}\frac{dh}{dz}}
+            {1+G^2\frac{\partial v}{\partial P}}
+
+        and the integration stop if the denominator vanish, choked flow
+        """
+        entrada = self.kwargs["entrada"]
+        thermal = self.kwargs["thermal"]
+        isothermal = self.kwargs["metodo"] == 3
+        m = entrada.caudalmasico
+        G = m/self.seccion
+        sin = self.kwargs["h"]/self.L
+        Pin = entrada.P-self.DeltaP_ac
+        hin = entrada.h/m
+
+        dh = self.kwargs["dh"]
+        if not dh:
+            # Enthalpy step to cover the heat transfer with a few cells
+            dh = 2000
+            if not isothermal and thermal == 1:
+                dh = max(dh, abs(self.kwargs["Q"])/m/5)
+            elif not isothermal and thermal == 2:
+                limit = entrada.clone(T=self.kwargs["T_ext"])
+                dh = max(dh, abs(limit.h-entrada.h)/m/5)
+        table = PropertyTable(entrada, Pin, self.kwargs["dlnP"], dh,
+                              isothermal)
+
+        # Pressure range reachable in pipe, with the hydrostatic gain in
+        # downward pipes, the trial steps of integrator near the choke point
+        # can overshoot it and evaluate useless cells of table
+        Pmin = 0.01*Pin
+        Pmax = 1.01*Pin+2*g*max(0, -self.kwargs["h"])*self.rho
+
+        def rhs(z, y):
+            P = min(max(y[0], Pmin), Pmax)
+            h = y[1]
+            v, mu, T, x, dvdP, dvdh = table(P, h)
+            Re = G*self.Di/mu
+            if Re < 2100:
+                f = 64/Re
+            else:
+                f = f_friccion(Re, self.eD)
+            dPf = f*G**2*v/2/self.Di
+            dPg = g*sin/v
+
+            if isothermal:
+                dhdz = 0
+            elif thermal == 1:
+                dhdz = self.kwargs["Q"]/m/self.L-g*sin
+            elif thermal == 2:
+                dhdz = self.kwargs["U"]*pi*self.De*(
+                    self.kwargs["T_ext"]-T)/m-g*sin
+            else:
+                dhdz = -g*sin
+            # The denominator is bounded so the trial steps beyond the choke
+            # point don't reverse the pressure gradient
+            dPdz = -(dPf+dPg+G**2*dvdh*dhdz)/max(1+G**2*dvdP, 0.01)
+            return [dPdz, dhdz, dPf, dPg]
+
+        def choke(z, y):
+            return 1+G**2*table(min(max(y[0], Pmin), Pmax), y[1])[4]-0.01
+        choke.terminal = True
+
+        def vacuum(z, y):
+            return y[0]-Pmin
+        vacuum.terminal = True
+
+        sol = solve_ivp(rhs, (0, self.L), [Pin, hin, 0, 0], rtol=1e-6,
+                        atol=[1, 1e-3, 1, 1], events=(choke, vacuum))
+        if sol.status == 1:
+            self.status = 3
+            self.msg = QApplication.translate(
+                "pychemqt", "Choked flow, pipe calculated up to %0.1f m" %
+                sol.t[-1])
+
+        P, h, DPf, DPg = sol.y
+        props = array([table(Pi, hi) for Pi, hi in zip(P, h)])
+        self.z = [unidades.Length(z) for z in sol.t]
+        self.PSegments = [unidades.Pressure(Pi) for Pi in P]
+        self.TSegments = [unidades.Temperature(T) for T in props[:, 2]]
+        self.xSegments = [unidades.Dimensionless(x) for x in props[:, 3]]
+
+        self.Pout = unidades.Pressure(P[-1])
+        self.DeltaP_f = unidades.DeltaP(DPf[-1])
+        self.DeltaP_h = unidades.DeltaP(DPg[-1])
+        self.DeltaP_v = unidades.DeltaP(Pin-P[-1]-DPf[-1]-DPg[-1])
+        self.DeltaP = unidades.DeltaP(entrada.P-P[-1])
+        self.DeltaP_100ft = self.DeltaP*100/self.L.ft
+
+        if isothermal:
+            salida = entrada.clone(T=entrada.T, P=self.Pout)
+        else:
+            salida = entrada.clonePh(h[-1]*m, P=self.Pout)
+        self.Heat = unidades.Power(salida.h-entrada.h)
+        return salida
+
     def __DeltaP_friccion(self):
         """Método para el calculo de la perdida de presión"""
         if self.kwargs["metodo"] == 0:
@@ -520,6 +670,421 @@ class Pipe(equipment):
         return lista
 
 
+class PropertyTable(object):
+    """Cached table of fluid properties in pressure and specific enthalpy,
+    used in the integration along pipes to avoid a stream calculation in
+    each step
+
+    The table is a grid with constant step in logarithm of pressure and in
+    enthalpy, the nodes are calculated only when the integration reach its
+    cell, so only the cells around the path of integration are evaluated,
+    and the properties are interpolated bilinearly in cell. In two phase
+    region the homogeneous model is used, the specific volume with the mass
+    quality and the McAdams mixing rule for viscosity.
+
+    Parameters
+    ----------
+    stream : Corriente
+        Stream with the fluid definition
+    P0 : float
+        Pressure of reference node, [Pa]
+    dlnP : float
+        Step of table in logarithm of pressure
+    dh : float
+        Step of table in specific enthalpy, [J/kg]
+    isothermal : boolean
+        Tabulate only in pressure at the temperature of stream
+
+    Examples
+    --------
+    >>> from lib.corriente import Corriente
+    >>> agua = Corriente(T=300, P=5e5, caudalMasico=1, ids=[62],
+    ...                  fraccionMolar=[1.], MEoS=True, iapws=False)
+    >>> table = PropertyTable(agua, 5e5, dh=2e5)
+    >>> h = agua.h/agua.caudalmasico+5e5
+    >>> v, mu, T, x, dvdP, dvdh = table(1.5e5, h)
+    >>> "%0.1f %0.3f %i" % (T, x, len(table.nodes))
+    '384.5 0.066 4'
+    """
+
+    def __init__(self, stream, P0, dlnP=0.1, dh=2000, isothermal=False):
+        self.stream = stream
+        self.P0 = P0
+        self.h0 = stream.h/stream.caudalmasico
+        self.dlnP = dlnP
+        self.dh = dh
+        self.isothermal = isothermal
+        self.nodes = {}
+
+    def node(self, i, j):
+        """Return the properties in node i, j of table, calculated if it
+        isn't cached"""
+        if (i, j) not in self.nodes:
+            P = self.P0*exp(-i*self.dlnP)
+            if self.isothermal:
+                state = self.stream.clone(T=self.stream.T, P=P)
+            else:
+                h = (self.h0+j*self.dh)*self.stream.caudalmasico
+                state = self.stream.clonePh(h, P=P)
+
+            if 0 < state.x < 1:
+                x = state.Gas.caudalmasico/state.caudalmasico
+                v = x/state.Gas.rho+(1-x)/state.Liquido.rho
+                mu = 1/(x/state.Gas.mu+(1-x)/state.Liquido.mu)
+            else:
+                x = state.x
+                fluid = state.Liquido if state.x < 1 else state.Gas
+                v = 1/fluid.rho
+                mu = fluid.mu
+            self.nodes[(i, j)] = array((v, mu, state.T, x), dtype=float)
+        return self.nodes[(i, j)]
+
+    def __call__(self, P, h):
+        """Interpolate the properties at pressure P and specific enthalpy h
+
+        Returns
+        -------
+        v : float
+            Specific volume, [m³/kg]
+        mu : float
+            Viscosity, [Pa·s]
+        T : float
+            Temperature, [K]
+        x : float
+            Mass quality, [-]
+        dvdP : float
+            Derivative of specific volume with pressure, [m³/kg·Pa]
+        dvdh : float
+            Derivative of specific volume with enthalpy, [m³/J]
+        """
+        u = log(self.P0/P)/self.dlnP
+        i = floor(u)
+        a = u-i
+        if self.isothermal:
+            w = 0
+        else:
+            w = (h-self.h0)/self.dh
+        j = floor(w)
+        b = w-j
+
+        # The nodes with null weight aren't calculated, so a path with
+        # constant enthalpy only evaluate a column of table
+        n00 = self.node(i, j)
+        n10 = self.node(i+1, j)
+        if b:
+            n01 = self.node(i, j+1)
+            n11 = self.node(i+1, j+1)
+            dvdh = ((1-a)*(n01[0]-n00[0])+a*(n11[0]-n10[0]))/self.dh
+        else:
+            n01 = n00
+            n11 = n10
+            dvdh = 0
+        prop = (1-a)*(1-b)*n00+a*(1-b)*n10+(1-a)*b*n01+a*b*n11
+        dvdu = (1-b)*(n10[0]-n00[0])+b*(n11[0]-n01[0])
+        dvdP = -dvdu/P/self.dlnP
+        return prop[0], prop[1], prop[2], prop[3], dvdP, dvdh
+
+
+def pipeMaterial(name, clase, Dn):
+    """Return the material list of a pipe of catalog, in the format used in
+    the material kwarg of :class:`Pipe`
+
+    Parameters
+    ----------
+    name : str
+        Name of material, as in catalog, "Steel (ANSI)"
+    clase : str
+        Class of pipe, as in catalog, "Sch.  40"
+    Dn : str
+        Nominal diameter, as in catalog, '3"'
+
+    Examples
+    --------
+    >>> material = pipeMaterial("Steel (ANSI)", "Sch.  40", '3"')
+    >>> "%0.3f %0.2f %0.2f" % (material[2], material[4], material[6])
+    '0.046 77.93 88.90'
+    """
+    materiales = []
+    for row in CATALOG:
+        if row[1:3] not in materiales:
+            materiales.append(row[1:3])
+        if row[1] == name and row[2].strip() == clase.strip() and \
+                row[5] == Dn:
+            j = [r for r in CATALOG if r[1:3] == row[1:3]].index(row)
+            rugosidad, Dn, w, De, peso = row[3], row[5], row[6], row[7], row[8]
+            Di = De-2*w
+            V = pi/4*Di**2*100/1e6
+            S = pi*De*100/1e3
+            return [name, row[2], rugosidad, Dn, Di, w, De, peso, V, S,
+                    materiales.index(row[1:3]), j]
+    raise ValueError("Pipe %s %s %s not found in catalog" % (name, clase, Dn))
+
+
+class PipeNetwork(object):
+    """Incompressible flow in a pipe network with loops
+
+    The network is defined by nodes, with fixed pressure or with a mass flow
+    consumption, and pipes between two nodes, with the same material and
+    fittings definition used in :class:`Pipe`. The node pressures and the
+    pipe flows are solved simultaneously by the global gradient algorithm
+    [1]_, a Newton method where each iteration solve a sparse symmetric
+    system in the unknown node pressures, so the cost scale linearly with the
+    network size.
+
+    Parameters
+    ----------
+    fluido : Corriente
+        Stream with the properties of fluid
+    rho : float
+        Density of fluid, alternative to stream definition, [kg/m³]
+    mu : float
+        Viscosity of fluid, alternative to stream definition, [Pa·s]
+    method : int
+        Index of friction factor correlation, as in
+        :func:`lib.friction.f_friccion`
+    tol : float
+        Relative tolerance in pipe flows
+    maxiter : int
+        Maximum number of iterations
+
+    Notes
+    -----
+    After solve the instance save the results as arrays, in the order the
+    pipes and nodes are defined:
+
+        * P: Pressure of nodes, [Pa]
+        * caudal: Mass flow in pipes, negative for flow from the down node
+          to the up node, [kg/s]
+        * Q: Volumetric flow in pipes, [m³/s]
+        * V: Velocity in pipes, [m/s]
+        * Re: Reynolds number of pipes
+        * f: Darcy friction factor of pipes
+        * DeltaP: Pressure loss by friction and fittings in pipes, [Pa]
+
+    and the convergence diagnostic in status, msg, iterations and err, as
+    in :class:`lib.recycle.Recycle`
+
+    The friction factor is interpolated linearly between the laminar value
+    at Re=2100 and the turbulent correlation at Re=4000, so the pipes with
+    low flow don't oscillate between regimes in the iteration
+
+    References
+    ----------
+    .. [1] Todini, E., Pilati, S. A gradient algorithm for the analysis of
+        pipe networks. Computer Applications in Water Supply 1 (1988) 1-20
+
+    Examples
+    --------
+    Single pipe with the pressure loss of Pipe equipment
+
+    >>> from lib.corriente import Corriente
+    >>> agua = Corriente(T=300, P=101325, caudalMasico=10,
+    ...                  fraccionMolar=[1.])
+    >>> material = pipeMaterial("Steel (ANSI)", "Sch.  40", '3"')
+    >>> pipe = Pipe(entrada=agua, l=100, material=material)
+    >>> net = PipeNetwork(agua)
+    >>> net.addNode("1", P=5e5)
+    >>> net.addNode("2", caudal=10)
+    >>> net.addPipe("a", "1", "2", 100, material)
+    >>> net.solve()
+    >>> "%0.1f %0.1f" % (5e5-net.pressure("2"), pipe.DeltaP_f)
+    '54737.1 54737.1'
+
+    Header with a loop, the supply split between the two branches
+
+    >>> net = PipeNetwork(rho=1000, mu=1e-3)
+    >>> net.addNode("supply", P=5e5, z=10)
+    >>> for node, caudal in (("A", 0), ("B", 5), ("C", 8), ("D", 2)):
+    ...     net.addNode(node, caudal=caudal)
+    >>> D4 = pipeMaterial("Steel (ANSI)", "Sch.  40", '4"')
+    >>> D3 = pipeMaterial("Steel (ANSI)", "Sch.  40", '3"')
+    >>> net.addPipe("1", "supply", "A", 50, D4)
+    >>> net.addPipe("2", "A", "B", 100, D3)
+    >>> net.addPipe("3", "A", "D", 80, D3)
+    >>> net.addPipe("4", "B", "C", 120, D3)
+    >>> net.addPipe("5", "D", "C", 60, D3)
+    >>> net.solve()
+    >>> print("%i %i" % (net.status, net.iterations))
+    1 8
+    >>> for pipe in "12345":
+    ...     print("%s %0.3f" % (pipe, net.flow(pipe)))
+    1 15.000
+    2 7.469
+    3 7.531
+    4 2.469
+    5 5.531
+    """
+    METHODS = ["Global gradient algorithm"]
+
+    def __init__(self, fluido=None, rho=None, mu=None, method=0, tol=1e-8,
+                 maxiter=50):
+        if fluido is not None:
+            if fluido.x == 0:
+                rho = fluido.Liquido.rho
+                mu = fluido.Liquido.mu
+            else:
+                rho = fluido.Gas.rho
+                mu = fluido.Gas.mu
+        self.rho = float(rho)
+        self.mu = float(mu)
+        self.method = method
+        self.tol = tol
+        self.maxiter = maxiter
+
+        self.nodes = []
+        self.pipes = []
+        self._node = {}
+        self._nodeData = []
+        self._pipeData = []
+
+        self.status = 0
+        self.msg = ""
+        self.iterations = 0
+        self.err = None
+
+    def addNode(self, name, P=None, z=0, caudal=0):
+        """Add a node to network
+
+        Parameters
+        ----------
+        name : str
+            Name of node
+        P : float
+            Pressure of node, only for nodes with fixed pressure, as
+            supply headers or discharges, [Pa]
+        z : float
+            Elevation of node, [m]
+        caudal : float
+            Mass flow consumption in node, negative for supply, [kg/s]
+        """
+        self._node[name] = len(self.nodes)
+        self.nodes.append(name)
+        self._nodeData.append((P, z, caudal))
+
+    def addPipe(self, name, up, down, l, material, accesorios=(), K=0):
+        """Add a pipe between two nodes of network
+
+        Parameters
+        ----------
+        name : str
+            Name of pipe
+        up : str
+            Name of node at the start of pipe
+        down : str
+            Name of node at the end of pipe
+        l : float
+            Length of pipe, [m]
+        material : list
+            Material and dimensions of pipe, as :class:`Pipe` kwarg
+        accesorios : list
+            Fittings in pipe, as :class:`Pipe` kwarg
+        K : float
+            Additional loss coefficient of pipe
+        """
+        for accesorio in accesorios:
+            K += accesorio[2]*accesorio[3]
+        rugosidad = material[2]/1000
+        Di = (material[6]-2*material[5])/1000
+        self.pipes.append(name)
+        self._pipeData.append((self._node[up], self._node[down], l, Di,
+                               rugosidad/Di, K))
+
+    def pressure(self, name):
+        """Pressure of a node of solved network"""
+        return unidades.Pressure(self.P[self._node[name]])
+
+    def flow(self, name):
+        """Mass flow in a pipe of solved network"""
+        return unidades.MassFlow(self.caudal[self.pipes.index(name)])
+
+    def _resistance(self, Q):
+        """Calculate the pressure loss in pipes and its derivative with the
+        flow"""
+        A = pi/4*self._Di**2
+        V = abs_(Q)/A
+        Re = self.rho*V*self._Di/self.mu
+        laminar = Re < 2100
+        with errstate(all="ignore"):
+            f = f_list[self.method](Re, self._eD)
+            f4000 = f_list[self.method](4000*ones(len(Re)), self._eD)
+
+        # Linear interpolation in transition region, so the pressure loss is
+        # continuous and the Newton iteration don't oscillate between regimes
+        fc = 64/2100+(f4000-64/2100)*(Re-2100)/1900
+        f = where(Re < 4000, fc, f)
+        f = where(laminar, 64/maximum(Re, 1e-10), f)
+        self.Re = Re
+        self.f = f
+
+        # Hagen-Poiseuille linear resistance in laminar flow
+        r_lam = 128*self.mu*self._L/pi/self._Di**4
+        r_turb = f*self._L/self._Di*self.rho/2/A**2
+        r_K = self._K*self.rho/2/A**2
+        dP = where(laminar, r_lam*Q, r_turb*Q*abs_(Q))+r_K*Q*abs_(Q)
+        dPdQ = where(laminar, r_lam, 2*r_turb*abs_(Q))+2*r_K*abs_(Q)
+        return dP, maximum(dPdQ, r_lam)
+
+    def solve(self):
+        """Solve the flows and pressures of network"""
+        data = array([(i, j) for i, j, l, Di, eD, K in self._pipeData])
+        self._L, self._Di, self._eD, self._K = array(
+            [(l, Di, eD, K) for i, j, l, Di, eD, K in self._pipeData]).T
+        P, z, caudal = zip(*self._nodeData)
+        z = array(z, dtype=float)
+        fixed = array([p is not None for p in P])
+        if not fixed.any():
+            raise ValueError("Network without fixed pressure node")
+        free = ~fixed
+        demand = array(caudal, dtype=float)[free]/self.rho
+
+        # Incidence matrix, +1 in up node and -1 in down node, split in
+        # unknown and fixed pressure nodes, the pressures are solved as
+        # piezometric pressures, P+ρgz
+        n = len(self.pipes)
+        rows = concatenate((arange(n), arange(n)))
+        cols = concatenate((data[:, 0], data[:, 1]))
+        values = concatenate((ones(n), -ones(n)))
+        A = csr_matrix((values, (rows, cols)), shape=(n, len(self.nodes)))
+        A12 = A[:, free]
+        A21 = A12.T.tocsr()
+        Pf = array([p for p in P if p is not None])+self.rho*g*z[fixed]
+        b = A[:, fixed]*Pf
+
+        # Initial flow with a velocity of 1 m/s
+        Q = pi/4*self._Di**2
+        self.status = 0
+        self.iterations = 0
+        while True:
+            dP, D = self._resistance(Q)
+            Dinv = 1/D
+            H = (A21*diags(Dinv)*A12).tocsc()
+            rhs = A21*(Dinv*(dP-b))-A21*Q-demand
+            Pu = spsolve(H, rhs)
+            Qn = Q-Dinv*(dP-A12*Pu-b)
+            self.iterations += 1
+
+            self.err = float(max(abs_(Qn-Q))/max(abs_(Qn).max(), 1e-12))
+            Q = Qn
+            if self.err < self.tol:
+                self.status = 1
+                self.msg = "Converged in %i iterations" % self.iterations
+                break
+            if self.iterations >= self.maxiter:
+                self.status = 3
+                self.msg = "Maximum iterations reached, error %g" % self.err
+                break
+            checkCancel()
+
+        self.DeltaP = self._resistance(Q)[0]
+        Pz = zeros(len(self.nodes))
+        Pz[fixed] = Pf
+        Pz[free] = Pu
+        self.P = Pz-self.rho*g*z
+        self.Q = Q
+        self.caudal = Q*self.rho
+        self.V = Q/(pi/4*self._Di**2)
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod()
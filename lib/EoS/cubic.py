@@ -53,6 +53,8 @@ not suitable for nonpolar substances with large molecular weight.
 """
 
 
+from numpy import array, dot, outer
+from numpy import exp as npexp, log as nplog
 from scipy import log, exp
 from scipy.constants import R
 
@@ -347,7 +349,12 @@ class Cubic(EoS):
         """
 
         self._cubicDefinition(T)
-        tita, b, delta, epsilon = self._GEOS(xi)
+        return self._roots(self._GEOS(xi), T, P)
+
+    def _roots(self, parameters, T, P):
+        """Roots of cubic polynomial with the mixture parameters already
+        calculated, see :meth:`_Z`"""
+        tita, b, delta, epsilon = parameters
         B = b*P/R/T
         A = tita*P/(R*T)**2
 
@@ -394,14 +401,16 @@ class Cubic(EoS):
         Bi = [bi*P/R/T for bi in self.bi]
         Ai = [ai*P/(R*T)**2 for ai in self.ai]
 
-        al, bl, deltal, epsilonl = self._GEOS(xi)
+        parl = self._GEOS(xi)
+        al, bl, deltal, epsilonl = parl
         Bl = bl*P/R/T
         Al = al*P/(R*T)**2
-        Zl = self._Z(xi, T, P)[0]
+        Zl = self._roots(parl, T, P)[0]
         tital = self._fugacity(Zl, xi, Al, Bl, Ai, Bi)
 
-        Zv = self._Z(yi, T, P)[-1]
-        av, bv, deltav, epsilonv = self._GEOS(yi)
+        parv = self._GEOS(yi)
+        Zv = self._roots(parv, T, P)[-1]
+        av, bv, deltav, epsilonv = parv
         Bv = bv*P/R/T
         Av = av*P/(R*T)**2
         titav = self._fugacity(Zv, yi, Av, Bv, Ai, Bi)
@@ -415,21 +424,16 @@ class Cubic(EoS):
         Any other subclass with different formulation must overwrite this
         method
         """
-        # Precalculation of inner sum in equation
-        aij = []
-        for ai, kiji in zip(Ai, self.kij):
-            suma = 0
-            for xj, aj, kij in zip(zi, Ai, kiji):
-                suma += xj*(1-kij)*(ai*aj)**0.5
-            aij.append(suma)
-
-        tita = []
-        for bi, aai in zip(Bi, aij):
-            rhs = bi/B*(Z-1) - log(Z-B) + A/B/(self.u-self.w)*(
-                    bi/B-2/A*aai) * log((Z+self.u*B)/(Z+self.w*B))
-            tita.append(exp(rhs))
-
-        return tita
+        # Precalculation of inner sum in equation, evaluated for all
+        # components at once
+        Ai = array(Ai, dtype=float)
+        Bi = array(Bi, dtype=float)
+        aij = dot(outer(Ai, Ai)**0.5*(1-array(self.kij, dtype=float)),
+                  array(zi, dtype=float))
+
+        rhs = Bi/B*(Z-1) - nplog(Z-B) + A/B/(self.u-self.w)*(
+                Bi/B-2/A*aij) * nplog((Z+self.u*B)/(Z+self.w*B))
+        return list(npexp(rhs))
 
     def _mixture(self, eq, xi, par):
         """Apply mixing rules to individual parameters to get the mixture
@@ -453,7 +457,11 @@ class Cubic(EoS):
         mixpar : list
             List with mixture parameters, [-]
         """
-        self.kij = Kij(self.mezcla.ids, eq)
+        # The interaction parameters only depend of the components, so they
+        # are loaded from database only the first time
+        if not hasattr(self, "kij") or self._kijEq != eq:
+            self.kij = Kij(self.mezcla.ids, eq)
+            self._kijEq = eq
         mixpar = Mixing_Rule(xi, par, self.kij)
         return mixpar
 
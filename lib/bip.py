@@ -18,7 +18,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 
-from numpy import zeros
+from numpy import array, dot, outer, zeros
 
 from lib import config
 from lib.sql import databank
@@ -111,18 +111,12 @@ def Mix_vdW1f(xi, parameters, kij):
     bi = parameters[1:]
 
     # Geometric mean rule for croos-energy parameter
-    a = 0
-    for x_i, a_i, kiji in zip(xi, ai, kij):
-        for x_j, a_j, k in zip(xi, ai, kiji):
-            a += x_i * x_j * (a_i*a_j)**0.5 * (1-k)
+    xi = array(xi, dtype=float)
+    a = float(dot(xi, dot(outer(ai, ai)**0.5*(1-array(kij, dtype=float)),
+                          xi)))
 
     # Arithmetic mean rule for the aditional parameters
-    b = []
-    for b_i in bi:
-        suma = 0
-        for x_i, bii in zip(xi, b_i):
-            suma += x_i*bii
-        b.append(suma)
+    b = [float(dot(xi, array(b_i, dtype=float))) for b_i in bi]
 
     return tuple([a]+b)
 
@@ -0,0 +1,335 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the parametric case study of projects, a set of input variables
+of project are changed in a range of values and a set of output properties
+are saved for each case.
+
+The cases are solved in order, so each case start from the converged state of
+the previous neighbour case, with the stream state shared when possible and
+the recycle loops initialized with the previous tear streams values.
+
+:class:`CaseStudy`: Parametric study of a project
+'''
+
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from configparser import ConfigParser
+import csv
+from itertools import product
+import json
+import logging
+from multiprocessing import get_context
+
+from scipy.stats import qmc
+
+from lib.config import getMainWindowConfig, setMainWindowConfig
+from lib.thread import Cancelled, checkCancel, progress
+
+
+class CaseStudy(object):
+    """Parametric study of a project
+
+    Parameters
+    ----------
+    project : Project
+        Project to study, it's not modified, each process work with its own
+        copy of project
+    inputs : list
+        List with the input variables definition, each one as a tuple
+        (id, kwarg, values), the id is the equipment ("e1") or stream ("s1")
+        with the kwarg to change, the values meaning depend of method:
+
+            * 0 - Grid: List with the values, the cases are all the
+              combination of values of each input
+            * 1 - Latin hypercube: Tuple with the lower and upper bound of
+              input, the number of cases is defined in samples
+            * 2 - List: List with the values, all the inputs with the same
+              length, each index define a case
+
+    outputs : list
+        List with the output properties, each one as a tuple (id, attribute),
+        the id is the equipment ("e1") or stream ("s1") to read the attribute
+    method : int
+        Method to generate the cases
+    samples : int
+        Number of cases for latin hypercube method
+    workers : int
+        Number of process to solve the cases in parallel, 0 to solve all in
+        current process
+    seed : int
+        Seed of latin hypercube random generator, for reproducible studies
+
+    Notes
+    -----
+    The results are saved in results dict, with the index of case as key
+    and a tuple with the input values, the output values and the status, 1
+    if all the equipments are calculated. The outputs of a failed case are
+    None, and empty in the csv file, and the message of a case failed with an
+    exception is saved in errors dict
+
+    Examples
+    --------
+    Outlet pressure sweep of a pump
+
+    >>> from lib.corriente import Corriente
+    >>> from lib.project import Project
+    >>> from equipment.pump import Pump
+    >>> project = Project(items={}, streams={}, config=getMainWindowConfig())
+    >>> project.addItem("i1", Corriente())
+    >>> project.addItem("e1", Pump(Pout=5e5, rendimiento=0.75))
+    >>> project.addItem("o1", Corriente())
+    >>> project.addStream(1, "i1", "e1")
+    >>> project.addStream(2, "e1", "o1")
+    >>> project.setInput(1, Corriente(
+    ...     T=300, P=1e5, caudalMasico=1, ids=[62], fraccionMolar=[1.],
+    ...     MEoS=True, iapws=False))
+
+    >>> study = CaseStudy(project, [("e1", "Pout", [2e5, 4e5])],
+    ...                   [("s2", "P"), ("e1", "headCalculada")])
+    >>> for row in study.run():
+    ...     print("%0.0f %0.0f %0.2f" % (row[0], row[1], row[2]))
+    200000 200000 10.23
+    400000 400000 30.70
+    """
+    METHODS = ["Grid", "Latin hypercube", "List"]
+
+    def __init__(self, project, inputs, outputs, method=0, samples=10,
+                 workers=0, seed=None):
+        self.project = project
+        self.inputs = inputs
+        self.outputs = outputs
+        self.method = method
+        self.samples = samples
+        self.workers = workers
+        self.seed = seed
+
+        self.results = {}
+        self.errors = {}
+
+    @property
+    def cases(self):
+        """List with the input values of each case, ordered so consecutive
+        cases are neighbours"""
+        if self.method == 0:
+            values = [values for id, kwarg, values in self.inputs]
+            cases = list(product(*values))
+
+        elif self.method == 1:
+            sampler = qmc.LatinHypercube(d=len(self.inputs), seed=self.seed)
+            sample = qmc.scale(
+                sampler.random(self.samples),
+                [values[0] for id, kwarg, values in self.inputs],
+                [values[1] for id, kwarg, values in self.inputs])
+            cases = sorted(tuple(float(x) for x in row) for row in sample)
+
+        else:
+            values = [values for id, kwarg, values in self.inputs]
+            if len(set(len(v) for v in values)) > 1:
+                raise ValueError("All inputs must have the same length")
+            cases = list(zip(*values))
+
+        return cases
+
+    def title(self):
+        """Title of table columns"""
+        title = ["%s.%s" % (id, kwarg) for id, kwarg, values in self.inputs]
+        title += ["%s.%s" % (id, attr) for id, attr in self.outputs]
+        return title
+
+    def run(self, callback=None, fname=None):
+        """Solve all the cases
+
+        Parameters
+        ----------
+        callback : callable
+            Function called when a case is solved, with the index of case,
+            the input values, the output values and the status as arguments
+        fname : str
+            Name of csv file to save the cases as soon as they are solved
+
+        Returns
+        -------
+        table : list
+            List with a row for each case, with the input values and the
+            output values
+
+        Notes
+        -----
+        Run as a job of :class:`lib.thread.Executor` the study report its
+        progress and it can be cancelled between cases
+        """
+        self.results = {}
+        self.errors = {}
+        cases = list(enumerate(self.cases))
+
+        data = {}
+        self.project.writeToJSON(data)
+        data["external_dependences"] = list(data["external_dependences"])
+        current = getMainWindowConfig()
+        config = {section: dict(current.items(section, raw=True))
+                  for section in current.sections()}
+        task = {"config": config,
+                "project": json.dumps(data),
+                "inputs": [(id, kwarg) for id, kwarg, values in self.inputs],
+                "outputs": self.outputs}
+
+        writer = None
+        if fname:
+            file = open(fname, "w", newline="")
+            writer = csv.writer(file)
+            writer.writerow(["case"] + self.title() + ["status"])
+
+        def save(result):
+            for index, values, outputs, status, error in result:
+                self.results[index] = (values, outputs, status)
+                if error:
+                    self.errors[index] = error
+                if writer:
+                    writer.writerow([index] + list(values) + outputs +
+                                    [status])
+                if callback is not None:
+                    callback(index, values, outputs, status)
+            if writer:
+                file.flush()
+            progress(len(self.results)/len(cases))
+
+        try:
+            if self.workers:
+                # Contiguous chunks of cases, so each process use warm start
+                # from neighbour cases, several chunks by process to balance
+                # the load and save the results progressively
+                size = max(1, len(cases) // (4*self.workers))
+                chunks = [cases[i:i+size] for i in range(0, len(cases), size)]
+                with ProcessPoolExecutor(
+                        self.workers, mp_context=get_context("spawn"),
+                        initializer=_initWorker, initargs=(task, )) as pool:
+                    futures = [pool.submit(_solveCases, chunk)
+                               for chunk in chunks]
+                    try:
+                        for future in as_completed(futures):
+                            save(future.result())
+                    except Cancelled:
+                        for future in futures:
+                            future.cancel()
+                        raise
+            else:
+                _initWorker(task, setConfig=False)
+                for case in cases:
+                    save(_solveCases([case]))
+        finally:
+            if writer:
+                file.close()
+
+        return self.table()
+
+    def table(self):
+        """Return the results as a list of rows ordered by case"""
+        return [list(self.results[index][0]) + self.results[index][1]
+                for index in sorted(self.results)]
+
+
+# Project copy of each process, with the study definition
+_worker = {}
+
+
+def _initWorker(task, setConfig=True):
+    """Load the project to study in the worker"""
+    if setConfig:
+        config = ConfigParser()
+        config.read_dict(task["config"])
+        setMainWindowConfig(config)
+    _worker.clear()
+    _worker.update(task)
+    _worker["instance"] = _load(task)
+
+
+def _load(task):
+    """Create a copy of project from json"""
+    # Imported here to avoid the circular import of lib and equipment
+    from lib.project import Project
+
+    project = Project(items={}, streams={})
+    project.readFromJSON(json.loads(task["project"]))
+    for up, down, ind_up, ind_down, obj in project.streams.values():
+        if up[0] == "i" and project.items.get(up) is None:
+            project.items[up] = obj
+    return project
+
+
+def _setInput(project, id, kwarg, value):
+    """Change a input of project without calculation"""
+    if id[0] == "s":
+        key = int(id[1:])
+        stream = project.getStream(key).clone(**{kwarg: value})
+        up = project.streams[key][0]
+        if up[0] == "i":
+            project.items[up] = stream
+        project._setStream(key, stream)
+    else:
+        project.items[id](**{kwarg: value})
+    project.setDirty(id)
+
+
+def _getOutput(project, id, attr):
+    """Get the value of a output property of project, None if it's not
+    available"""
+    entity = project.getObject(id)
+    value = getattr(entity, attr, None)
+    if value is None and attr in getattr(entity, "kwargs", {}):
+        value = entity.kwargs[attr]
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _solveCases(cases):
+    """Solve a list of cases in the worker project, each case start from the
+    state of previous case"""
+    result = []
+    project = _worker["instance"]
+    for index, values in cases:
+        checkCancel()
+        error = ""
+        try:
+            for (id, kwarg), value in zip(_worker["inputs"], values):
+                _setInput(project, id, kwarg, value)
+            project.run()
+        except Cancelled:
+            raise
+        except Exception as e:
+            logging.error("Case %i failed, %s" % (index, e))
+            error = str(e)
+            # The project state is undefined, restart from the original
+            project = _worker["instance"] = _load(_worker)
+
+        status = int(not error and all(
+            obj.status for key, obj in project.items.items()
+            if key[0] == "e"))
+        if status:
+            outputs = [_getOutput(project, id, attr)
+                       for id, attr in _worker["outputs"]]
+        else:
+            # The project values are from the reloaded project or a previous
+            # case, not the results of this case
+            outputs = [None]*len(_worker["outputs"])
+        result.append((index, values, outputs, status, error))
+    return result
@@ -123,6 +123,7 @@ Others method:
 '''
 
 
+from functools import wraps
 import math
 import os
 import re
@@ -4776,6 +4777,38 @@ def Henry(T, args):
     return unidades.Pressure(H, "psi")
 
 
+def _cached(method):
+    """Decorator to memoize a temperature dependent property method of
+    :class:`Componente`. The result is saved in a bounded per instance cache
+    with key (property, arguments), the calculation method is fixed by
+    component kwargs and configuration so the cache is cleared when any of
+    them change. Calls with unhashable arguments are not cached"""
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args):
+        token = (tuple(self.kwargs.values()), self.Config)
+        if token != self._cacheToken:
+            self.clearCache()
+            self._cacheToken = token
+
+        key = (name, ) + args
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self._cacheMisses += 1
+            value = method(self, *args)
+            if len(self._cache) >= self._cacheSize:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = value
+        except TypeError:
+            return method(self, *args)
+        else:
+            self._cacheHits += 1
+        return value
+    return wrapper
+
+
 class Componente(object):
     """Class to define a chemical compound from the database
 
@@ -4804,6 +4837,10 @@ class Componente(object):
     for now only in API usage. Not custom stream property definition in main
     program
 
+    The temperature dependent properties (Pv, RhoL, Mu_Liquido,
+    ThCond_Liquido, Tension, Cp_Liquido, Hv_DIPPR) are memoized in a bounded
+    cache, see :meth:`cacheInfo` to get the hit rates.
+
     Examples
     --------
     This are several ejemples of usage of this class with several configuration
@@ -5010,6 +5047,8 @@ class Componente(object):
     """
 
     _bool = False
+    _cacheSize = 256
+    _cacheToken = None
     kwargs = {
               "RhoL": None,
               "RhoLP": None,
@@ -5065,7 +5104,7 @@ class Componente(object):
         self.id = id
         self.kwargs = Componente.kwargs.copy()
         self.kwargs.update(kwargs)
-        self.Config = config.getMainWindowConfig()
+        self.Config = config.getSnapshot()
         cmp = sql.getElement(id)
         self.formula = cmp[1]
         self.name = cmp[2]
@@ -5242,12 +5281,42 @@ class Componente(object):
     def __bool__(self):
         return self._bool
 
+    def clearCache(self):
+        """Clear the cache of temperature dependent properties"""
+        self._cache = {}
+        self._cacheHits = 0
+        self._cacheMisses = 0
+
+    def cacheInfo(self):
+        """Return a dict with the statistics of the properties cache
+
+        >>> cmp = Componente(40)
+        >>> P1, P2, P3 = cmp.Pv(350), cmp.Pv(350), cmp.Pv(360)
+        >>> info = cmp.cacheInfo()
+        >>> info["hits"], info["misses"], info["size"]
+        (1, 2, 2)
+        >>> "%0.3f" % info["hitRate"]
+        '0.333'
+        """
+        if self._cacheToken is None:
+            self.clearCache()
+        calls = self._cacheHits + self._cacheMisses
+        if calls:
+            rate = self._cacheHits / calls
+        else:
+            rate = 0
+        return {"hits": self._cacheHits,
+                "misses": self._cacheMisses,
+                "size": len(self._cache),
+                "maxsize": self._cacheSize,
+                "hitRate": rate}
+
     # Calculation of undefined properties of compound
     def _f_acent(self):
         """Acentric factor calculation in compounds with undefined property"""
         method = self.kwargs["facent"]
         if method is None or method >= len(Componente.METHODS_facent):
-            method = self.Config.getint("Transport", "f_acent")
+            method = self.Config.Transport.f_acent
 
         if method == 0:
             return facent_LeeKesler(self.Tb, self.Tc, self.Pc)
@@ -5309,7 +5378,7 @@ class Componente(object):
         Explained in procedure 7A1.1, pag 543
 
         .. math::
-            Ho = BT + C/2T^2 + D/3T^3 + E/4T^4 + F/5T^5
+            Ho = AT + B/2T^2 + C/3T^3 + D/4T^4 + E/5T^5 + F/6T^6
 
         Parameters
         ----------
@@ -5320,11 +5389,24 @@ class Componente(object):
         -----
         The units in the calculate ideal enthalpy are in cal/mol·K, the
         reference state is set to T=298.15K
+
+        Examples
+        --------
+        The enthalpy is the integral of :meth:`_Cpo`, so its derivative is
+        the ideal gas specific heat
+
+        >>> methane = Componente(2)
+        >>> dH = (methane._Ho(401)-methane._Ho(399))/2
+        >>> "%0.2f %0.2f" % (dH, methane._Cpo(400))
+        '2549.75 2549.75'
+        >>> "%0.2f" % methane._Ho(400).kJkg
+        '244.01'
         """
         To = 298.15
         A, B, C, D, E, F = self.cp
-        H = B*T + C/2*T**2 + D/3*T**3 + E/4*T**4 + F/5*T**5
-        Ho = B*To + C/2*To**2 + D/3*To**3 + E/4*To**4 + F/5*To**5
+        H = A*T + B/2*T**2 + C/3*T**3 + D/4*T**4 + E/5*T**5 + F/6*T**6
+        Ho = A*To + B/2*To**2 + C/3*To**3 + D/4*To**4 + E/5*To**5 + \
+            F/6*To**6
         return unidades.Enthalpy((H-Ho)/self.M, "calg")
 
     @refDoc(__doi__, [5], tab=8)
@@ -5356,15 +5438,16 @@ class Componente(object):
         """Calculate the density of solid phase using the DIPPR equations"""
         return DIPPR("rhoS", T, self._dipprRhoS[:-2], M=self.M, Tc=self.Tc)
 
+    @_cached
     def RhoL(self, T, P):
         """Calculate the density of liquid phase using any of available
         correlation"""
         method = self.kwargs["RhoL"]
         if method is None or method >= len(Componente.METHODS_RhoL):
-            method = self.Config.getint("Transport", "RhoL")
+            method = self.Config.Transport.RhoL
         Pcorr = self.kwargs["RhoLP"]
         if Pcorr is None or method >= len(Componente.METHODS_RhoLP):
-            Pcorr = self.Config.getint("Transport", "Corr_RhoL")
+            Pcorr = self.Config.Transport.Corr_RhoL
 
         if T > self.Tc:
             T = 0.9*self.Tc
@@ -5456,12 +5539,13 @@ class Componente(object):
 
         return rho
 
+    @_cached
     def Pv(self, T):
         """Vapor pressure calculation procedure using the method defined in
         preferences"""
         method = self.kwargs["Pv"]
         if method is None or method >= len(Componente.METHODS_Pv):
-            method = self.Config.getint("Transport", "Pv")
+            method = self.Config.Transport.Pv
 
         if method == 0 and self._dipprPv and \
                 self._dipprPv[6] <= T <= self._dipprPv[7]:
@@ -5494,15 +5578,16 @@ class Componente(object):
             elif self.Kw and self.Tb:
                 return Pv_MaxwellBonnel(T, self.Tb, self.Kw)
 
+    @_cached
     def ThCond_Liquido(self, T, P, rho):
         """Liquid thermal conductivity procedure using the method defined in
         preferences, use the decision diagram in 5_ Figure 12-0.2 pag 1135"""
         method = self.kwargs["ThCondL"]
         if method is None or method >= len(Componente.METHODS_ThL):
-            method = self.Config.getint("Transport", "ThCondL")
+            method = self.Config.Transport.ThCondL
         Pcorr = self.kwargs["ThCondLP"]
         if Pcorr is None or method >= len(Componente.METHODS_ThLP):
-            Pcorr = self.Config.getint("Transport", "Corr_ThCondL")
+            Pcorr = self.Config.Transport.Corr_ThCondL
 
         if T > self.Tc:
             T = 0.9*self.Tc
@@ -5555,10 +5640,10 @@ class Componente(object):
         defined in preferences, decision diagram in API Databook, pag. 1136"""
         method = self.kwargs["ThCondG"]
         if method is None or method >= len(Componente.METHODS_ThG):
-            method = self.Config.getint("Transport", "ThCondG")
+            method = self.Config.Transport.ThCondG
         Pcorr = self.kwargs["ThCondGP"]
         if Pcorr is None or method >= len(Componente.METHODS_ThGP):
-            Pcorr = self.Config.getint("Transport", "Corr_ThCondG")
+            Pcorr = self.Config.Transport.Corr_ThCondG
 
         # Calculate of low pressure viscosity
         if method == 0 and self._dipprKG:
@@ -5609,10 +5694,10 @@ class Componente(object):
         preferences, decision diagram in API Databook, pag. 1026"""
         method = self.kwargs["MuG"]
         if method is None or method >= len(Componente.METHODS_MuG):
-            method = self.Config.getint("Transport", "MuG")
+            method = self.Config.Transport.MuG
         Pcorr = self.kwargs["MuGP"]
         if Pcorr is None or method >= len(Componente.METHODS_MuGP):
-            Pcorr = self.Config.getint("Transport", "Corr_MuG")
+            Pcorr = self.Config.Transport.Corr_MuG
 
         # Calculate of low pressure viscosity
         if method == 0 and self._dipprMuG and \
@@ -5724,15 +5809,16 @@ class Componente(object):
             omega += 0.2*self.PolarParameter**2/T_
         return omega
 
+    @_cached
     def Mu_Liquido(self, T, P):
         """Liquid viscosity calculation procedure using the method defined in
         preferences, decision diagram in API Databook, pag. 1026"""
         method = self.kwargs["MuL"]
         if method is None or method >= len(Componente.METHODS_MuL):
-            method = self.Config.getint("Transport", "MuL")
+            method = self.Config.Transport.MuL
         Pcorr = self.kwargs["MuLP"]
         if Pcorr is None or method >= len(Componente.METHODS_MuLP):
-            Pcorr = self.Config.getint("Transport", "Corr_MuL")
+            Pcorr = self.Config.Transport.Corr_MuL
 
         # Calculate of low pressure viscosity
         if method == 0 and self._dipprMuL and \
@@ -5782,6 +5868,7 @@ class Componente(object):
 
         return mu
 
+    @_cached
     def Tension(self, T):
         """Liquid surface tension procedure using the method defined in
         preferences"""
@@ -5793,7 +5880,7 @@ class Componente(object):
 
         method = self.kwargs["Tension"]
         if method is None or method >= len(Componente.METHODS_Tension):
-            method = self.Config.getint("Transport", "Tension")
+            method = self.Config.Transport.Tension
 
         if method == 0 and self._dipprSigma and \
                 self._dipprSigma[6] <= T <= self._dipprSigma[7]:
@@ -5833,6 +5920,7 @@ class Componente(object):
             else:
                 return Tension_Pitzer(T, self.Tc, self.Pc, self.f_acent)
 
+    @_cached
     def Hv_DIPPR(self, T):
         """Calculate the heat of vaporization using the DIPPR equations"""
         return DIPPR("Hv", T, self._dipprHv[:-2], M=self.M, Tc=self.Tc)
@@ -5843,6 +5931,7 @@ class Componente(object):
 
         return DIPPR("cpL", T, self._dipprCpL[:-2], M=self.M, Tc=self.Tc)
 
+    @_cached
     def Cp_Liquido(self, T):
         if self._dipprCpL:
             return DIPPR("cpL", T, self._dipprCpL[:-2], M=self.M, Tc=self.Tc)
@@ -0,0 +1,263 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the transient heat conduction in one dimensional bodies, slabs,
+cylinders and spheres, used in unsteady heat-up calculations.
+
+The body is discretized in finite volumes and the time integration use the
+θ-method (implicit Euler or Crank-Nicolson) with a tridiagonal solver, the
+time step is adapted with a step doubling error estimation. The solution is
+generated step by step, so long simulations don't need a preallocated buffer.
+
+    * :class:`Conduction`: Transient heat conduction in a body
+'''
+
+
+from numpy import abs as abs_, asarray, full, linspace, zeros
+from scipy.linalg import solve_banded
+
+
+class Conduction(object):
+    """Transient heat conduction in a one dimensional body with constant
+    properties
+
+    Parameters
+    ----------
+    L : float
+        Thickness of body, half thickness for symmetric slab or radius for
+        cylinder and sphere, [m]
+    k : float
+        Thermal conductivity, [W/m·K]
+    rho : float
+        Density, [kg/m³]
+    cp : float
+        Heat capacity, [J/kg·K]
+    T0 : float or array
+        Initial temperature, a value or an array with the temperature of
+        each node, [K]
+    geometry : int
+        Geometry of body:
+
+            * 0 - Slab
+            * 1 - Cylinder
+            * 2 - Sphere
+
+    Ri : float
+        Internal radius for hollow cylinder and sphere, or the position of
+        first face for slab, [m]
+    inner : tuple
+        Boundary condition at internal face, default symmetry
+    outer : tuple
+        Boundary condition at external face, default symmetry
+    nodes : int
+        Number of nodes in discretization
+    theta : float
+        Implicitness of time integration, 0.5 for Crank-Nicolson and 1 for
+        implicit Euler
+    tol : float
+        Tolerance of local error in temperature for adaptive time step, 0 to
+        use a fixed time step, [K]
+
+    Notes
+    -----
+    The boundary conditions are defined with a tuple with the type as the
+    first element:
+
+        * ("T", Ts): Surface temperature
+        * ("h", h, Tinf): Convection with a fluid at Tinf, h as heat
+          transfer coefficient in W/m²K
+        * ("q", q): Heat flux into the body, W/m², symmetry with q=0
+
+    The values can be callables with the time as argument
+
+    Examples
+    --------
+    Slab heated by both faces in dimensionless variables, the analytical
+    solution of middle plane temperature is 0.950 at Fo=0.328
+
+    >>> slab = Conduction(L=0.5, k=1, rho=1, cp=1, T0=0, outer=("T", 1),
+    ...                   tol=1e-4)
+    >>> t, T = slab.solve(tEnd=0.328)
+    >>> "%0.3f %0.3f" % (t[-1], T[-1][0])
+    '0.328 0.950'
+
+    Cooling of a steel sphere in air, the Biot number is small so the
+    temperature is almost uniform as in the lumped capacitance model
+
+    >>> from math import exp
+    >>> sphere = Conduction(L=0.01, k=40, rho=7800, cp=460, T0=500,
+    ...                     geometry=2, outer=("h", 20, 300), nodes=11)
+    >>> t, T = sphere.solve(tEnd=600)
+    >>> lumped = 300+200*exp(-20*3/0.01/7800/460*600)
+    >>> "%0.1f %0.1f %0.1f" % (T[-1][0], T[-1][-1], lumped)
+    '373.5 373.3 373.3'
+    """
+
+    def __init__(self, L, k, rho, cp, T0, geometry=0, Ri=0, inner=("q", 0),
+                 outer=("q", 0), nodes=21, theta=0.5, tol=1e-3):
+        self.L = L
+        self.k = k
+        self.rho = rho
+        self.cp = cp
+        self.geometry = geometry
+        self.Ri = Ri
+        self.inner = inner
+        self.outer = outer
+        self.nodes = nodes
+        self.theta = theta
+        self.tol = tol
+
+        self.x = linspace(Ri, Ri+L, nodes)
+        self.T0 = full(nodes, T0, dtype=float)
+
+        # Finite volume geometry, area of faces and volume of cells per unit
+        # of area, length or solid angle
+        m = geometry
+        dx = L/(nodes-1)
+        faces = zeros(nodes+1)
+        faces[0] = Ri
+        faces[1:-1] = (self.x[1:]+self.x[:-1])/2
+        faces[-1] = Ri+L
+        self._dx = dx
+        self._A = faces**m
+        V = (faces[1:]**(m+1)-faces[:-1]**(m+1))/(m+1)
+        self._C = rho*cp*V
+
+        # Conduction matrix in banded form, dT/dt = M·T + b
+        G = k*self._A[1:-1]/dx
+        M = zeros((3, nodes))
+        M[0, 1:] = G/self._C[:-1]
+        M[2, :-1] = G/self._C[1:]
+        M[1, :-1] -= G/self._C[:-1]
+        M[1, 1:] -= G/self._C[1:]
+        self._M = M
+
+    def _system(self, t):
+        """Return the banded matrix and independent term of boundary
+        conditions at time t, and a dict with the Dirichlet nodes"""
+        M = self._M.copy()
+        b = zeros(self.nodes)
+        fixed = {}
+        for i, A, bc in ((0, self._A[0], self.inner),
+                         (-1, self._A[-1], self.outer)):
+            values = [v(t) if callable(v) else v for v in bc[1:]]
+            if bc[0] == "T":
+                fixed[i] = values[0]
+            elif bc[0] == "h":
+                h, Tinf = values
+                M[1, i] -= h*A/self._C[i]
+                b[i] += h*A*Tinf/self._C[i]
+            else:
+                b[i] += values[0]*A/self._C[i]
+        return M, b, fixed
+
+    def step(self, t, T, dt):
+        """Advance the temperature profile T from time t a time step dt"""
+        th = self.theta
+        M0, b0, fixed = self._system(t)
+        M1, b1, fixed = self._system(t+dt)
+
+        # Explicit part, M0·T with banded product
+        MT = M0[1]*T
+        MT[:-1] += M0[0, 1:]*T[1:]
+        MT[1:] += M0[2, :-1]*T[:-1]
+        rhs = T+dt*((1-th)*(MT+b0)+th*b1)
+
+        ab = -th*dt*M1
+        ab[1] += 1
+        for i, Ts in fixed.items():
+            # Replace the equation of node with the surface temperature
+            i %= self.nodes
+            ab[1, i] = 1
+            if i+1 < self.nodes:
+                ab[0, i+1] = 0
+            if i > 0:
+                ab[2, i-1] = 0
+            rhs[i] = Ts
+        return solve_banded((1, 1), ab, rhs)
+
+    def iterate(self, tEnd=None, dt=None):
+        """Generator with the time and the temperature profile of each time
+        step accepted, until tEnd or endless if it isn't defined"""
+        if dt is None:
+            # Start with the stability limit of explicit method
+            dt = self._dx**2*self.rho*self.cp/self.k/2
+        order = 2 if self.theta == 0.5 else 1
+
+        t = 0
+        T = self.T0.copy()
+        fixed = self._system(t)[2]
+        for i, Ts in fixed.items():
+            T[i] = Ts
+        yield t, T
+
+        while tEnd is None or t < tEnd:
+            if tEnd is not None:
+                dt = min(dt, tEnd-t)
+
+            if not self.tol:
+                T = self.step(t, T, dt)
+                t += dt
+                yield t, T
+                continue
+
+            # Step doubling, the error is estimated comparing a full step
+            # with two half steps
+            full_ = self.step(t, T, dt)
+            half = self.step(t, T, dt/2)
+            half = self.step(t+dt/2, half, dt/2)
+            err = abs_(half-full_).max()/(2**order-1)
+            if err <= self.tol:
+                t += dt
+                T = half
+                yield t, T
+            factor = 0.9*(self.tol/max(err, 1e-300))**(1./(order+1))
+            dt *= min(max(factor, 0.2), 5)
+
+    def solve(self, tEnd=None, stop=None, dt=None):
+        """Solve the transient conduction
+
+        Parameters
+        ----------
+        tEnd : float
+            Final time, [s]
+        stop : callable
+            Function with the time and the temperature profile as arguments
+            that return True to end the calculation
+        dt : float
+            Initial time step, [s]
+
+        Returns
+        -------
+        t : array
+            Time of each step, [s]
+        T : array
+            Temperature profile at each time, one row for each time, [K]
+        """
+        if tEnd is None and stop is None:
+            raise ValueError("Undefined end of calculation")
+        times = []
+        profiles = []
+        for t, T in self.iterate(tEnd, dt):
+            times.append(t)
+            profiles.append(T)
+            if stop is not None and stop(t, T):
+                break
+        return asarray(times), asarray(profiles)
@@ -32,9 +32,13 @@ Configuration tools
   * :func:`getComponents`: Get component list from project
   * :func:`getMainWindowConfig`: Return config of current project
   * :func:`setMainWindowConfig`: Update currentconfig variable
+  * :func:`setPreferences`: Update Preferences variable
+  * :func:`getSnapshot`: Return the typed snapshot of current configuration
+  * :class:`ConfigSnapshot`: Immutable typed copy of a ConfigParser
   * :class:`Entity`: General class for model object
 """
 
+from ast import literal_eval
 from configparser import ConfigParser
 import os
 
@@ -123,7 +127,8 @@ def getMainWindowConfig():
 
 def setMainWindowConfig(config=None):
     """Set config as current project"""
-    global currentConfig
+    global currentConfig, _snapshot
+    _snapshot = None
     if config:
         currentConfig = config
         return
@@ -141,6 +146,133 @@ def setMainWindowConfig(config=None):
                     break
 
 
+def setPreferences(preferences):
+    """Set preferences as the pychemqt preferences in use, it must be called
+    when the preferences are saved to refresh the configuration snapshot"""
+    global Preferences, _snapshot
+    Preferences = preferences
+    _snapshot = None
+
+
+def _parseOption(value):
+    """Convert a ConfigParser option string to its python type"""
+    if value.lower() in ("true", "yes", "on"):
+        return True
+    elif value.lower() in ("false", "no", "off"):
+        return False
+    try:
+        value = literal_eval(value)
+    except (ValueError, SyntaxError, TypeError):
+        return value
+    if isinstance(value, list):
+        value = tuple(value)
+    return value
+
+
+class _Section(object):
+    """Read only options of a ConfigParser section, the option values are
+    attributes with the same case insensitive name of ConfigParser"""
+
+    def __init__(self, config, section):
+        values = {}
+        for option, value in config.items(section, raw=True):
+            values[option] = _parseOption(value)
+        object.__setattr__(self, "_values", values)
+
+    def __getattr__(self, name):
+        try:
+            value = self._values[name.lower()]
+        except KeyError:
+            raise AttributeError(name)
+
+        # Save it with the asked name to avoid the lookup in next access
+        object.__setattr__(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Configuration snapshot is read only")
+
+    def __contains__(self, name):
+        return name.lower() in self._values
+
+
+class ConfigSnapshot(object):
+    """Immutable typed copy of a ConfigParser instance, to use in calculation
+    code instead of parse the ConfigParser strings in each access.
+
+    Each section is an attribute with the options values as attributes too,
+    converted to bool, int, float, tuple or dict when possible.
+
+    Parameters
+    ----------
+    config : ConfigParser
+        Project configuration
+    preferences : ConfigParser, optional
+        pychemqt preferences, available as preferences attribute
+
+    Examples
+    --------
+    >>> conf = ConfigParser()
+    >>> conf.read_dict({"Thermo": {"K": "2", "MEoS": "True"},
+    ...                 "Components": {"Components": "[62, 98]"}})
+    >>> pref = ConfigParser()
+    >>> pref.read_dict({"MEOS": {"coolprop": "True", "refprop": "False"}})
+    >>> snapshot = ConfigSnapshot(conf, pref)
+    >>> snapshot.Thermo.K, snapshot.Thermo.MEoS, snapshot.Components.Components
+    (2, True, (62, 98))
+    >>> snapshot.method
+    'coolprop'
+    """
+
+    def __init__(self, config, preferences=None):
+        for section in config.sections():
+            object.__setattr__(self, section, _Section(config, section))
+
+        method = "meos"
+        if preferences is not None:
+            preferences = ConfigSnapshot(preferences)
+            if "MEOS" in preferences.__dict__:
+                if preferences.MEOS.coolprop and preferences.MEOS.refprop:
+                    method = "refprop"
+                elif preferences.MEOS.coolprop:
+                    method = "coolprop"
+        object.__setattr__(self, "preferences", preferences)
+        object.__setattr__(self, "method", method)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Configuration snapshot is read only")
+
+    def stateKey(self):
+        """Hashable key with all the options values, snapshots of the same
+        configuration have the same key"""
+        key = self.__dict__.get("_key")
+        if key is None:
+            sections = []
+            for name, section in sorted(self.__dict__.items()):
+                if isinstance(section, _Section):
+                    sections.append((name, tuple(
+                        (k, repr(v)) for k, v in sorted(
+                            section._values.items()))))
+            preferences = self.preferences
+            if preferences is not None:
+                preferences = preferences.stateKey()
+            key = (tuple(sections), preferences, self.method)
+            object.__setattr__(self, "_key", key)
+        return key
+
+
+_snapshot = None
+
+
+def getSnapshot():
+    """Return the snapshot of current project config and preferences, it's
+    only created again when the configuration changes"""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = ConfigSnapshot(currentConfig, Preferences)
+    return _snapshot
+
+
 class Entity(object):
     """General class for model object, with basic functionality:
 
@@ -162,6 +294,10 @@ class Entity(object):
     notasPlain = ""
     _dependence = ""
 
+    # Entities with state loaded from file only when it's used, the state
+    # can't define attributes with a class level default value
+    lazyState = False
+
     def __init__(self, **kwargs):
         """Class constructor, copy kwargs for child class, it can be customize
         for child class to add functionality"""
@@ -208,6 +344,7 @@ class Entity(object):
 
     def show(self):
         """General function to show entity properties as key: value text"""
+        self.loadState()
         for key in sorted(self.__dict__):
             print(key, ": ", self.__dict__[key])
 
@@ -246,8 +383,10 @@ class Entity(object):
         data["notas"] = self.notas
         data["notasPlain"] = self.notasPlain
         if self.status:
-            state = {}
-            self.writeStatetoJSON(state)
+            state = self.__dict__.get("_pendingState")
+            if state is None:
+                state = {}
+                self.writeStatetoJSON(state)
             data["state"] = state
         else:
             data["state"] = {}
@@ -274,7 +413,41 @@ class Entity(object):
         self.notas = data["notas"]
         self.notasPlain = data["notasPlain"]
         if self.status:
-            self.readStatefromJSON(data["state"])
+            if self.lazyState:
+                self._pendingState = data["state"]
+            else:
+                self.readStatefromJSON(data["state"])
+
+    def __getattr__(self, name):
+        """Load the pending state from file when any of its attributes is
+        used, only called for undefined attributes"""
+        if not self.loadState():
+            raise AttributeError("'%s' object has no attribute '%s'" % (
+                self.__class__.__name__, name))
+        return getattr(self, name)
+
+    def loadState(self):
+        """Rebuild the state read from file and not used yet, return True if
+        there was a pending state
+
+        >>> from lib.corriente import Corriente
+        >>> data = {}
+        >>> Corriente(T=300, P=1e5, caudalMasico=1, ids=[62],
+        ...           fraccionMolar=[1]).writeToJSON(data)
+        >>> stream = Corriente()
+        >>> stream.readFromJSON(data)
+        >>> "_pendingState" in stream.__dict__
+        True
+        >>> "%0.1f" % stream._prop("T")
+        '300.0'
+        >>> stream.loadState()
+        False
+        """
+        state = self.__dict__.pop("_pendingState", None)
+        if state is None:
+            return False
+        self.readStatefromJSON(state)
+        return True
 
 
 #        if run:
@@ -317,6 +490,7 @@ class Entity(object):
         return lista
 
     def _prop(self, attr):
+        self.loadState()
         if attr == "className":
             prop = self.__class__.__name__
         elif attr == "notasPlain":
@@ -26,19 +26,24 @@ Module with stream definition:
 
 """
 
+from copy import copy
 import logging
 import os
 
+from numpy import ndarray
 from PyQt5.QtWidgets import QApplication
 from scipy.constants import R
 
 from lib.physics import R_atml
 from lib import unidades, config
 from lib import EoS, mEoS, gerg, iapws97, freeSteam, refProp, coolProp
+from lib.eos import EoS as EoSBase
 from lib.solids import Solid
 from lib.mezcla import Mezcla, mix_molarflow_molarfraction
 from lib.psycrometry import PsychroState
 from lib.thermo import ThermoWater, ThermoAdvanced, ThermoRefProp
+from lib.profiling import profiled
+from lib.utilities import hashable, LRUCache
 
 
 class Corriente(config.Entity):
@@ -127,6 +132,18 @@ class Corriente(config.Entity):
     kwargs_forbidden = ["entrada", "mezcla", "solido"]
     solido = None
 
+    # Input kwargs that define only the thermodynamic state of stream, a clone
+    # changing only these values share the composition of original stream
+    kwargs_state = ("T", "P", "x")
+
+    # Input kwargs with the thermodynamic method options of stream
+    kwargs_method = ("K", "H", "alfa", "mix", "Cp_ideal")
+    _previous = None
+    lazyState = True
+
+    # Saturation states of pure components used in P-h and P-s clone
+    _saturationCache = LRUCache(64)
+
     def __init__(self, **kwargs):
         self.kwargs = Corriente.kwargs.copy()
         self.__call__(**kwargs)
@@ -137,6 +154,12 @@ class Corriente(config.Entity):
         if kwargs.get("solido", None):
             kwargs.update(kwargs["solido"].kwargs)
 
+        # The mixture compositions, i.e. of a phase, are unidadArray, the
+        # kwargs save them as list of values in base unit
+        for key, value in kwargs.items():
+            if isinstance(value, ndarray):
+                kwargs[key] = value.tolist()
+
         if kwargs.get("caudalUnitarioMasico", []):
             self.kwargs["caudalUnitarioMolar"] = []
             self.kwargs["fraccionMolar"] = []
@@ -257,7 +280,6 @@ class Corriente(config.Entity):
                 QApplication.translate("pychemqt", "Error"))
             status = statusmsg[self.status]
             logging.debug('%s %s' % (status, self.msg))
-            QApplication.processEvents()
 
             self.status = 1
             self.calculo()
@@ -332,19 +354,31 @@ class Corriente(config.Entity):
             self.tipoSolido = self.kwargs["solido"].status
         return self.tipoTermodinamica and self.tipoFlujo
 
+    @profiled("Corriente.calculo")
     def calculo(self):
-        Config = config.getMainWindowConfig()
+        Config = config.getSnapshot()
+
+        # Stream with same composition used as initial state in clone
+        previous = self._previous
+        if previous is not None and \
+                getattr(previous.mezcla, "Config", None) is not Config:
+            previous = None
+
         if self.kwargs["mezcla"]:
             self.mezcla = self.kwargs["mezcla"]
+        elif previous is not None:
+            # The phase properties are saved in mezcla instance, so the
+            # components are shared but not the mezcla instance
+            self.mezcla = copy(previous.mezcla)
         else:
             self.mezcla = Mezcla(self.tipoFlujo, **self.kwargs)
 
         self.ids = self.mezcla.ids
         self.componente = self.mezcla.componente
-        self.fraccion = self.mezcla.fraccion
+        self.fraccion = list(self.mezcla.fraccion)
         self.caudalmasico = self.mezcla.caudalmasico
         self.caudalmolar = self.mezcla.caudalmolar
-        self.fraccion_masica = self.mezcla.fraccion_masica
+        self.fraccion_masica = list(self.mezcla.fraccion_masica)
         self.caudalunitariomasico = self.mezcla.caudalunitariomasico
         self.caudalunitariomolar = self.mezcla.caudalunitariomolar
 
@@ -352,7 +386,11 @@ class Corriente(config.Entity):
         P = unidades.Pressure(self.kwargs.get("P", None))
         x = self.kwargs.get("x", None)
 
-        self._method()
+        if previous is not None:
+            self._thermo = previous._thermo
+            self._dependence = previous._dependence
+        else:
+            self._method()
         setData = True
 
         if self._thermo == "freesteam":
@@ -381,25 +419,21 @@ class Corriente(config.Entity):
             compuesto = coolProp.CoolProp(**self.kwargs)
         elif self._thermo == "meos":
             if self.tipoTermodinamica == "TP":
-                compuesto = mEoS.__all__[mEoS.id_mEoS.index(self.ids[0])](T=T, P=P)
+                # Below critical temperature meos use the ancillary density of
+                # stable phase as initial value, only the supercritical region
+                # is safe to use the previous density without reach a
+                # metastable state
+                kw = {}
+                if previous is not None and previous.T > previous.Tc and \
+                        T > previous.Tc:
+                    kw["rho0"] = previous.rho
+                compuesto = mEoS.__all__[mEoS.id_mEoS.index(self.ids[0])](T=T, P=P, **kw)
             elif self.tipoTermodinamica == "Tx":
                 compuesto = mEoS.__all__[mEoS.id_mEoS.index(self.ids[0])](T=T, x=x)
             elif self.tipoTermodinamica == "Px":
                 compuesto = mEoS.__all__[mEoS.id_mEoS.index(self.ids[0])](P=P, x=x)
         elif self._thermo == "eos":
-            if self.kwargs["K"]:
-                index = K_name.index(self.kwargs["K"])
-                K = EoS.K[index]
-                print(K)
-            else:
-                K = EoS.K[Config.getint("Thermo","K")]
-            if self.kwargs["H"]:
-                index = H_name.index(self.kwargs["H"])
-                H = EoS.H[index]
-                print(H)
-            else:
-                H = EoS.H[Config.getint("Thermo","H")]
-
+            K, H = self._methodEoS()
             setData = False
             self.M = unidades.Dimensionless(self.mezcla.M)
             self.Tc = self.mezcla.Tc
@@ -409,43 +443,19 @@ class Corriente(config.Entity):
             if self.tipoTermodinamica == "TP":
                 self.T = unidades.Temperature(T)
                 self.P = unidades.Pressure(P)
-                eos = K(self.T, self.P.atm, self.mezcla)
+
+                # Use the previous equilibrium as initial estimation
+                eos, self.Liquido, self.Gas, self.H_exc = self._phasesEoS(
+                    self.T, self.P, K, H, getattr(previous, "eos", None))
                 self.eos = eos
                 self.x = unidades.Dimensionless(eos.x)
             else:
                 self.x = unidades.Dimensionless(x)
 
-#            self.mezcla.recallZeros(eos.xi)
-#            self.mezcla.recallZeros(eos.yi)
-#            self.mezcla.recallZeros(eos.Ki, 1.)
-
-            if 0. < self.x < 1.:
-                self.Liquido = Mezcla(tipo=5, fraccionMolar=eos.xi, caudalMolar=self.caudalmolar*(1-self.x))
-                self.Gas = Mezcla(tipo=5, fraccionMolar=eos.yi, caudalMolar=self.caudalmolar*self.x)
-            elif self.x <= 0:
-                self.Liquido = self.mezcla
-                self.Gas = Mezcla()
-            else:
-                self.Liquido = Mezcla()
-                self.Gas = self.mezcla
-            self.Gas.Z = unidades.Dimensionless(float(eos.Z[0]))
-            self.Liquido.Z = unidades.Dimensionless(float(eos.Z[1]))
-
-            if H == K:
-                eosH = eos
-            else:
-                eosH = H(self.T, self.P.atm, self.mezcla)
-            self.H_exc = eosH.H_exc
-
             self.Liquido.Q = unidades.VolFlow(0)
             self.Gas.Q = unidades.VolFlow(0)
-            self.Liquido.h = unidades.Power(0)
-            self.Gas.h = unidades.Power(0)
             if self.x < 1:
                 # There is liquid phase
-                Hl = (self.Liquido._Ho(self.T).Jg-self.Liquido.Hv_DIPPR(self.T).Jg)*self.Liquido.caudalmasico.gh
-                self.Liquido.h = unidades.Power(Hl-R*self.T/self.M*self.H_exc[1]*(1-self.x)*self.Liquido.caudalmasico.gh, "Jh")
-                self.Liquido.cp = self.Liquido.Cp_Liquido(T)
                 self.Liquido.rho = self.Liquido.RhoL(T, self.P)
                 self.Liquido.mu = self.Liquido.Mu_Liquido(T, self.P.atm)
                 self.Liquido.k = self.Liquido.ThCond_Liquido(T, self.P.atm, self.Liquido.rho)
@@ -454,9 +464,6 @@ class Corriente(config.Entity):
                 self.Liquido.Prandt = self.Liquido.cp*self.Liquido.mu/self.Liquido.k
             if self.x > 0:
                 # There is gas phase
-                Hg = self.Gas._Ho(self.T).Jg*self.Gas.caudalmasico.gh
-                self.Gas.h = unidades.Power(Hg-R*self.T/self.M*self.H_exc[0]*self.x*self.Gas.caudalmasico.gh, "Jh")
-                self.Gas.cp = self.Gas.Cp_Gas(T, self.P.atm)
                 self.Gas.rho = unidades.Density(self.P.atm/self.Gas.Z/R_atml/self.T*self.M, "gl")
                 self.Gas.rhoSd = unidades.Density(1./self.Gas.Z/R_atml/298.15*self.M, "gl")
                 self.Gas.mu = self.Gas.Mu_Gas(T, self.P.atm, self.Gas.rho)
@@ -541,9 +548,11 @@ class Corriente(config.Entity):
                 self.Liquido.sigma = compuesto.sigma
                 self.Liquido.ids = self.ids
 
-        if Config.get("Components", "Solids"):
+        if "Solids" in Config.Components:
             if self.kwargs["solido"]:
                 self.solido = self.kwargs["solido"]
+            elif previous is not None and previous.solido is not None:
+                self.solido = copy(previous.solido)
             else:
                 self.solido = Solid(**self.kwargs)
             if self.solido.status:
@@ -561,13 +570,13 @@ class Corriente(config.Entity):
 
     def _method(self):
         """Find the thermodynamic method to use"""
-        Config = config.getMainWindowConfig()
+        Config = config.getSnapshot()
 
         # MEoS availability,
         if self.kwargs["MEoS"] is not None:
             _meos = self.kwargs["MEoS"]
         else:
-            _meos = Config.getboolean("Thermo", "MEoS")
+            _meos = Config.Thermo.MEoS
         mEoS_available = self.ids[0] in mEoS.id_mEoS
         MEoS = _meos and len(self.ids) == 1 and mEoS_available
 
@@ -575,14 +584,14 @@ class Corriente(config.Entity):
         if self.kwargs["iapws"] is not None:
             _iapws = self.kwargs["iapws"]
         else:
-            _iapws = Config.getboolean("Thermo", "iapws")
+            _iapws = Config.Thermo.iapws
         IAPWS = _iapws and len(self.ids) == 1 and self.ids[0] == 62
 
         # freesteam availability
         if self.kwargs["freesteam"] is not None:
             _freesteam = self.kwargs["freesteam"]
         else:
-            _freesteam = Config.getboolean("Thermo", "freesteam")
+            _freesteam = Config.Thermo.freesteam
         FREESTEAM = _freesteam and len(self.ids) == 1 and \
             self.ids[0] == 62 and os.environ["freesteam"]
 
@@ -601,21 +610,21 @@ class Corriente(config.Entity):
         if self.kwargs["coolProp"] is not None:
             _coolprop = self.kwargs["coolProp"]
         else:
-            _coolprop = Config.getboolean("Thermo", "coolprop")
+            _coolprop = Config.Thermo.coolprop
         COOLPROP = _coolprop and os.environ["CoolProp"] and COOLPROP_available
 
         # refprop availability
         if self.kwargs["refprop"] is not None:
             _refprop = self.kwargs["refprop"]
         else:
-            _refprop = Config.getboolean("Thermo", "refprop")
+            _refprop = Config.Thermo.refprop
         REFPROP = _refprop and os.environ["refprop"] and REFPROP_available
 
         # GERG availability
         if self.kwargs["GERG"] is not None:
             _gerg = self.kwargs["GERG"]
         else:
-            _gerg = Config.getboolean("Thermo", "GERG")
+            _gerg = Config.Thermo.GERG
         GERG = _gerg and GERG_available
 
         # Final selection
@@ -637,6 +646,92 @@ class Corriente(config.Entity):
         else:
             self._thermo = "eos"
 
+    def _methodEoS(self):
+        """Return the K and H equation of state classes to use"""
+        Config = config.getSnapshot()
+        if self.kwargs["K"]:
+            K = EoS.K[EoS.K_name.index(self.kwargs["K"])]
+        else:
+            K = EoS.K[Config.Thermo.K]
+        if self.kwargs["H"]:
+            H = EoS.H[EoS.H_name.index(self.kwargs["H"])]
+        else:
+            H = EoS.H[Config.Thermo.H]
+        return K, H
+
+    def _phasesEoS(self, T, P, K, H, eos0=None):
+        """Calculate the phase equilibrium and the enthalpy and heat capacity
+        of phases with the eos thermodynamic method, without the transport
+        properties
+
+        Parameters
+        ----------
+        T : float
+            Temperature, [K]
+        P : float
+            Pressure, [Pa]
+        K : class
+            Equation of state to use for phase equilibrium
+        H : class
+            Equation of state to use for enthalpy
+        eos0 : EoS
+            Previous equilibrium to use as initial estimation
+
+        Returns
+        -------
+        eos : EoS
+            Phase equilibrium instance
+        Liquido, Gas : Mezcla
+            Phases with the enthalpy flow, h, specific heat, cp, and
+            compressibility factor, Z, defined
+        H_exc : list
+            Excess enthalpy of phases
+        """
+        P = unidades.Pressure(P)
+        kw = {}
+        if eos0 is not None and issubclass(K, EoSBase) and 0 < eos0.x < 1:
+            kw["Ki0"] = eos0.Ki
+            kw["x0"] = eos0.x
+        eos = K(T, P.atm, self.mezcla, **kw)
+        x = eos.x
+
+        # The single phase is a copy of mezcla to avoid change its properties
+        if 0. < x < 1.:
+            Liquido = Mezcla(tipo=5, fraccionMolar=eos.xi,
+                             caudalMolar=self.caudalmolar*(1-x))
+            Gas = Mezcla(tipo=5, fraccionMolar=eos.yi,
+                         caudalMolar=self.caudalmolar*x)
+        elif x <= 0:
+            Liquido = copy(self.mezcla)
+            Gas = Mezcla()
+        else:
+            Liquido = Mezcla()
+            Gas = copy(self.mezcla)
+        Gas.Z = unidades.Dimensionless(float(eos.Z[0]))
+        Liquido.Z = unidades.Dimensionless(float(eos.Z[1]))
+
+        if H == K:
+            eosH = eos
+        else:
+            eosH = H(T, P.atm, self.mezcla)
+        H_exc = eosH.H_exc
+        M = self.mezcla.M
+
+        Liquido.h = unidades.Power(0)
+        Gas.h = unidades.Power(0)
+        if x < 1:
+            Hl = (Liquido._Ho(T).Jg-Liquido.Hv_DIPPR(T).Jg) * \
+                Liquido.caudalmasico.gh
+            Liquido.h = unidades.Power(
+                Hl-R*T/M*H_exc[1]*(1-x)*Liquido.caudalmasico.gh, "Jh")
+            Liquido.cp = Liquido.Cp_Liquido(T)
+        if x > 0:
+            Hg = Gas._Ho(T).Jg*Gas.caudalmasico.gh
+            Gas.h = unidades.Power(
+                Hg-R*T/M*H_exc[0]*x*Gas.caudalmasico.gh, "Jh")
+            Gas.cp = Gas.Cp_Gas(T, P.atm)
+        return eos, Liquido, Gas, H_exc
+
     def setSolid(self, solid):
         self.solido = solid
 
@@ -649,8 +744,15 @@ class Corriente(config.Entity):
         return psystream
 
     def clone(self, **kwargs):
-        """Create a new stream instance with change only kwags new values"""
+        """Create a new stream instance with change only kwags new values
+
+        When only the thermodynamic state change (T, P or x) the new stream
+        share the composition of this stream and use its state as initial
+        estimation for the new calculation"""
         old_kwargs = self.kwargs.copy()
+        share = self.status and set(kwargs).issubset(self.kwargs_state) and \
+            not self.kwargs["caudalVolumetrico"] and \
+            getattr(self, "mezcla", None) is not None
         if "split" in kwargs:
             split = kwargs["split"]
             del kwargs["split"]
@@ -672,7 +774,237 @@ class Corriente(config.Entity):
             old_kwargs.update(kwargs["mezcla"].kwargs)
             del kwargs["mezcla"]
         old_kwargs.update(kwargs)
-        return Corriente(**old_kwargs)
+
+        stream = Corriente()
+        if share:
+            stream._previous = self
+        stream(**old_kwargs)
+        stream._previous = None
+        return stream
+
+    def clonePh(self, h, P=None):
+        """Create a new stream instance with the same composition at the
+        specified enthalpy and pressure
+
+        Parameters
+        ----------
+        h : float
+            Enthalpy flow of new stream, same units as stream h, [W]
+        P : float
+            Pressure of new stream, default the stream pressure, [Pa]
+
+        The thermodynamic backends with P-h flash (meos, iapws, freesteam,
+        coolprop, refprop) solve directly the state, the other methods use a
+        newton solver for temperature with the heat capacity as derivative,
+        calculating only the thermodynamic properties in each iteration. The
+        transport properties are calculated only once for the solution.
+
+        Examples
+        --------
+        >>> st = Corriente(T=300, P=1e5, caudalMasico=1, ids=[62],
+        ...                fraccionMolar=[1.], MEoS=True, iapws=False)
+        >>> st2 = st.clonePh(st.h+1e5)
+        >>> "%0.2f %0.1f" % (st2.T, st2.h-st.h)
+        '323.92 100000.0'
+        >>> st3 = st.clonePh(st.h+2e6, P=2e5)
+        >>> "%0.2f %0.4f %0.1f" % (st3.T, st3.x, st3.h-st.h)
+        '393.36 0.7304 2000000.0'
+
+        The subcooled liquid from a vapor stream, to the saturated liquid too
+
+        >>> Tsat, liquid, gas = st3._saturation(st3.P, "h")
+        >>> st4 = st3.clonePh(liquid*st3.caudalmasico)
+        >>> "%0.2f %0.1f" % (st4.T, st4.x)
+        '393.36 0.0'
+        >>> "%0.2f" % st3.clonePh(st.h).T
+        '299.98'
+        """
+        return self._cloneState("h", h, P)
+
+    def clonePs(self, s, P=None):
+        """Create a new stream instance with the same composition at the
+        specified entropy and pressure, see :func:`clonePh`
+
+        Parameters
+        ----------
+        s : float
+            Entropy flow of new stream, same units as stream s, [W/K]
+        P : float
+            Pressure of new stream, default the stream pressure, [Pa]
+
+        Notes
+        -----
+        The eos thermodynamic method don't calculate the entropy of stream,
+        so the P-s clone raise ValueError for that method
+
+        Examples
+        --------
+        >>> st = Corriente(T=300, P=1e5, caudalMasico=1, ids=[62],
+        ...                fraccionMolar=[1.], MEoS=True, iapws=False)
+        >>> st2 = st.clonePs(st.s, P=1e7)
+        >>> "%0.2f %0.3f" % (st2.T, abs(st2.s-st.s))
+        '300.20 0.000'
+        """
+        return self._cloneState("s", s, P)
+
+    def _cloneState(self, prop, value, P=None):
+        """Create a new stream instance with the specified value of a
+        enthalpy or entropy flow and the pressure"""
+        if P is None:
+            P = self.P
+        P = unidades.Pressure(P)
+        if not self.status:
+            raise ValueError("The stream is not calculated")
+        if prop == "s" and self._thermo == "eos":
+            raise ValueError(
+                "Entropy not available for the eos thermodynamic method")
+
+        # The flash is done with the specific value
+        spec = value/self.caudalmasico
+
+        Tmin, Tmax = 0, None
+        ref = self
+        if len(self.ids) == 1 and P < self.Pc and self._thermo != "eos":
+            # Pure component, check first the two phases region, it's faster
+            # than the failed iteration of meos P-h flash in that region
+            Tsat, liquid, gas = self._saturation(P, prop)
+            # The saturated liquid is solved as liquid, the stream don't
+            # support a null quality as input
+            if liquid < spec <= gas:
+                return self.clone(P=P, x=(spec-liquid)/(gas-liquid))
+            # The initial estimation from the other phase can be out of the
+            # equation limits, in that case start near the saturated state
+            current = getattr(self, prop)/self.caudalmasico
+            if spec <= liquid:
+                Tmax = Tsat*(1-1e-6)
+                if current > liquid:
+                    ref = self.clone(T=Tmax, P=P)
+                    if spec >= getattr(ref, prop)/self.caudalmasico:
+                        return ref
+            else:
+                Tmin = Tsat*(1+1e-6)
+                if current < gas:
+                    ref = self.clone(T=Tmin, P=P)
+                    if spec <= getattr(ref, prop)/self.caudalmasico:
+                        return ref
+
+        T = self._flashNative(P, prop, spec)
+        if T is None:
+            if self._thermo == "eos":
+                T = self._solveEoS(P, value)
+            else:
+                T = ref._solveState(P, prop, value, Tmin, Tmax)
+        return self.clone(T=T, P=P)
+
+    def _saturation(self, P, prop):
+        """Return the saturation temperature and the specific value of
+        property for saturated liquid and vapor of pure component"""
+        Config = config.getSnapshot()
+        key = (Config, self._thermo, self.ids[0], float(P))
+        sat = self._saturationCache.get(key)
+        if sat is None:
+            stream = self.clone(P=P, x=0.5)
+            sat = (stream.T,
+                   {"h": (stream.Liquido.h, stream.Gas.h),
+                    "s": (stream.Liquido.s, stream.Gas.s)})
+            self._saturationCache.set(key, sat)
+        return (sat[0], ) + sat[1][prop]
+
+    def _flashNative(self, P, prop, value):
+        """Calculate the temperature with the P-h or P-s flash of
+        thermodynamic backend, return None if it's not available"""
+        kw = {"P": P, prop: value}
+        try:
+            if self._thermo == "meos":
+                cmp = mEoS.__all__[mEoS.id_mEoS.index(self.ids[0])](**kw)
+            elif self._thermo == "iapws":
+                cmp = iapws97.IAPWS97(**kw)
+            elif self._thermo == "freesteam":
+                cmp = freeSteam.Freesteam(**kw)
+            elif self._thermo == "coolprop":
+                cmp = coolProp.CoolProp(
+                    ids=self.ids, fraccionMolar=self.fraccion, **kw)
+            elif self._thermo == "refprop":
+                cmp = refProp.RefProp(
+                    ids=self.ids, fraccionMolar=self.fraccion, **kw)
+            else:
+                return None
+
+        # The backends solver raise different errors when the iteration fail,
+        # in that case the state is solved in temperature
+        except Exception as error:
+            logging.debug("%s P-%s flash failed: %s" % (
+                self._thermo, prop, error))
+            return None
+
+        if not cmp.status:
+            return None
+        return getattr(cmp, "T", None)
+
+    def _solveEoS(self, P, h):
+        """Calculate the temperature with the specified enthalpy flow with the
+        eos thermodynamic method, only the phase equilibrium and enthalpy are
+        calculated in each iteration"""
+        K, H = self._methodEoS()
+        state = {"eos": getattr(self, "eos", None)}
+
+        def f(T):
+            eos, Liquido, Gas, H_exc = self._phasesEoS(
+                T, P, K, H, state["eos"])
+            state["eos"] = eos
+            return Liquido.h+Gas.h-h, _heatCapacity(eos.x, Liquido, Gas)
+
+        T0 = self.T+(h-self.h)/_heatCapacity(self.x, self.Liquido, self.Gas)
+        return _solveT(f, T0)
+
+    def _solveState(self, P, prop, value, Tmin=0, Tmax=None):
+        """Calculate the temperature with the specified value of enthalpy or
+        entropy flow in backends without native flash, solving the stream
+        in each iteration"""
+        def f(T):
+            stream = self.clone(T=T, P=P)
+            cp = _heatCapacity(stream.x, stream.Liquido, stream.Gas)
+            if prop == "s":
+                cp /= T
+            return getattr(stream, prop)-value, cp
+
+        cp = _heatCapacity(self.x, self.Liquido, self.Gas)
+        if prop == "s":
+            cp /= self.T
+        T0 = self.T+(value-getattr(self, prop))/cp
+        return _solveT(f, T0, Tmin, Tmax)
+
+    def stateKey(self):
+        """Return a hashable key with the state of stream, thermodynamic
+        method and its stream specific options, temperature, pressure, vapor
+        fraction, component flows and solid definition, used to memoize the
+        equipment calculations
+
+        Streams with different equation of state don't share the equipment
+        cache
+
+        >>> from equipment.pump import Pump
+        >>> kw = {"T": 300, "P": 101325, "caudalMasico": 1, "ids": [62],
+        ...       "fraccionMolar": [1.]}
+        >>> pr = Corriente(K="Peng-Robinson", **kw)
+        >>> srk = Corriente(K="Soave-Redlich-Kwong", **kw)
+        >>> pr.stateKey() == srk.stateKey()
+        False
+        >>> a = Pump(entrada=pr, rendimiento=0.75, deltaP=20*101325)
+        >>> b = Pump(entrada=srk, rendimiento=0.75, deltaP=20*101325)
+        >>> a.cacheKey() == b.cacheKey()
+        False
+        """
+        if not self.status:
+            return None
+        solid = None
+        solido = getattr(self, "solido", None)
+        if solido is not None and solido.status:
+            solid = solido.kwargs
+        method = [self.kwargs[key] for key in self.kwargs_method]
+        return hashable((
+            self._thermo, method, self.ids, self.T, self.P, self.x,
+            self.caudalunitariomolar, solid))
 
     def __repr__(self):
         if self.status:
@@ -1007,10 +1339,10 @@ class Corriente(config.Entity):
         self.mezcla.readStatefromJSON(state["mezcla"])
         self.ids = self.mezcla.ids
         self.componente = self.mezcla.componente
-        self.fraccion = self.mezcla.fraccion
+        self.fraccion = list(self.mezcla.fraccion)
         self.caudalmasico = self.mezcla.caudalmasico
         self.caudalmolar = self.mezcla.caudalmolar
-        self.fraccion_masica = self.mezcla.fraccion_masica
+        self.fraccion_masica = list(self.mezcla.fraccion_masica)
         self.caudalunitariomasico = self.mezcla.caudalunitariomasico
         self.caudalunitariomolar = self.mezcla.caudalunitariomolar
 
@@ -1051,6 +1383,83 @@ class Corriente(config.Entity):
             self.Liquido.sigma = unidades.Tension(state["liquid"]["sigma"])
 
 
+def _heatCapacity(x, Liquido, Gas):
+    """Isobaric heat capacity of stream, without latent heat, [W/K]"""
+    cp = 0
+    if x < 1:
+        cp += Liquido.cp*Liquido.caudalmasico
+    if x > 0:
+        cp += Gas.cp*Gas.caudalmasico
+    return cp
+
+
+def _solveT(f, T0, Tmin=0, Tmax=None, tol=1e-6, maxiter=50):
+    """Safeguarded newton solver for temperature, used to calculate the
+    stream state with a specified enthalpy or entropy
+
+    Parameters
+    ----------
+    f : function
+        Function with the residual and its derivative with temperature,
+        the residual must be increasing with temperature
+    T0 : float
+        Initial temperature, [K]
+    Tmin, Tmax : float
+        Bounds of temperature, [K]
+    tol : float
+        Tolerance in temperature, [K]
+
+    The newton step is replaced by a bisection when it goes out of the
+    bracket of the root, so the solver converge too in the discontinuities
+    of heat capacity like the phase boundaries
+
+    Examples
+    --------
+    Enthalpy with a steep latent heat step at 350 K
+
+    >>> def f(T):
+    ...     if T < 350:
+    ...         return 4*(T-300)-500, 4
+    ...     return 4*(T-300)+1000*min(T-350, 1)-500, 4
+    >>> "%0.4f" % _solveT(f, 300)
+    '350.2988'
+    """
+    if Tmax is None:
+        Tmax = float("inf")
+    T = T0
+    if not Tmin < T < Tmax:
+        if Tmax == float("inf"):
+            T = Tmin+10
+        else:
+            T = (Tmin+Tmax)/2
+
+    for i in range(maxiter):
+        y, dy = f(T)
+        if y == 0:
+            return T
+        if y > 0:
+            Tmax = T
+        else:
+            Tmin = T
+
+        if dy > 0:
+            Tn = T-y/dy
+        else:
+            Tn = None
+        if Tn is None or not Tmin < Tn < Tmax:
+            if Tmax == float("inf"):
+                Tn = 2*T
+            else:
+                Tn = (Tmin+Tmax)/2
+
+        if abs(Tn-T) < tol:
+            return Tn
+        T = Tn
+
+    logging.warning("Stream temperature solver not converged, %g K" % T)
+    return T
+
+
 class PsyStream(config.Entity):
     """
     Class to model a stream as psychrometric state
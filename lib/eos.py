@@ -22,6 +22,8 @@ from scipy import exp, log
 from scipy.optimize import fsolve
 
 from lib import unidades
+from lib.profiling import count, profiled
+from lib.thread import checkCancel
 from lib.utilities import refDoc
 
 
@@ -75,6 +77,7 @@ class EoS(object):
         print("ERROR: Liquid-Vapor fugacities unimplemented")
         return
 
+    @profiled("EoS.flash")
     def _Flash(self):
         """Calculation K values for liquid-vapour phase equilibrium
         Naji, H.S.
@@ -82,10 +85,12 @@ class EoS(object):
         and Peng-Robinson Equations of State
         Emirates J. Eng. Res. 13(3) (2008) 81-91
         """
-        # Initial estimation using Wilson correlation, Eq 19
+        # Wilson correlation, Eq 19, used to check the single phase region at
+        # the current conditions
         Ki = []
         for c in self.componente:
-            Ki.append(c.Pc/self.P*exp(5.37*(1.+c.f_acent)*(1.-c.Tc/self.T)))
+            Ki.append(
+                c.Pc/self.P*exp(5.37*(1.+c.f_acent)*(1.-c.Tc/self.T)))
 
         # Rachford-Rice equation, [1]_
         def RR(q):
@@ -109,11 +114,28 @@ class EoS(object):
             Zl = self._Z(self.zi, self.T, self.P)[0]
             Zv = None
         else:
+            # The K values of a previous equilibrium, if it's available, are
+            # only used as initial estimation of successive substitution
+            Kwilson = Ki
             q = 0.5
+            restart = False
+            Ki0 = self.kwargs.get("Ki0", None)
+            if Ki0 is not None and len(Ki0) == len(self.componente):
+                Ki = list(Ki0)
+                q = self.kwargs.get("x0", 0.5)
+                restart = True
             while True:
+                checkCancel()
+                count("iterations")
                 qo = q
                 solucion = fsolve(RR, q, full_output=True)
-                if solucion[2] != 1:
+                if solucion[2] != 1 and restart:
+                    # The previous equilibrium is too far, start again with
+                    # the Wilson estimation
+                    Ki = Kwilson
+                    q = 0.5
+                    restart = False
+                elif solucion[2] != 1:
                     print(solucion)
                     break
                 else:
@@ -25,7 +25,8 @@ Module for implement friction factor related functionality
 Global function with all functionality, :func:`f_friccion`
 
 Friction factor for rough pipes, Colebrook-White intrinsic equation is solved
-by iteration so so many method have been implement to get direct equations:
+exactly with the Wright omega function, and so many method have been
+implement to get direct equations:
 
     * :func:`f_colebrook`
     * :func:`f_chen`
@@ -58,15 +59,19 @@ by iteration so so many method have been implement to get direct equations:
     * :func:`f_altshul`
 
 
+All the correlations accept numpy arrays of Reynolds number and relative
+roughness and broadcast them, so a full Moody chart or the segments of a pipe
+network can be evaluated in a single call.
+
 **Fitting accesories K**
 
 TODO
 '''
 
 
-from math import exp, log, log10, sqrt, sin, pi
-
-from scipy.optimize import fsolve
+from numpy import (asarray, errstate, exp, log, log10, ndim, pi, sin, sqrt,
+                   where)
+from scipy.special import wrightomega
 
 from lib.unidades import Dimensionless
 from lib.utilities import refDoc
@@ -237,17 +242,26 @@ __doi__ = {
          "doi": ""},
 
     30:
-        {"autor": "",
-         "title": "",
-         "ref": "",
-         "doi": ""},
+        {"autor": "More, A.A.",
+         "title": "Analytical solutions for the Colebrook and White equation "
+                  "and for pressure drop in ideal gas flow in pipes",
+         "ref": "Chem. Eng. Sci. 61(16) (2006) 5515-5519",
+         "doi": "10.1016/j.ces.2006.04.003"},
         }
 
 
 # Friction factor for pipes
 # All this function return the darcy friction factor, fanning friction factor
 # can be obtained divided darcy factor by 4.
-@refDoc(__doi__, [1])
+def _result(f):
+    """Return the friction factor as Dimensionless for scalar input or as
+    array when the input parameters are arrays"""
+    if ndim(f):
+        return f
+    return Dimensionless(float(f))
+
+
+@refDoc(__doi__, [1, 30])
 def f_colebrook(Re, eD):
     r"""Calculates friction factor `f` with Colebrook-White correlation (1939)
 
@@ -269,14 +283,32 @@ def f_colebrook(Re, eD):
 
     Notes
     -----
-    This is the original, implicit expression, slowlest to solve
+    This is the original, implicit expression. Written as a function of
+    :math:`x=1/\sqrt{f}` it has an exact solution with the Lambert W function
+    [30]_, here evaluated with the Wright omega function
+    :math:`\omega(y)=W(e^y)` to avoid the overflow of exponential with large
+    roughness
+
+    .. math::
+        x=-\frac{2}{\ln 10}\ln\left(a\omega\left(\frac{b}{a}-\ln a
+        \right)\right)
+
+    with :math:`a=2\cdot2.51/Re/\ln 10` and :math:`b=\epsilon/D/3.7`
+
+    Examples
+    --------
+    >>> from numpy import array
+    >>> "%0.6f" % f_colebrook(1e5, 1e-4)
+    '0.018514'
+    >>> "%0.6f %0.6f" % tuple(f_colebrook(array([1e5, 1e7]), 1e-4))
+    '0.018514 0.012166'
     """
-    fo = f_chen(Re, eD)
-    if eD:
-        f = fsolve(lambda x: 1/x**0.5+2.0*log10(eD/3.7+2.51/Re/x**0.5), fo)
-    else:
-        f = fsolve(lambda x: 1/x**0.5-2.0*log10(Re*x**0.5)+0.8, fo)
-    return Dimensionless(f[0])
+    c = 2/log(10)
+    a = 2.51*c/Re
+    b = asarray(eD)/3.7
+    w = wrightomega(b/a-log(a)).real
+    f = 1/(c*log(a*w))**2
+    return _result(f)
 
 
 @refDoc(__doi__, [2])
@@ -310,7 +342,7 @@ def f_chen1979(Re, eD):
     # Eq 7
     A = eD**1.1098/2.8257+5.8506/Re**0.8981
     f = 1/(-2*log10(eD/3.7065-5.0452/Re*log10(A)))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [3])
@@ -340,7 +372,7 @@ def f_chen(Re, eD):
     """
     A = eD/3.7+(6.7/Re)**0.9
     f = 1/(-2*log10(eD/3.7-5.02/Re*log10(A)))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [4])
@@ -371,7 +403,7 @@ def f_moody(Re, eD):
         * 0<= eD < 0.01.
     """
     f = 5.5e-3*(1+(2e4*eD+1e6/Re)**(1./3))
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [5])
@@ -409,7 +441,7 @@ def f_churchill(Re, eD):
     A = (2.457*log(1/(0.27*eD+(7./Re)**0.9)))**16
     B = (37530./Re)**16
     f = 8.*((8./Re)**12+(A+B)**-1.5)**(1./12)
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [6])
@@ -446,7 +478,7 @@ def f_wood(Re, eD):
     b = 88*eD**0.44
     c = -1.62*eD**0.134
     f = a + b*Re**c
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [7])
@@ -478,7 +510,7 @@ def f_haaland(Re, eD):
     """
     # Eq 8
     f = 1/(-1.8*log10((eD/3.75)**1.11+6.9/Re))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [8])
@@ -513,7 +545,7 @@ def f_serghides(Re, eD):
     B = -2*log10(eD/3.7+2.51*A/Re)
     C = -2*log10(eD/3.7+2.51*B/Re)
     f = (A-(B-A)**2/(C-2*B+A))**-2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [9])
@@ -545,7 +577,7 @@ def f_round(Re, eD):
     """
     # Eq 8
     f = 1/(1.8*log10(Re/(0.135*Re*eD+6.5)))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [10])
@@ -576,7 +608,7 @@ def f_swamee(Re, eD):
         * 1e-6 <= eD <= 5e-2
     """
     f = 1/(-2*log10(eD/3.7+(6.97/Re)**0.9))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [11])
@@ -607,7 +639,7 @@ def f_jain(Re, eD):
         * 4e-5 <= eD <= 0.05
     """
     f = 1/(1.14-2*log10(eD+(29.843/Re)**0.9))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [12])
@@ -633,7 +665,7 @@ def f_barr(Re, eD):
     """
     # Eq 6
     f = 1/(2*log10(eD/3.7+4.518*log10(Re/7)/Re/(1+Re**0.52/29*eD**0.7)))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [13])
@@ -669,7 +701,7 @@ def f_zigrang(Re, eD):
     # Eq 12
     A = log10(eD/3.7-5.02/Re*log10(eD/3.7+13./Re))
     f = 1/(-2*log10(eD/3.7-5.02*A/Re))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [14])
@@ -692,7 +724,7 @@ def f_altshul(Re, eD):
         Friction factor, [-]
     """
     f = 0.11*(eD+68/Re)**0.25
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [14])
@@ -725,10 +757,9 @@ def f_tsal(Re, eD):
         * 4e3 <= Re <= 1e8
         * eD <= 0.05
     """
-    f = 0.11*(68/Re+eD)**0.25
-    if f < 0.018:
-        f = 0.0028+0.85*f
-    return f
+    A = 0.11*(68/Re+eD)**0.25
+    f = where(A < 0.018, 0.0028+0.85*A, A)
+    return _result(f)
 
 
 @refDoc(__doi__, [15])
@@ -752,7 +783,7 @@ def f_eck(Re, eD):
         Friction factor, [-]
     """
     f = 1/(-2*log10(eD/3.71+15/Re))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [16])
@@ -783,7 +814,7 @@ def f_shacham(Re, eD):
         * 4e3 <= Re <= 4e8
     """
     f = 1/(-2*log10(eD/3.7-5.02/Re*log10(eD/3.7+14.5/Re)))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [17])
@@ -814,7 +845,7 @@ def f_manadilli(Re, eD):
         * eD <= 0.05
     """
     f = 1/(-2*log10(eD/3.7+95./Re**0.983-96.82/Re))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [18])
@@ -849,7 +880,7 @@ def f_romeo(Re, eD):
     A = log10((eD/7.7918)**0.9924+(5.3326/(208.815+Re))**0.9345)
     B = log10(eD/3.827-4.567/Re*A)
     f = 1/(-2*log10(eD/3.7065-5.0272*B/Re))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [19])
@@ -883,7 +914,7 @@ def f_goudar2007(Re, eD):
     """
     C = 0.124*Re*eD+log(0.4587*Re)
     f = 1/(0.8686*log(0.4587*Re/(C-0.31)**(C/(C+1))))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [27])
@@ -913,7 +944,7 @@ def f_goudar(Re, eD):
     Dcfa = Dla*(1+z/2/((g+1)**2+z/3*(2*g-1)))
 
     f = (a*(log(d/q)+Dcfa))**-2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [20])
@@ -946,7 +977,7 @@ def f_buzzelli(Re, eD):
     A = (0.744*log(Re)-1.41)/(1+1.32*eD**0.5)
     B = eD/3.7*Re+2.51*A
     f = 1/(A-((A+2*log10(B/Re))/(1+2.18/B)))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [21])
@@ -967,7 +998,7 @@ def f_Vatankhah(Re, eD):
     """
     S = 0.124*Re*eD+log(0.4587*Re)
     f = 1/(0.8686*log(0.4587*Re/(S-0.31)**(S/(S+0.9633))))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [22])
@@ -993,7 +1024,7 @@ def f_avci(Re, eD):
     """
     # Eq 17
     f = 6.4/(log(Re)-log(1+0.01*Re*eD*(1+10*eD**0.5)))**2.4
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [23])
@@ -1025,7 +1056,7 @@ def f_papaevangelou(Re, eD):
     """
     # Eq 12
     f = (0.2479-9.47e-5*(7-log10(Re))**4)/log10(eD/3.615+7.366/Re**0.9142)**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [24])
@@ -1060,7 +1091,7 @@ def f_brkic(Re, eD, alternate=False):
     else:
         f = 1/(-2*log10(10**(-0.4343*S)+eD/3.71))**2
 
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [25])
@@ -1093,7 +1124,7 @@ def f_fang(Re, eD):
     """
     # Eq 13
     f = 1.613/(log(0.234*eD**1.1007-60.525/Re**1.1105+56.291/Re**1.0712))**2
-    return Dimensionless(f)
+    return _result(f)
 
 
 @refDoc(__doi__, [26])
@@ -1118,7 +1149,8 @@ def f_ghanbari(Re, eD):
         Friction factor, [-]
     """
     # Eq 10
-    return (-1.52*log10((eD/7.21)**1.042+(2.731/Re)**0.9152))**-2.169
+    f = (-1.52*log10((eD/7.21)**1.042+(2.731/Re)**0.9152))**-2.169
+    return _result(f)
 
 
 @refDoc(__doi__, [28])
@@ -1147,7 +1179,7 @@ def f_Samadianfard(Re, eD):
     f = (Re**eD-0.6315093)/(Re**(1/3)+Re*eD) + \
         0.0275308*(6.929841/Re+eD)**(1/9) + \
         10**eD/(eD+4.481616)*(eD**0.5+9.99701/Re)
-    return f
+    return _result(f)
 
 
 f_list = (f_colebrook, f_chen, f_Vatankhah, f_buzzelli, f_romeo, f_serghides,
@@ -1185,9 +1217,9 @@ def f_friccion(Re, eD=0, method=0, geometry=0, *args):
 
     Parameters
     ----------
-    Re : float
+    Re : float or array
         Reynolds number, [-]
-    eD : float
+    eD : float or array
         Relative roughness of a pipe, [-]
     method: int
         Index of method to use (default 0 for use Colebrook original function):
@@ -1232,6 +1264,9 @@ def f_friccion(Re, eD=0, method=0, geometry=0, *args):
             * 4 - Ellipse
             * 5 - Right triangle
             * 6 - Anulli
+
+        The laminar friction factor of triangular geometries isn't
+        implemented, raise ValueError in laminar flow
     args: float
         Other parameter necessary for noncircular geometries
 
@@ -1240,43 +1275,65 @@ def f_friccion(Re, eD=0, method=0, geometry=0, *args):
             * Ellipse: Both diameters of ellipse, [m]
             * Right triangle: Angle, [º]
             * Anulli: Internal and external diameter, [m]
+
+    Returns
+    -------
+    f : float
+        Friction factor, fanning for laminar flow and darcy for turbulent
+        flow, array if Re or eD are arrays, [-]
+
+    Examples
+    --------
+    >>> from numpy import array
+    >>> f = f_friccion(array([1e3, 1e5]), 1e-4)
+    >>> "%0.3f %0.6f %0.6f" % (f[0], f[1], f_friccion(1e5, 1e-4))
+    '0.016 0.018514 0.018514'
     """
-    if Re < 2100:
+    Re = asarray(Re, dtype=float)
+    laminar = Re < 2100
+
+    if laminar.any():
         if geometry == 0:
             # Circle
-            f_friccion = 16./Re
+            f_laminar = 16./Re
         elif geometry == 1:
             # Square
-            f_friccion = 14.2/Re
-        elif geometry == 2:
-            # Isosceles triangle
-            pass
+            f_laminar = 14.2/Re
         elif geometry == 3:
             # Rectangle
             D, d = args[1], args[0]
-            f_friccion = 16/(2/3+11/24*d/D*(2-d/D))/Re
+            f_laminar = 16/(2/3+11/24*d/D*(2-d/D))/Re
         elif geometry == 4:
             # Ellipse
             D, d = args[1], args[0]
             c = (D-d)/(D+d)
             Dh = 4*d*D*(64-16*c**2)/((d+D)*(64-3*c**4))
-            f_friccion = 2*Dh**2*(D**2+d**2)/D**2/d**2/Re
-        elif geometry == 5:
-            pass
+            f_laminar = 2*Dh**2*(D**2+d**2)/D**2/d**2/Re
         elif geometry == 6:
             # Annulli
             # Eq 7.9, 7.10, pag 183
             Di, Do = args
             alpha = (Do-Di)**2/(Do**2+Di**2-(Do**2-Di**2)/log(Do/Di))
-            f_friccion = 16*alpha/Re
-
-    else:
-        if geometry == 6:
-            f_friccion = f_Gnielinsky(Re)
+            f_laminar = 16*alpha/Re
         else:
-            f_friccion = f_list[method](Re, eD)
+            raise ValueError(
+                "Laminar friction factor unavailable for geometry %i" %
+                geometry)
+    else:
+        f_laminar = Re
+
+    if not laminar.all():
+        # The turbulent correlations are evaluated in all the points, the
+        # laminar values are discarded
+        with errstate(all="ignore"):
+            if geometry == 6:
+                f_turbulent = f_Gnielinsky(Re)
+            else:
+                f_turbulent = f_list[method](Re, eD)
+    else:
+        f_turbulent = Re
 
-    return Dimensionless(f_friccion)
+    return _result(where(laminar, f_laminar, f_turbulent))
 
 
 @refDoc(__doi__, [1])
@@ -172,6 +172,7 @@ from lib.EoS.cubic import CubicHelmholtz
 from lib.EoS.Cubic import PR
 from lib.mezcla import Mezcla
 from lib.physics import Collision_Neufeld
+from lib.profiling import count, profiled
 from lib.thermo import ThermoAdvanced
 from lib.utilities import SimpleEq, refDoc
 
@@ -1358,6 +1359,7 @@ class MEoS(ThermoAdvanced):
 
         return bool(self._mode)
 
+    @profiled("MEoS.calculo")
     def calculo(self):
         """Calculate procedure"""
 
@@ -2431,6 +2433,7 @@ class MEoS(ThermoAdvanced):
         # Phase identification parameter
         # PI = 2-rho*(d2PdrhodT/dPdT-d2pdrho2/dPdrho)
 
+    @profiled("MEoS.fsolve")
     def fsolve(self, f, f2=None, **kwargs):
         """Procedure to iterate to calculate T and rho in input pair without
         some of that unknown
@@ -2486,6 +2489,7 @@ class MEoS(ThermoAdvanced):
                 try:
                     rinput = fsolve(f, r, full_output=True)
                     rho = rinput[0][0]
+                    count("nfev", rinput[1]["nfev"])
                 except:
                     pass
                 else:
@@ -2501,6 +2505,7 @@ class MEoS(ThermoAdvanced):
                 try:
                     rinput = fsolve(f, t, full_output=True)
                     T = rinput[0][0]
+                    count("nfev", rinput[1]["nfev"])
                 except:
                     pass
                 else:
@@ -2520,6 +2525,7 @@ class MEoS(ThermoAdvanced):
                 try:
                     rinput = fsolve(f, [r, t], full_output=True)
                     rho, T = rinput[0]
+                    count("nfev", rinput[1]["nfev"])
                 except:
                     pass
                 else:
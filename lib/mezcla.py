@@ -83,6 +83,7 @@ from lib.compuestos import (Componente, RhoL_Costald, RhoL_AaltoKeskinen,
                             MuG_API, ThG_StielThodos)
 from lib.physics import R_atml, Collision_Neufeld
 from lib import unidades, config
+from lib.profiling import profiled
 from lib.utilities import refDoc
 
 
@@ -3457,6 +3458,7 @@ class Mezcla(config.Entity):
     METHODS_ThGP = ["Stiel-Thodos-Yorizane (1983)", "TRAPP", "Chung (1988)"]
     METHODS_ThL = ["Li (1976)", "Power Law"]
 
+    @profiled("Mezcla")
     def __init__(self, tipo=0, **kwargs):
         if tipo == 0:
             self._bool = False
@@ -3466,18 +3468,14 @@ class Mezcla(config.Entity):
 
         self.kwargs = Mezcla.kwargs.copy()
         self.kwargs.update(kwargs)
-        self.Config = config.getMainWindowConfig()
+        self.Config = config.getSnapshot()
         if self.kwargs["ids"]:
             self.ids = self.kwargs.get("ids")
         elif self.kwargs["customCmp"]:
             # Initialice ids variable to avoid acumulate in several instances
             self.ids = []
         else:
-            txt = self.Config.get("Components", "Components")
-            if isinstance(txt, str):
-                self.ids = eval(txt)
-            else:
-                self.ids = txt
+            self.ids = list(self.Config.Components.Components)
         self.componente = [Componente(int(i), **kwargs) for i in self.ids]
         for cmp in self.kwargs["customCmp"]:
             self.componente.append(cmp)
@@ -3491,10 +3489,10 @@ class Mezcla(config.Entity):
         caudalUnitarioMolar = self.kwargs.get("caudalUnitarioMolar", None)
 
         # normalizce fractions to unit
-        if fraccionMolar:
+        if fraccionMolar is not None and len(fraccionMolar):
             suma = float(sum(fraccionMolar))
             fraccionMolar = [x/suma for x in fraccionMolar]
-        if fraccionMasica:
+        if fraccionMasica is not None and len(fraccionMasica):
             suma = float(sum(fraccionMasica))
             fraccionMasica = [x/suma for x in fraccionMasica]
 
@@ -3537,11 +3535,10 @@ class Mezcla(config.Entity):
 #            del caudalUnitarioMasico[i]
 #            del caudalUnitarioMolar[i]
 
-        self.fraccion = [unidades.Dimensionless(f) for f in fraccionMolar]
+        self.fraccion = unidades.Dimensionless.array(fraccionMolar)
         self.caudalmasico = unidades.MassFlow(caudalMasico)
         self.caudalmolar = unidades.MolarFlow(caudalMolar)
-        self.fraccion_masica = [unidades.Dimensionless(f)
-                                for f in fraccionMasica]
+        self.fraccion_masica = unidades.Dimensionless.array(fraccionMasica)
         self.caudalunitariomasico = [unidades.MassFlow(q)
                                      for q in caudalUnitarioMasico]
         self.caudalunitariomolar = [unidades.MolarFlow(q)
@@ -3665,10 +3662,10 @@ class Mezcla(config.Entity):
         correlation"""
         method = self.kwargs["RhoLMix"]
         if method is None or method >= len(Mezcla.METHODS_RhoL):
-            method = self.Config.getint("Transport", "RhoLMix")
+            method = self.Config.Transport.RhoLMix
         Pcorr = self.kwargs["RhoLPMix"]
         if Pcorr is None or method >= len(Mezcla.METHODS_RhoLP):
-            Pcorr = self.Config.getint("Transport", "Corr_RhoLMix")
+            Pcorr = self.Config.Transport.Corr_RhoLMix
 
         # Calculate of low pressure viscosity
         if method == 0:
@@ -3725,10 +3722,10 @@ class Mezcla(config.Entity):
         """General method for calculate viscosity of gas"""
         method = self.kwargs["MuGMix"]
         if method is None or method >= len(Mezcla.METHODS_MuG):
-            method = self.Config.getint("Transport", "MuGMix")
+            method = self.Config.Transport.MuGMix
         Pcorr = self.kwargs["MuGPMix"]
         if Pcorr is None or method >= len(Mezcla.METHODS_MuGP):
-            Pcorr = self.Config.getint("Transport", "Corr_MuGMix")
+            Pcorr = self.Config.Transport.Corr_MuGMix
 
         # Calculate of low pressure viscosity
         if method == 0:
@@ -3811,7 +3808,7 @@ class Mezcla(config.Entity):
         """General method for calculate viscosity of Liquid"""
         method = self.kwargs["MuLMix"]
         if method is None or method >= len(Mezcla.METHODS_MuL):
-            method = self.Config.getint("Transport", "MuLMix")
+            method = self.Config.Transport.MuLMix
 
         if method == 0:
             mui = [cmp.Mu_Liquido(T, P) for cmp in self.componente]
@@ -3833,7 +3830,7 @@ class Mezcla(config.Entity):
         """General method for calculate thermal conductivity of liquid"""
         method = self.kwargs["ThCondLMix"]
         if method is None or method >= len(Mezcla.METHODS_ThL):
-            method = self.Config.getint("Transport", "ThCondLMix")
+            method = self.Config.Transport.ThCondLMix
 
         if method == 0:
             Vi = [1/cmp.RhoL(T, P) for cmp in self.componente]
@@ -3850,10 +3847,10 @@ class Mezcla(config.Entity):
         """General method for calculate thermal conductivity of gas"""
         method = self.kwargs["ThCondGMix"]
         if method is None or method >= len(Mezcla.METHODS_ThG):
-            method = self.Config.getint("Transport", "ThCondGMix")
+            method = self.Config.Transport.ThCondGMix
         Pcorr = self.kwargs["ThCondGPMix"]
         if Pcorr is None or method >= len(Mezcla.METHODS_ThGP):
-            Pcorr = self.Config.getint("Transport", "Corr_ThCondGMix")
+            Pcorr = self.Config.Transport.Corr_ThCondGMix
 
         # Calculate of low pressure viscosity
         if method == 0:
@@ -3913,8 +3910,8 @@ class Mezcla(config.Entity):
         mezcla = {}
         if self._bool:
             mezcla["ids"] = self.ids
-            mezcla["fraction"] = self.fraccion
-            mezcla["massFraction"] = self.fraccion_masica
+            mezcla["fraction"] = self.fraccion.tolist()
+            mezcla["massFraction"] = self.fraccion_masica.tolist()
             mezcla["massUnitFlow"] = self.caudalunitariomasico
             mezcla["molarUnitFlow"] = self.caudalunitariomolar
             mezcla["massFlow"] = self.caudalmasico
@@ -3937,10 +3934,9 @@ class Mezcla(config.Entity):
             self._bool = True
             self.ids = mezcla["ids"]
             self.componente = [Componente(int(i)) for i in self.ids]
-            self.fraccion = [
-                unidades.Dimensionless(x) for x in mezcla["fraction"]]
-            self.fraccion_masica = [
-                unidades.Dimensionless(x) for x in mezcla["massFraction"]]
+            self.fraccion = unidades.Dimensionless.array(mezcla["fraction"])
+            self.fraccion_masica = unidades.Dimensionless.array(
+                mezcla["massFraction"])
             self.caudalunitariomasico = [
                 unidades.MassFlow(x) for x in mezcla["massUnitFlow"]]
             self.caudalunitariomolar = [
@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the instrumentation of calculations, the spans around the
+calculation procedures record the wall time, the call count and counters like
+solver iterations or cache hits. The spans are aggregated in a tree by its
+call path and can be exported to chrome trace format, to view with
+chrome://tracing or perfetto.
+
+The instrumentation is disabled by default, it can be enabled with
+:func:`enable` or defining the PYCHEMQT_PROFILE environment variable, when
+it's disabled the instrumented procedures only check a global flag.
+
+    * :func:`profiled`: Decorator to instrument a procedure
+    * :class:`span`: Context manager to instrument a block of code
+    * :func:`count`: Add a counter to the running span
+    * :func:`tree`: Aggregated spans tree
+    * :func:`report`: Text report of spans tree
+    * :func:`exportChromeTrace`: Save spans in chrome trace json format
+'''
+
+
+from functools import wraps
+import json
+import os
+import threading
+from time import perf_counter
+
+
+# Maximum number of spans saved for the trace export, the tree aggregation
+# is always done
+MAX_EVENTS = 200000
+
+_enabled = bool(os.environ.get("PYCHEMQT_PROFILE", ""))
+_local = threading.local()
+_lock = threading.Lock()
+_events = []
+_tree = {}
+_origin = perf_counter()
+
+
+def enable(state=True):
+    """Enable or disable the instrumentation"""
+    global _enabled
+    _enabled = state
+
+
+def isEnabled():
+    return _enabled
+
+
+def clear():
+    """Delete all the spans saved"""
+    global _origin
+    with _lock:
+        del _events[:]
+        _tree.clear()
+        _origin = perf_counter()
+
+
+class span(object):
+    """Context manager to instrument a block of code
+
+    Parameters
+    ----------
+    name : str
+        Name of span
+
+    Examples
+    --------
+    >>> enable()
+    >>> clear()
+    >>> for i in range(3):
+    ...     with span("outer"):
+    ...         with span("inner"):
+    ...             count("iterations", 2)
+    >>> enable(False)
+    >>> nodes = tree()
+    >>> nodes["outer"]["calls"], nodes["outer"]["children"]["inner"]["calls"]
+    (3, 3)
+    >>> nodes["outer"]["children"]["inner"]["counters"]
+    {'iterations': 6}
+    """
+    __slots__ = ("name", "start", "counters", "path")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if not _enabled:
+            self.path = None
+            return self
+        stack = _stack()
+        if stack:
+            self.path = stack[-1].path + (self.name, )
+        else:
+            self.path = (self.name, )
+        self.counters = {}
+        stack.append(self)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.path is None:
+            return False
+        end = perf_counter()
+        _stack().pop()
+        _record(self, end)
+        return False
+
+
+def _stack():
+    """Stack of running spans in current thread"""
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def _record(sp, end):
+    """Save the finished span in tree and events list"""
+    duration = end-sp.start
+    with _lock:
+        children = _tree
+        for name in sp.path[:-1]:
+            children = children.setdefault(name, _node())["children"]
+        node = children.setdefault(sp.path[-1], _node())
+        node["calls"] += 1
+        node["time"] += duration
+        for key, value in sp.counters.items():
+            node["counters"][key] = node["counters"].get(key, 0) + value
+
+        if len(_events) < MAX_EVENTS:
+            _events.append((sp.name, sp.start, duration,
+                            threading.get_ident(), sp.counters))
+
+
+def _node():
+    return {"calls": 0, "time": 0., "counters": {}, "children": {}}
+
+
+def profiled(name=None):
+    """Decorator to instrument a procedure, the name of span by default is
+    the qualified name of procedure"""
+    def decorator(f):
+        label = name or f.__qualname__
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return f(*args, **kwargs)
+            with span(label):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """Add value to the counter name of the running span"""
+    if not _enabled:
+        return
+    stack = _stack()
+    if stack:
+        counters = stack[-1].counters
+        counters[name] = counters.get(name, 0) + value
+
+
+def tree():
+    """Return the aggregated spans tree, a dict with the span name as key
+    and a dict with the calls count, total time, counters and children
+    spans"""
+    with _lock:
+        return json.loads(json.dumps(_tree))
+
+
+def report(nodes=None, indent=0):
+    """Return a text report of spans tree, with total and self time"""
+    if nodes is None:
+        nodes = tree()
+        txt = "%-50s%10s%12s%12s  %s\n" % (
+            "Span", "Calls", "Total, s", "Self, s", "Counters")
+    else:
+        txt = ""
+    for name, node in sorted(nodes.items(), key=lambda x: -x[1]["time"]):
+        child = sum(n["time"] for n in node["children"].values())
+        counters = ", ".join(
+            "%s=%s" % (key, value) for key, value in node["counters"].items())
+        txt += "%-50s%10i%12.4f%12.4f  %s\n" % (
+            " "*indent+name, node["calls"], node["time"],
+            node["time"]-child, counters)
+        txt += report(node["children"], indent+2)
+    return txt
+
+
+def exportChromeTrace(fname):
+    """Save the spans in chrome trace event format"""
+    pid = os.getpid()
+    with _lock:
+        events = [{"name": name,
+                   "cat": "pychemqt",
+                   "ph": "X",
+                   "ts": (start-_origin)*1e6,
+                   "dur": duration*1e6,
+                   "pid": pid,
+                   "tid": tid,
+                   "args": counters}
+                  for name, start, duration, tid, counters in _events]
+    with open(fname, "w") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
@@ -22,8 +22,15 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 # Module for project definition (pdf of equipment, configuration and many more)
 ###############################################################################
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from copy import copy
+import json
+import logging
+from multiprocessing import get_context
 import os
 from configparser import ConfigParser
+from time import perf_counter
 
 # from pygraph.classes.graph import graph
 # from pygraph.algorithms.cycles import find_cycle
@@ -32,8 +39,11 @@ from configparser import ConfigParser
 # except:
    # from pygraph.readwrite.markup import write
 
-from lib.config import conf_dir
+from lib.config import conf_dir, getMainWindowConfig, setMainWindowConfig
 from lib.corriente import Corriente
+from lib.profiling import profiled
+from lib.recycle import Recycle
+from lib.thread import checkCancel
 from equipment import equipments
 from equipment.flux import Mixer
 
@@ -57,6 +67,21 @@ class Project(object):
         # self.graph = self.calGraph()
 
         self.downToStream = {}
+        self._graph = None
+        self.dirty = set()
+        self.changed = set()
+        self.timing = {}
+
+        # Recycle solver configuration, and convergence diagnostic of loops
+        self.recycle = Recycle()
+        self.convergence = {}
+
+        # Number of process to calculate in parallel the independent
+        # equipments, 0 to calculate all in current process, and callable to
+        # run while wait the process results, to keep the GUI responsive
+        self.workers = 0
+        self.idle = None
+        self._pool = None
 #        import gv
 #        for item in items:
 #           print gv.tailof(item)
@@ -86,13 +111,15 @@ class Project(object):
             return self.getStream(int(id[1:]))
 
     def setPFD(self, streams):
-        self.streams = streams
+        self.setStreams(streams)
 
     def setItems(self, items):
         self.items = items
+        self._graph = None
 
     def setStreams(self, streams):
         self.streams = streams
+        self._graph = None
 
     def setConfig(self, config):
         self.config = config
@@ -100,6 +127,7 @@ class Project(object):
     def addItem(self, id, obj):
         if id not in self.items:
             self.items[id] = obj
+            self._graph = None
             # self.graph.add_node(id)
 
     def setItem(self, id, obj):
@@ -129,6 +157,7 @@ class Project(object):
         stream = (up, down, ind_up, ind_down, obj)
         if id not in list(self.streams.keys()):
             self.streams[id] = stream
+            self._graph = None
             # self.graph.add_edge((up, down))
 
         if down[0] == "e":
@@ -140,9 +169,13 @@ class Project(object):
             eq(**kwargs)
 
     def setStream(self, id, obj):
+        self._setStream(id, obj)
+        self.run("s%i" % id)
+
+    def _setStream(self, id, obj):
+        """Replace the stream instance without running the project"""
         stream = self.streams[id]
         self.streams[id] = stream[0:4]+(obj, )
-        self.run("s%i" % id)
 
     def getStream(self, id):
         return self.streams[id][-1]
@@ -150,49 +183,438 @@ class Project(object):
     def getDownToStream(self, id):
         up, down, ind_up, ind_down, obj = self.streams[id]
         if down[0] == "e":
-            return self.getItem(int(down[1]))
+            return self.items[down]
         else:
             return obj
 
     def getDownToEquip(self, str):
-        lista = []
-        for key, value in self.streams.items():
-            if value[0] == str:
-                lista.append((key, value))
-        return lista
-
-    def run(self, name):
-        """Ejecuta el projecto de forma recursiva hasta que encuentra un equipo no resuelto"""
-        tipo = name[0]
-        ind = int(name[1])
-
-        if tipo == "i":
-            obj = self.getInput(ind)
-            if obj.status:
-                key, (up, down, ind_up, ind_down, oldobj) = self.getDownToEquip(name)[0]
-                self.setStream(key, obj)
-                self.run("s%i" % key)
-
-        elif tipo == "e":
-            obj = self.getItem(ind)
-            if obj.status:
-                for key, (up, down, ind_up, ind_down, oldobj) in self.getDownToEquip(name):
-                    self.setStream(key, obj.salida[ind_up])
-                    self.run("s%i" % key)
-
-        elif tipo == "s":
-            up, down, ind_up, ind_down, stream = self.streams[ind]
-            if stream.status:
-                if down[0] == "e":
-                    equip = self.items[down]
-                    if isinstance(equip, Mixer):
-                        kwargs = {"entrada": stream, "id_entrada": ind_down}
-                    else:
-                        kwargs = {equip.kwargsInput[ind_down]: stream}
-                    equip(**kwargs)
-                    self.run(down)
-                elif down[0] == "o":
-                    self.setOutput(int(down[1]), stream)
+        return [(key, self.streams[key]) for key in self.graph["down"][str]]
+
+    @property
+    def graph(self):
+        """Flowsheet as directed graph, a dict with:
+
+            * down: Dict with the id of output streams of each item
+            * up: Dict with the id of input streams of each item
+            * tears: List with id of streams torn to break recycle loops
+            * loops: List of recycle loops, each one as a tuple with the list
+              of items in loop and the list of its tear streams
+            * order: List with items in topological order, without tears
+            * level: Dict with the distance of each item to the flowsheet
+              inputs, the items in the same level are independent
+
+        The graph is cached and only rebuilt when the flowsheet topology
+        change"""
+        if self._graph is None:
+            down = {name: [] for name in self.items}
+            up = {name: [] for name in self.items}
+            for key in sorted(self.streams):
+                stream = self.streams[key]
+                down.setdefault(stream[0], []).append(key)
+                up.setdefault(stream[1], []).append(key)
+                down.setdefault(stream[1], [])
+                up.setdefault(stream[0], [])
+
+            loops = []
+            tears = []
+            for component in self._stronglyConnected(down):
+                loop_tears = self._tearStreams(component, down, up)
+                if loop_tears:
+                    loops.append((component, loop_tears))
+                    tears.extend(loop_tears)
+
+            order = self._topologicalOrder(down, up, tears)
+            for nodes, loop_tears in loops:
+                nodes.sort(key=order.index)
+
+            # Level of each item, the items in same level are independent
+            level = {}
+            for node in order:
+                level[node] = 1 + max(
+                    [level[self.streams[key][0]] for key in up[node]
+                     if key not in tears], default=-1)
+
+            self._graph = {"down": down, "up": up, "tears": tears,
+                           "loops": loops, "order": order, "level": level}
+        return self._graph
+
+    def _stronglyConnected(self, down):
+        """Tarjan algorithm, non recursive version, to find the strongly
+        connected components of flowsheet, each component with more than one
+        item is a recycle loop"""
+        index = {}
+        lowlink = {}
+        stack = []
+        onstack = set()
+        components = []
+        counter = 0
+        for root in sorted(down):
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, i = work.pop()
+                if i == 0:
+                    index[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    onstack.add(node)
+
+                children = [self.streams[key][1] for key in down[node]]
+                for j in range(i, len(children)):
+                    child = children[j]
+                    if child not in index:
+                        work.append((node, j+1))
+                        work.append((child, 0))
+                        break
+                    elif child in onstack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                else:
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            item = stack.pop()
+                            onstack.discard(item)
+                            component.append(item)
+                            if item == node:
+                                break
+                        components.append(component)
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+        return components
+
+    def _tearStreams(self, component, down, up):
+        """Choose the tear streams of a strongly connected component, the
+        back edges of a depth first search from the item fed from outside of
+        loop, so the tear streams are the recycle streams"""
+        nodes = set(component)
+        if len(nodes) == 1:
+            node = component[0]
+            return [key for key in down[node] if self.streams[key][1] == node]
+
+        def external(node):
+            return any(self.streams[key][0] not in nodes for key in up[node])
+        roots = sorted(component, key=lambda node: (not external(node), node))
+
+        tears = []
+        visited = set()
+        path = set()
+        work = [(roots[0], iter(down[roots[0]]))]
+        visited.add(roots[0])
+        path.add(roots[0])
+        while work:
+            node, keys = work[-1]
+            for key in keys:
+                child = self.streams[key][1]
+                if child not in nodes:
+                    continue
+                if child in path:
+                    tears.append(key)
+                elif child not in visited:
+                    visited.add(child)
+                    path.add(child)
+                    work.append((child, iter(down[child])))
+                    break
+            else:
+                work.pop()
+                path.discard(node)
+        return sorted(tears)
+
+    def _topologicalOrder(self, down, up, tears=()):
+        """Kahn algorithm to sort the flowsheet items so each item is after all
+        the items upstream, the tear streams are ignored"""
+        indegree = {name: len([key for key in streams if key not in tears])
+                    for name, streams in up.items()}
+        queue = deque(sorted(n for n, count in indegree.items() if not count))
+        order = []
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for key in down[name]:
+                if key in tears:
+                    continue
+                child = self.streams[key][1]
+                indegree[child] -= 1
+                if not indegree[child]:
+                    queue.append(child)
+        return order
+
+    def downstream(self, names):
+        """Return the set of items affected by a change in items of names"""
+        graph = self.graph
+        affected = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in affected:
+                continue
+            affected.add(name)
+            for key in graph["down"].get(name, []):
+                pending.append(self.streams[key][1])
+        return affected
+
+    def setDirty(self, name):
+        """Mark the item or stream name as changed, the next run recalculate
+        all the items downstream"""
+        if name[0] == "s":
+            self.dirty.add(self.streams[int(name[1:])][1])
+            self.changed.add(int(name[1:]))
+        else:
+            self.dirty.add(name)
+
+    @profiled("Project.run")
+    def run(self, name=None):
+        """Recalculate the project items affected by the changes, the changed
+        item name are added to dirty items before.
+
+        The items are calculated in topological order, so each equipment is
+        calculated only once with all its input updated. The equipment with
+        changed parameters is supposed calculated yet, so only its output
+        streams are propagated. The recycle loops are converged when reached
+        with the recycle solver, the convergence diagnostic of each loop are
+        saved in convergence dict. The calculation time of each equipment is
+        saved in timing dict.
+
+        With workers defined the independent equipments in the same level are
+        calculated in a process pool"""
+        if name is not None:
+            self.setDirty(name)
+        if not self.dirty:
+            return
+
+        # Streams with new instance, its downstream items must be updated
+        changed = set(self.changed)
+
+        graph = self.graph
+        loops = {}
+        for loop in graph["loops"]:
+            loops[loop[0][0]] = loop
+        inloop = set()
+        for nodes, tears in graph["loops"]:
+            inloop.update(nodes)
+
+        affected = self.downstream(self.dirty)
+        self.timing = {}
+        levels = {}
+        for node in graph["order"]:
+            if node in affected:
+                levels.setdefault(graph["level"][node], []).append(node)
+
+        for level in sorted(levels):
+            checkCancel()
+            parallel = []
+            for node in levels[level]:
+                if node in loops:
+                    self._solveLoop(loops[node], changed)
+                elif node in inloop:
+                    continue
+                elif self.workers and node[0] == "e" and any(
+                        key in changed for key in graph["up"][node]):
+                    parallel.append(node)
+                else:
+                    self._calculate(node, changed, node in self.dirty)
+
+            if len(parallel) > 1:
+                self._calculateParallel(parallel, changed)
+            else:
+                for node in parallel:
+                    self._calculate(node, changed, node in self.dirty)
+
+        self.dirty.clear()
+        self.changed.clear()
+
+    def solve(self):
+        """Recalculate the full project from its input streams, used when the
+        project is loaded without the GUI, so the saved state is not trusted"""
+        for up, down, ind_up, ind_down, obj in self.streams.values():
+            if up[0] == "i":
+                # Input items read from file are only defined as stream
+                if self.items.get(up) is None:
+                    self.items[up] = obj
+                self.setDirty(up)
+        self.run()
+
+    def _calculate(self, node, changed, force=False):
+        """Calculate a item with its changed inputs and propagate its outputs
+        streams, add the id of updated streams to changed"""
+        obj = self.items.get(node)
+        if node[0] == "e":
+            inputs = [key for key in self.graph["up"][node] if key in changed]
+            if inputs:
+                start = perf_counter()
+                self._feed(obj, inputs)
+                self.timing[node] = self.timing.get(node, 0) + \
+                    perf_counter()-start
+                logging.debug("Project: %s calculated in %0.4f s" % (
+                    node, perf_counter()-start))
+            elif not force:
+                return
+
+        elif node[0] == "o":
+            for key in self.graph["up"][node]:
+                if key in changed:
+                    self.items[node] = self.getStream(key)
+            return
+
+        self._propagate(node, changed)
+
+    def _propagate(self, node, changed):
+        """Set the output streams of a calculated item"""
+        obj = self.items.get(node)
+        if not obj or not obj.status:
+            return
+
+        for key in self.graph["down"][node]:
+            ind_up = self.streams[key][2]
+            if node[0] == "i":
+                self._setStream(key, obj)
+            elif node[0] == "e":
+                self._setStream(key, obj.salida[ind_up])
+            changed.add(key)
+
+    def _calculateParallel(self, nodes, changed):
+        """Calculate independent equipments in the process pool, the
+        equipments and streams are transfered in the json format used in
+        project files"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=get_context("spawn"))
+
+        current = getMainWindowConfig()
+        config = {section: dict(current.items(section, raw=True))
+                  for section in current.sections()}
+        futures = {}
+        for node in nodes:
+            equip = self.items[node]
+            data = {}
+            equip.writeToJSON(data)
+            inputs = []
+            for key in self.graph["up"][node]:
+                stream = self.getStream(key)
+                if stream.status:
+                    state = {}
+                    stream.writeToJSON(state)
+                    inputs.append((self.streams[key][3], json.dumps(state)))
+            task = {"config": config,
+                    "id": equipments.index(equip.__class__),
+                    "equipment": json.dumps(data),
+                    "inputs": inputs}
+            futures[node] = self._pool.submit(_calculateJSON, task)
+
+        pending = set(futures.values())
+        while pending:
+            done, pending = wait(pending, timeout=0.05)
+            if self.idle is not None:
+                self.idle()
+
+        for node in nodes:
+            result = futures[node].result()
+            equip = self.items[node]
+            equip.readFromJSON(json.loads(result["equipment"]))
+            inputs = [(self.streams[key][3], self.getStream(key))
+                      for key in self.graph["up"][node]]
+            equip.kwargs.update(_inputKwargs(equip, inputs))
+            equip.salida = []
+            for data in result["salida"]:
+                stream = Corriente()
+                stream.readFromJSON(json.loads(data))
+                equip.salida.append(stream)
+            self.timing[node] = result["time"]
+            logging.debug("Project: %s calculated in %0.4f s" % (
+                node, result["time"]))
+            self._propagate(node, changed)
+
+    def close(self):
+        """Shutdown the process pool if it's running"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _solveLoop(self, loop, changed):
+        """Converge a recycle loop iterating over its tear streams"""
+        nodes, tears = loop
+
+        # Initial estimation of tear streams, if it's undefined it's used the
+        # first defined input stream of loop
+        feeds = [key for node in nodes for key in self.graph["up"][node]
+                 if self.streams[key][0] not in nodes]
+        for key in tears:
+            if not self.getStream(key).status:
+                for feed in feeds:
+                    if self.getStream(feed).status:
+                        self._setStream(key, self.getStream(feed))
+                        break
+                else:
+                    logging.warning("Project: recycle %s without initial "
+                                    "estimation" % tears)
+                    return
+
+        base = {key: self.getStream(key) for key in tears}
+        size = {key: len(self._streamVars(base[key])) for key in tears}
+
+        def g(x):
+            loopchanged = changed | set(tears)
+            i = 0
+            for key in tears:
+                stream = self._varsStream(base[key], x[i:i+size[key]])
+                self._setStream(key, stream)
+                i += size[key]
+            for node in nodes:
+                self._calculate(node, loopchanged, force=True)
+            y = []
+            for key in tears:
+                y.extend(self._streamVars(self.getStream(key)))
+            return y
+
+        x0 = []
+        for key in tears:
+            x0.extend(self._streamVars(base[key]))
+
+        solver = copy(self.recycle)
+        # Temperature, pressure and component flows can't be negative
+        solver.solve(g, x0, lower=[0]*len(x0))
+        for node in nodes:
+            if node[0] == "e" and not self.items[node].status:
+                solver.status = 0
+                solver.msg = "%s not calculated: %s" % (
+                    node, self.items[node].msg)
+        self.convergence[tuple(tears)] = solver
+        logging.info("Project: recycle %s, %s" % (tears, solver.msg))
+
+        # Propagate the last iteration results outside the loop
+        changed.update(tears)
+        for node in nodes:
+            for key in self.graph["down"][node]:
+                if self.streams[key][1] not in nodes:
+                    changed.add(key)
+
+    @staticmethod
+    def _streamVars(stream):
+        """Tear variables of stream, temperature, pressure and component
+        molar flows"""
+        return [stream.T, stream.P] + list(stream.caudalunitariomolar)
+
+    @staticmethod
+    def _varsStream(stream, x):
+        """Stream with the tear variables x, keeping the other definition
+        parameters of stream"""
+        kw = {"T": x[0], "P": x[1], "x": None,
+              "ids": stream.ids,
+              "caudalUnitarioMolar": list(x[2:]),
+              "caudalUnitarioMasico": [],
+              "caudalMasico": 0, "caudalMolar": 0, "caudalVolumetrico": 0,
+              "fraccionMolar": [], "fraccionMasica": [], "mezcla": None}
+        kwargs = stream.kwargs.copy()
+        kwargs.update(kw)
+        return Corriente(**kwargs)
+
+    def _feed(self, equip, keys):
+        """Set the new input streams to equipment and calculate it once"""
+        inputs = [(self.streams[key][3], self.getStream(key)) for key in keys]
+        kwargs = _inputKwargs(equip, inputs)
+        if kwargs:
+            equip(**kwargs)
 
     def writeToJSON(self, data):
         """Write the project to a dictionary to save to file in json format"""
@@ -317,6 +739,64 @@ class Project(object):
         # return bool(cicle)
 
 
+def _inputKwargs(equip, inputs):
+    """Equipment kwargs to define the input streams
+
+    Parameters
+    ----------
+    equip : equipment
+        Equipment instance
+    inputs : list
+        List of (index, stream) with the equipment input index of each
+        stream, the streams without status are ignored
+    """
+    kwargs = {}
+    for ind_down, stream in inputs:
+        if not stream.status:
+            continue
+        if isinstance(equip, Mixer):
+            entrada = kwargs.get("entrada", equip.kwargs["entrada"][:])
+            while len(entrada) <= ind_down:
+                entrada.append(Corriente())
+            entrada[ind_down] = stream
+            kwargs["entrada"] = entrada
+        else:
+            kwargs[equip.kwargsInput[ind_down]] = stream
+    return kwargs
+
+
+def _calculateJSON(task):
+    """Calculate a equipment in a worker process, the equipment and its
+    input streams are defined in the json format of project files, return a
+    dict with the calculated equipment and its output streams in same format
+    and the calculation time"""
+    config = ConfigParser()
+    config.read_dict(task["config"])
+    setMainWindowConfig(config)
+
+    equip = equipments[task["id"]]()
+    equip.readFromJSON(json.loads(task["equipment"]))
+    inputs = []
+    for ind_down, data in task["inputs"]:
+        stream = Corriente()
+        stream.readFromJSON(json.loads(data))
+        inputs.append((ind_down, stream))
+
+    start = perf_counter()
+    equip(**_inputKwargs(equip, inputs))
+    time = perf_counter()-start
+
+    data = {}
+    equip.writeToJSON(data)
+    salida = []
+    if equip.status:
+        for stream in equip.salida:
+            state = {}
+            stream.writeToJSON(state)
+            salida.append(json.dumps(state))
+    return {"equipment": json.dumps(data), "salida": salida, "time": time}
+
+
 if __name__ == '__main__':
 
     from .corriente import Corriente
@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module to read and write the project files, two formats are supported:
+
+    * pcq: Plain json file with the project definition
+    * pcqz: Compressed zip file with a compact json index and the big numeric
+      list, like the isolines of plots, saved as binary numpy arrays
+
+The format is detected in load by the file content, so the old json files are
+loaded too.
+
+:func:`save`: Save project data to file
+:func:`load`: Load project data from file
+'''
+
+
+from io import BytesIO
+import json
+import zipfile
+
+from numpy import asarray
+from numpy import load as npload
+from numpy import save as npsave
+
+
+EXTENSIONS = ("pcq", "pcqz")
+
+# Minimum length of list to save as numpy array
+ARRAY_SIZE = 100
+
+INDEX = "project.json"
+ARRAY = "__array__"
+
+
+def save(data, fname, compressed=None):
+    """Save the project data to file
+
+    Parameters
+    ----------
+    data : dict
+        Project data in json format
+    fname : str
+        Path of file
+    compressed : bool
+        Save in compressed zip format, default is defined by the file
+        extension
+    """
+    if compressed is None:
+        compressed = fname.endswith(".pcqz")
+
+    if not compressed:
+        with open(fname, "w") as file:
+            json.dump(data, file, indent=4)
+        return
+
+    arrays = []
+    index = _pack(data, arrays)
+    with zipfile.ZipFile(fname, "w", zipfile.ZIP_DEFLATED) as file:
+        file.writestr(INDEX, json.dumps(index, separators=(",", ":")))
+
+        # Binary data don't compress well, so it's stored to load faster
+        for name, array in arrays:
+            stream = BytesIO()
+            npsave(stream, array, allow_pickle=False)
+            file.writestr(name, stream.getvalue(), zipfile.ZIP_STORED)
+
+
+def load(fname):
+    """Load the project data from file, in any supported format
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> data = {"stream": {"1": {"T": 300}}, "plot": [x/3 for x in range(500)]}
+    >>> fname = os.path.join(tempfile.mkdtemp(), "test.pcqz")
+    >>> save(data, fname)
+    >>> zipfile.is_zipfile(fname), load(fname) == data
+    (True, True)
+    >>> save(data, fname, compressed=False)
+    >>> zipfile.is_zipfile(fname), load(fname) == data
+    (False, True)
+    """
+    if not zipfile.is_zipfile(fname):
+        with open(fname, "r") as file:
+            return json.load(file)
+
+    with zipfile.ZipFile(fname, "r") as file:
+        index = json.loads(file.read(INDEX).decode("utf-8"))
+        return _unpack(index, file)
+
+
+def _numeric(value):
+    """Return the list as numpy array if it's a regular numeric list"""
+    if isinstance(value[0], bool):
+        return None
+    try:
+        array = asarray(value)
+    except ValueError:
+        return None
+    if array.dtype.kind in "iuf":
+        return array
+
+
+def _pack(value, arrays):
+    """Replace the big numeric list with a reference to a array file, the
+    arrays are added to arrays list as (name, array)"""
+    if isinstance(value, dict):
+        return {key: _pack(item, arrays) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        if len(value) >= ARRAY_SIZE:
+            array = _numeric(value)
+            if array is not None:
+                name = "arrays/%i.npy" % len(arrays)
+                arrays.append((name, array))
+                return {ARRAY: name}
+        return [_pack(item, arrays) for item in value]
+
+    return value
+
+
+def _unpack(value, file):
+    """Restore the arrays reference with its list value"""
+    if isinstance(value, dict):
+        if len(value) == 1 and ARRAY in value:
+            array = npload(BytesIO(file.read(value[ARRAY])))
+            return array.tolist()
+        return {key: _unpack(item, file) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_unpack(item, file) for item in value]
+
+    return value
@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the convergence procedures of recycle loops in flowsheet
+
+A recycle loop is solved tearing one or more streams, the tear stream
+variables are the unknown of a fixed point problem x = g(x), where g is the
+calculation of all the equipment in loop. Available methods:
+
+    * Direct substitution
+    * Wegstein bounded acceleration, [1]_
+    * Broyden quasi-Newton method, [2]_
+
+:class:`Recycle`: Convergence solver with iteration history
+'''
+
+
+from numpy import abs as npabs
+from numpy import array, asarray, dot, eye, maximum, outer, where
+
+from lib.profiling import count, profiled
+from lib.thread import checkCancel
+from lib.utilities import refDoc
+
+
+__doi__ = {
+    1:
+        {"autor": "Wegstein, J.H.",
+         "title": "Accelerating Convergence of Iterative Processes",
+         "ref": "Communications of the ACM 1(6) (1958) 9-13",
+         "doi": "10.1145/368861.368871"},
+    2:
+        {"autor": "Broyden, C.G.",
+         "title": "A Class of Methods for Solving Nonlinear Simultaneous "
+                  "Equations",
+         "ref": "Math. Comp. 19 (1965) 577-593",
+         "doi": "10.1090/S0025-5718-1965-0198670-6"},
+        }
+
+
+@refDoc(__doi__, [1, 2])
+class Recycle(object):
+    """Fixed point solver for the tear streams of a recycle loop
+
+    Parameters
+    ----------
+    method : int
+        Acceleration method:
+
+            * 0 - Direct substitution
+            * 1 - Bounded Wegstein
+            * 2 - Broyden
+
+    tol : float
+        Relative tolerance in tear variables
+    atol : float
+        Floor of variables in relative error, to avoid divide by zero
+    maxiter : int
+        Maximum number of iterations
+    qmin : float
+        Lower bound of Wegstein acceleration factor
+    qmax : float
+        Upper bound of Wegstein acceleration factor
+
+    Notes
+    -----
+    After solve the instance save the convergence diagnostic:
+
+        * status: 1 converged, 3 maximum iterations reached
+        * msg: Text with the convergence result
+        * iterations: Number of evaluation of loop
+        * err: Final maximum relative error
+        * history: List with the maximum relative error of each iteration
+
+    Examples
+    --------
+    Convergence of a loop with slow recycle response, the acceleration
+    methods reduce the iteration count
+
+    >>> g = lambda x: [0.9*x[0]+1, 0.8*x[1]+0.1*x[0]]
+    >>> for method in range(3):
+    ...     solver = Recycle(method=method, tol=1e-8)
+    ...     x = solver.solve(g, [1, 0])
+    ...     print("%0.6f %0.6f %i %i" % (x[0], x[1], solver.status,
+    ...                                  solver.iterations))
+    9.999761 4.999761 3 100
+    10.000000 5.000000 1 21
+    10.000000 5.000000 1 5
+    """
+    METHODS = ["Direct substitution", "Wegstein", "Broyden"]
+
+    def __init__(self, method=1, tol=1e-6, atol=1e-10, maxiter=100,
+                 qmin=-5., qmax=0.):
+        self.method = method
+        self.tol = tol
+        self.atol = atol
+        self.maxiter = maxiter
+        self.qmin = qmin
+        self.qmax = qmax
+
+        self.status = 0
+        self.msg = ""
+        self.iterations = 0
+        self.err = None
+        self.history = []
+
+    def error(self, x, y):
+        """Maximum relative difference between two iterations"""
+        scale = maximum(npabs(x), self.atol)
+        return float(max(npabs(y-x)/scale))
+
+    @profiled("Recycle")
+    def solve(self, g, x0, lower=None):
+        """Solve the fixed point problem x = g(x)
+
+        Parameters
+        ----------
+        g : callable
+            Function with the calculation of loop, it return the tear
+            variables calculated from the x tear variables estimation
+        x0 : list
+            Initial estimation of tear variables
+        lower : list, optional
+            Lower bound of tear variables, the accelerated steps out of bounds
+            are replaced by a direct substitution step
+
+        Returns
+        -------
+        x : array
+            Tear variables in last iteration
+
+        Examples
+        --------
+        The Broyden step from a far estimation cross the bound of a loop only
+        defined for positive values
+
+        >>> from math import exp, sqrt
+        >>> g = lambda x: [10*sqrt(x[0])*exp(-x[0]/5)]
+        >>> solver = Recycle(method=2, tol=1e-8)
+        >>> "%0.6f %i" % (solver.solve(g, [40], lower=[0])[0], solver.status)
+        '6.742025 1'
+        """
+        self.history = []
+        self.status = 0
+
+        x = array(x0, dtype=float)
+        y = asarray(g(x), dtype=float)
+        self.iterations = 1
+        xo = yo = H = None
+        while True:
+            self.err = self.error(x, y)
+            self.history.append(self.err)
+            if self.err < self.tol:
+                self.status = 1
+                self.msg = "Converged in %i iterations" % self.iterations
+                return y
+            if self.iterations >= self.maxiter:
+                self.status = 3
+                self.msg = "Maximum iterations reached, error %g" % self.err
+                return y
+
+            if self.method == 1 and xo is not None:
+                xn = self._wegstein(x, y, xo, yo)
+            elif self.method == 2:
+                if H is None:
+                    # Start as direct substitution, x1 = g(x0)
+                    H = -eye(len(x))
+                else:
+                    H = self._broyden(H, x-xo, (y-x)-(yo-xo))
+                xn = x-dot(H, y-x)
+            else:
+                xn = y
+
+            if lower is not None and (xn < lower).any():
+                xn = y
+
+            checkCancel()
+            xo, yo = x, y
+            x = xn
+            y = asarray(g(x), dtype=float)
+            self.iterations += 1
+            count("iterations")
+
+    def _wegstein(self, x, y, xo, yo):
+        """Bounded Wegstein acceleration of each variable"""
+        dx = x-xo
+        slope = where(dx != 0, (y-yo)/where(dx != 0, dx, 1), 0)
+        q = where(slope != 1, slope/where(slope != 1, slope-1, 1), 0)
+        q = q.clip(self.qmin, self.qmax)
+        return q*x+(1-q)*y
+
+    @staticmethod
+    def _broyden(H, dx, dF):
+        """Broyden good update of inverse jacobian of F(x) = g(x)-x"""
+        HdF = dot(H, dF)
+        den = dot(dx, HdF)
+        if den == 0:
+            return H
+        return H+outer(dx-HdF, dot(dx, H))/den
@@ -26,9 +26,13 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 #   -deleteElement: Delete Element with indice from custom Database
 #   -getElement: Get element from database
 #   -copyElement: Create a copy of element of indice in custom Database
+#   -SearchIndex: In-memory n-gram index for component search
+#   -search: Search-as-you-type in component database
+#   -refreshSearchIndex: Rebuild search index when custom database change
 ###############################################################################
 
 
+from collections import defaultdict
 import os
 import sqlite3
 
@@ -179,6 +183,7 @@ def inserElementsFromArray(name, lista):
         curs.execute(query+str(tuple(vals)))
     conn.commit()
     conn.close()
+    refreshSearchIndex()
 
 
 def updateElement(elemento, indice):
@@ -243,6 +248,7 @@ def updateElement(elemento, indice):
                          % (variable, valor, indice))
     conn.commit()
     conn.close()
+    refreshSearchIndex()
 
 
 def deleteElement(indice):
@@ -252,6 +258,7 @@ def deleteElement(indice):
     curs.execute("DELETE FROM compuestos WHERE id=%i" % indice)
     conn.commit()
     conn.close()
+    refreshSearchIndex()
 
 
 def getElement(indice):
@@ -278,3 +285,135 @@ def copyElement(indice):
                  str((1001+N_comp_Custom, ) + vals))
     conn.commit()
     conn.close()
+    refreshSearchIndex()
+
+
+class SearchIndex(object):
+    """In-memory n-gram index over name, formula, synonyms and CAS number of
+    components in database, to let search-as-you-type component filters
+
+    The index save for each substring up to three characters of searchable
+    fields the set of component with that substring, so a query is resolved
+    with the intersection of its trigrams sets and a final check of
+    candidates
+
+    Parameters
+    ----------
+    databases : list, optional
+        List of path of databases to index, default standard and custom
+        database
+
+    Examples
+    --------
+    >>> index = SearchIndex()
+    >>> index.search("methane")[0]
+    2
+    >>> index.search("74-82-8")
+    [2]
+    >>> index.search("cumene")
+    [71]
+    >>> index.search("zzzz")
+    []
+    """
+    FIELDS = "id, name, formula, Synonyms, alternateFormula, CAS"
+
+    def __init__(self, databases=None):
+        if databases is None:
+            databases = [databank_name]
+            if os.path.isfile(databank_Custom_name):
+                databases.append(databank_Custom_name)
+
+        self.entries = {}
+        self.grams = defaultdict(set)
+        for name in databases:
+            conn = sqlite3.connect(name)
+            query = "SELECT %s FROM compuestos" % self.FIELDS
+            for row in conn.execute(query):
+                self.add(row[0], [str(f) for f in row[1:] if f])
+            conn.close()
+
+    def add(self, id, fields):
+        """Add a component to index
+
+        Parameters
+        ----------
+        id : int
+            Index of component in database
+        fields : list
+            List of searchable strings, the first is the component name
+        """
+        fields = [field.lower() for field in fields]
+        self.entries[id] = fields
+        for field in fields:
+            for n in (1, 2, 3):
+                for i in range(len(field)-n+1):
+                    self.grams[field[i:i+n]].add(id)
+
+    def search(self, text, limit=None):
+        """Return the list of component index matching text, ranked with the
+        exact matches first, then the word prefix matches and at the end the
+        substring matches
+
+        Parameters
+        ----------
+        text : str
+            Text to search, case insensitive
+        limit : int, optional
+            Maximum number of results
+        """
+        text = text.strip().lower()
+        if not text:
+            return []
+
+        if len(text) <= 3:
+            candidates = self.grams.get(text, set())
+        else:
+            grams = [self.grams.get(text[i:i+3], set())
+                     for i in range(len(text)-2)]
+            grams.sort(key=len)
+            candidates = set.intersection(*grams)
+
+        ranked = []
+        for id in candidates:
+            rank = self._rank(self.entries[id], text)
+            if rank is not None:
+                ranked.append((rank, len(self.entries[id][0]), id))
+        ranked.sort()
+        return [id for rank, length, id in ranked[:limit]]
+
+    @staticmethod
+    def _rank(fields, text):
+        """Rank of match of text in component fields, lower is better,
+        None if there isn't match"""
+        rank = None
+        for field in fields:
+            if field == text:
+                return 0
+            elif field.startswith(text):
+                rank = 1
+            elif rank is None or rank > 2:
+                if " "+text in field or "-"+text in field:
+                    rank = 2
+                elif text in field:
+                    rank = 3
+        return rank
+
+
+_searchIndex = None
+
+
+def search(text, limit=None):
+    """Search text in name, formula, synonyms or CAS number of components
+    in database, return the ranked list of index of components. The search
+    index is built in first use"""
+    global _searchIndex
+    if _searchIndex is None:
+        _searchIndex = SearchIndex()
+    return _searchIndex.search(text, limit)
+
+
+def refreshSearchIndex():
+    """Discard the search index, it's necessary when the custom database
+    change, the index will be created again in next search"""
+    global _searchIndex
+    _searchIndex = None
@@ -21,45 +21,272 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 ###############################################################################
 # Library for work with thread in pychemqt for improve UI response
-#   - WaitforClick: Thread for draw stream in PFD
-#   - Evaluate: Thread to insolate entity calculation from gui, used in streams,
+#   - Executor: Job queue to run calculations in a thread or process pool
+#   - Job: Calculation submitted to executor, with result future and token
+#   - Token: Cooperative cancellation token and progress reporter
+#   - checkCancel, progress: Functions to use the token of running job in
+#       long calculation loops
+#   - WaitforClick: Click collector for draw stream in PFD
+#   - Evaluate: Isolate entity calculation from gui, used in streams,
 #       equipment, and project
 ###############################################################################
 
-from time import sleep
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import logging
+import threading
 
-from PyQt5.QtCore import QThread, QMutex
+from PyQt5.QtCore import QObject, pyqtSignal
 
 
-class WaitforClick(QThread):
-    """Thread used in PFD drawing to specified stream input and output or add
-    equipment.
+class Cancelled(Exception):
+    """Exception raised in a calculation when its job is cancelled"""
+    pass
+
+
+class Token(object):
+    """Cooperative cancellation token and progress reporter of a job, the
+    long calculation loops must check it to stop when the job is cancelled
+
+    Parameters
+    ----------
+    callback : callable
+        Function called with the progress report, with the arguments the
+        fraction of job done and a message
+
+    Examples
+    --------
+    >>> token = Token()
+    >>> token.check()
+    >>> token.cancel()
+    >>> token.cancelled
+    True
+    >>> token.check()
+    Traceback (most recent call last):
+    ...
+    lib.thread.Cancelled
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise Cancelled if the job is cancelled"""
+        if self._event.is_set():
+            raise Cancelled()
+
+    def progress(self, value, msg=""):
+        """Report the progress of job, and check the cancellation"""
+        self.check()
+        if self.callback is not None:
+            self.callback(value, msg)
+
+
+# Token of job running in each thread, the calculation out of executor use a
+# token never cancelled
+_local = threading.local()
+_default = Token()
+
+
+def currentToken():
+    """Return the token of job running in current thread"""
+    return getattr(_local, "token", _default)
+
+
+def checkCancel():
+    """Raise Cancelled if the job running in current thread is cancelled"""
+    currentToken().check()
+
+
+def progress(value, msg=""):
+    """Report the progress of job running in current thread"""
+    currentToken().progress(value, msg)
+
+
+def _run(token, func, args, kwargs):
+    """Run the job function in worker thread with its token"""
+    _local.token = token
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _local.token = _default
+
+
+class Job(object):
+    """Calculation submitted to a :class:`Executor`, with the future of
+    calculation result and the cancellation token"""
+    def __init__(self, future, token):
+        self.future = future
+        self.token = token
+
+    def cancel(self):
+        """Cancel the job, if it's waiting in queue it's never run, if it's
+        running it's stopped in the next token check"""
+        self.token.cancel()
+        self.future.cancel()
+
+    @property
+    def cancelled(self):
+        if self.future.cancelled():
+            return True
+        return self.future.done() and \
+            isinstance(self.future.exception(), Cancelled)
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def exception(self, timeout=None):
+        return self.future.exception(timeout)
+
+    def add_done_callback(self, fn):
+        """Call fn with the job as argument when it's finished"""
+        self.future.add_done_callback(lambda future: fn(self))
+
+
+class Executor(object):
+    """Job queue to run calculations in a pool
+
+    Parameters
+    ----------
+    workers : int
+        Number of calculations running at same time
+    process : bool
+        Use a process pool, the function and arguments must be picklable and
+        the jobs can be cancelled only before they start, without progress
+        report. The thread pool calculations can modify the python objects
+        like the entities in place
+
+    Examples
+    --------
+    >>> executor = Executor()
+    >>> job = executor.submit(sum, ([1, 2, 3], ))
+    >>> job.result()
+    6
+    >>> def loop(n):
+    ...     for i in range(n):
+    ...         progress(i/n)
+    >>> report = []
+    >>> job = executor.submit(
+    ...     loop, (4, ), progress=lambda x, msg: report.append(x))
+    >>> job.result(), report
+    (None, [0.0, 0.25, 0.5, 0.75])
+    >>> executor.shutdown()
+    """
+    def __init__(self, workers=1, process=False):
+        self.workers = workers
+        self.process = process
+        if process:
+            self._pool = ProcessPoolExecutor(workers)
+        else:
+            self._pool = ThreadPoolExecutor(workers)
+
+    def submit(self, func, args=(), kwargs=None, progress=None):
+        """Add a calculation to the queue
+
+        Parameters
+        ----------
+        func : callable
+            Calculation function
+        args : tuple
+            Positional arguments of func
+        kwargs : dict
+            Keyword arguments of func
+        progress : callable
+            Function to report the progress of job, it's called in the
+            worker thread
+
+        Returns
+        -------
+        job : Job
+            Job with the calculation future and cancellation token
+        """
+        if kwargs is None:
+            kwargs = {}
+        token = Token(progress)
+        if self.process:
+            future = self._pool.submit(func, *args, **kwargs)
+        else:
+            future = self._pool.submit(_run, token, func, args, kwargs)
+        return Job(future, token)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait)
+
+
+# Executor shared by all gui calculation, with a single worker the entities
+# calculations are serialized
+_executor = None
+
+
+def getExecutor():
+    """Return the executor shared by the gui calculations"""
+    global _executor
+    if _executor is None:
+        _executor = Executor()
+    return _executor
+
+
+class WaitforClick(QObject):
+    """Click collector used in PFD drawing to specified stream input and
+    output or add equipment, the scene report each click with check and the
+    finished signal is emitted when the clicks needed are reached.
     TODO: Use to customize stream drawing"""
+    finished = pyqtSignal()
+
     def __init__(self, num, parent=None):
         super(WaitforClick, self).__init__(parent)
-        self.setTerminationEnabled(True)
         self.num = num
+        self.active = False
+
+    def start(self):
+        self.active = True
 
-    def run(self):
-        while True:
-            sleep(0.1)
-            if len(self.parent().Pos) >= self.num:
-                break
+    def quit(self):
+        self.active = False
 
+    def check(self, clicks):
+        """Emit finished when the clicks count reach the needed number"""
+        if self.active and clicks >= self.num:
+            self.active = False
+            self.finished.emit()
 
-class Evaluate(QThread):
-    """Thread used to insolate calculation process in entities (stream, project
-    and equipment, so gui can response while calculation is in process"""
-    def __init__(self, parent=None):
+
+class Evaluate(QObject):
+    """Run the calculation of entities (stream, project and equipment) in the
+    shared executor, so gui can response while calculation is in process, the
+    signals are delivered in the gui thread"""
+    finished = pyqtSignal()
+    progress = pyqtSignal(float, str)
+
+    def __init__(self, parent=None, executor=None):
         super(Evaluate, self).__init__(parent)
-        self.mutex = QMutex()
+        self.executor = executor
+        self.job = None
 
     def start(self, entity, kwargs):
-        self.entity = entity
-        self.kwargs = kwargs
-        QThread.start(self)
-
-    def run(self):
-        self.mutex.lock()
-        self.entity(**self.kwargs)
-        self.mutex.unlock()
+        executor = self.executor or getExecutor()
+        self.job = executor.submit(
+            entity, kwargs=kwargs, progress=self.progress.emit)
+        self.job.add_done_callback(self._done)
+
+    def _done(self, job):
+        if not job.cancelled and job.exception() is not None:
+            error = job.exception()
+            logging.error("Calculation failed: %s" % error, exc_info=error)
+        self.finished.emit()
+
+    def isRunning(self):
+        return self.job is not None and not self.job.done()
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
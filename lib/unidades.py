@@ -94,17 +94,16 @@ The list of supported unit are:
 '''
 
 
-from configparser import ConfigParser
 import json
-import logging
 import os
 import time
 
+from numpy import add, array, asarray, ndarray, subtract
 from PyQt5.QtWidgets import QApplication
 from PyQt5 import QtCore
 import scipy.constants as k
 
-from lib.config import conf_dir, getMainWindowConfig
+from lib.config import conf_dir, getSnapshot
 from lib.utilities import representacion
 from tools.firstrun import getrates
 
@@ -175,6 +174,20 @@ def K2Re(K):
     return (K - 273.15) / 1.25
 
 
+class _Conversion(object):
+    """Descriptor to calculate the value of a unidad instance in a unit with
+    a proportional conversion rate, only evaluated when it's accessed"""
+    __slots__ = ("rate", )
+
+    def __init__(self, rate):
+        self.rate = rate
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        return float(obj) / self.rate
+
+
 class unidad(float):
     """
     Generic class to model units.
@@ -197,6 +210,8 @@ class unidad(float):
     __tooltip__ = []
     _magnitudes = []
     __units_set__ = []
+    magnitud = ""
+    code = ""
 
     def __init__(self, data, unit="", magnitud=""):
         """Constructor
@@ -212,30 +227,29 @@ class unidad(float):
 
         Notes
         -----
-        Non proportional magnitudes (Temperature, Pressure) must rewrite this
-        method
+        The conversion to base unit is done in __new__, the values in other
+        units are calculated on demand by the class conversion descriptors.
+        The instance only save magnitud and code when they differ from the
+        class defaults, so in the common case it has no instance dict at all
         """
-        if not magnitud:
-            magnitud = self.__class__.__name__
-        self.magnitud = magnitud
-
+        if magnitud and magnitud != self.__class__.__name__:
+            self.magnitud = magnitud
         if data is None:
-            self._data = 0
             self.code = "n/a"
-        else:
-            self._data = float(data)
-            self.code = ""
 
-        if unit == "conf":
-            Config = getMainWindowConfig()
-            unit = self.__units__[Config.getint('Units', magnitud)]
-        elif not unit:
-            unit = self.__units__[0]
-        self._data = self._getBaseValue(data, unit, magnitud)
-        for key in self.__class__.rates:
-            self.__setattr__(key, self._data / self.__class__.rates[key])
+    def __init_subclass__(cls, **kwargs):
+        """Define the class defaults and the conversion descriptors for units
+        in rates dict"""
+        super().__init_subclass__(**kwargs)
+        cls.magnitud = cls.__name__
+        for key, rate in cls.rates.items():
+            if key not in cls.__dict__:
+                setattr(cls, key, _Conversion(rate))
 
-        logging.debug("%s, %f" % (self.__class__.__name__, self._data))
+    @property
+    def _data(self):
+        """Value in base unit"""
+        return float(self)
 
     def __new__(cls, data, unit="", magnitud=""):
         """Constructor to let multiple parameter input in float"""
@@ -250,26 +264,28 @@ class unidad(float):
 
     @classmethod
     def _getBaseValue(cls, data, unit, magnitud):
-        """Convert input data to the base unit"""
+        """Convert input data to the base unit, data can be a float or a
+        numpy array"""
         if data is None:
             data = 0
-        else:
-            data = float(data)
 
         if unit == "conf":
-            Config = getMainWindowConfig()
-            unit = cls.__units__[Config.getint('Units', magnitud)]
+            unit = cls.__units__[getattr(getSnapshot().Units, magnitud)]
         elif not unit:
             unit = cls.__units__[0]
 
         try:
             conversion = cls.rates[unit]
         except KeyError:
-            raise ValueError(
-                QApplication.translate("pychemqt", "Wrong input code"))
+            raise ValueError("Wrong input code: %s" % unit)
 
-        data *= conversion
-        return data
+        return data * conversion
+
+    @classmethod
+    def array(cls, data, unit="", magnitud=""):
+        """Return a :class:`unidadArray` of this class with the data values,
+        the parameters have the same meaning than in constructor"""
+        return unidadArray(data, cls, unit, magnitud)
 
     def __add__(self, other):
         """Support for += operation"""
@@ -283,8 +299,7 @@ class unidad(float):
         """Using config file return the value in the configurated unit"""
         if not magnitud:
             magnitud = self.__class__.__name__
-        Config = getMainWindowConfig()
-        value = Config.getint('Units', magnitud)
+        value = getattr(getSnapshot().Units, magnitud)
         return self.__getattribute__(self.__units__[value])
 
     @classmethod
@@ -292,16 +307,14 @@ class unidad(float):
         """Using config file return the configurated unit text"""
         if not magnitud:
             magnitud = cls.__name__
-        Config = getMainWindowConfig()
-        return cls.__text__[Config.getint("Units", magnitud)]
+        return cls.__text__[getattr(getSnapshot().Units, magnitud)]
 
     @classmethod
     def func(cls, magnitud=""):
         """Return the configurated unit name for getattribute call"""
         if not magnitud:
             magnitud = cls.__name__
-        Config = getMainWindowConfig()
-        return cls.__units__[Config.getint("Units", magnitud)]
+        return cls.__units__[getattr(getSnapshot().Units, magnitud)]
 
     @classmethod
     def magnitudes(cls):
@@ -318,9 +331,7 @@ class unidad(float):
             magnitud = self.__class__.__name__
         if not unit:
             unit = self.func(magnitud)
-        Preferences = ConfigParser()
-        Preferences.read(conf_dir+"pychemqtrc")
-        kwargs = eval(Preferences.get("NumericFormat", magnitud))
+        kwargs = getattr(getSnapshot().preferences.NumericFormat, magnitud)
         value = self.__getattribute__(unit)
         return representacion(value, **kwargs)
 
@@ -339,11 +350,117 @@ class unidad(float):
     str = property(get_str)
 
 
+class unidadArray(ndarray):
+    """
+    Array of values of a same magnitude, numpy counterpart of :class:`unidad`
+    to store batch results without a unidad instance for each value.
+
+    The values are saved in base unit as a float ndarray, the conversion
+    to other units is vectorized and use the same attribute names than the
+    unidad class, including the non proportional units (Temperature, gauge
+    Pressure). Indexing a single element return the unidad scalar instance.
+    :class:`Dimensionless` is supported too, without unit conversion.
+    Add and substract keep the unit, any other operation return a plain
+    ndarray. A None value is saved as nan.
+
+    Parameters
+    ----------
+    data : array_like
+        Values of entity
+    unidad : unidad subclass
+        Class of the magnitude
+    unit : str
+        String with unit of data value input
+    magnitud : str, optional
+        Name of magnitud (i.e. PipeDiameter or Head for length unit)
+
+    Examples
+    --------
+    >>> P = Pressure.array([1, 2, 5], "atm")
+    >>> P.bar
+    array([1.01325, 2.0265 , 5.06625])
+    >>> "%0.4f %0.4f" % (P.psig[0], P[2].atm)
+    '0.0000 5.0000'
+    >>> T = Temperature.array([0, 100, None], "C")
+    >>> T.F
+    array([ 32., 212.,  nan])
+    >>> "%0.2f" % (T+10)[1].C
+    '110.00'
+    >>> type(T*2).__name__, type(T[0]).__name__
+    ('ndarray', 'Temperature')
+    >>> x = Dimensionless.array([0.25, 0.75])
+    >>> x.config(), type(x[1]).__name__
+    (array([0.25, 0.75]), 'Dimensionless')
+    """
+
+    def __new__(cls, data, unidad, unit="", magnitud=""):
+        if not magnitud:
+            magnitud = unidad.__name__
+        data = array(data, dtype=float)
+        data = unidad._getBaseValue(data, unit, magnitud)
+        obj = asarray(data, dtype=float).view(cls)
+        obj.unidad = unidad
+        obj.magnitud = magnitud
+        return obj
+
+    def __array_finalize__(self, obj):
+        self.unidad = getattr(obj, "unidad", unidad)
+        self.magnitud = getattr(obj, "magnitud", "")
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """Do the operation with plain arrays, and keep the class only in
+        add and substract operations"""
+        args = [i.view(ndarray) if isinstance(i, unidadArray) else i
+                for i in inputs]
+        if "out" in kwargs:
+            kwargs["out"] = tuple(
+                o.view(ndarray) if isinstance(o, unidadArray) else o
+                for o in kwargs["out"])
+        result = getattr(ufunc, method)(*args, **kwargs)
+        if method == "__call__" and ufunc in (add, subtract) and \
+                isinstance(result, ndarray) and result.ndim:
+            result = result.view(unidadArray)
+            result.unidad = self.unidad
+            result.magnitud = self.magnitud
+        return result
+
+    def __getitem__(self, index):
+        value = ndarray.__getitem__(self, index)
+        if isinstance(value, ndarray):
+            return value
+        if self.magnitud == self.unidad.__name__:
+            return self.unidad(value)
+        return self.unidad(value, magnitud=self.magnitud)
+
+    def __getattr__(self, name):
+        """Vectorized conversion to unit name"""
+        if name in self.unidad.__units__:
+            conversion = getattr(self.unidad, name, None)
+            if isinstance(conversion, _Conversion):
+                return self._data / conversion.rate
+            elif isinstance(conversion, property):
+                return conversion.fget(self)
+        raise AttributeError("'%s' object has no attribute '%s'" % (
+            self.__class__.__name__, name))
+
+    @property
+    def _data(self):
+        """Plain ndarray with values in base unit"""
+        return self.view(ndarray)
+
+    def config(self):
+        """Return the values in the configurated unit"""
+        if self.unidad is Dimensionless:
+            return self._data
+        return getattr(self, self.unidad.func(self.magnitud))
+
+
 class Dimensionless(float):
     """Dummy class to integrate dimensionless magnitudes
 with support for class unidad operations: txt, config. func."""
     __title__ = QApplication.translate("pychemqt", "Dimensionless")
     __text__ = []
+    __units__ = []
     _magnitudes = []
 
     def __init__(self, data, txt=""):
@@ -356,7 +473,6 @@ with support for class unidad operations: txt, config. func."""
         else:
             self._data = float(data)
             self.code = ""
-        logging.debug("%s, %f" % (self.__class__.__name__, self._data))
 
     def __new__(cls, data, txt=""):
         """Discard superfluous parameters for this class"""
@@ -364,6 +480,19 @@ with support for class unidad operations: txt, config. func."""
             data = 0
         return float.__new__(cls, data)
 
+    @classmethod
+    def _getBaseValue(cls, data, unit="", magnitud=""):
+        """Dimensionless values have not unit conversion"""
+        if data is None:
+            data = 0
+        return data
+
+    @classmethod
+    def array(cls, data, unit="", magnitud=""):
+        """Return a :class:`unidadArray` with the data values, discard
+        superfluous parameters for this class"""
+        return unidadArray(data, cls)
+
     @classmethod
     def text(cls):
         return ""
@@ -377,9 +506,7 @@ with support for class unidad operations: txt, config. func."""
 
     def format(self, unit):
         """Using config file return the unit value in desired numeric format"""
-        Preferences = ConfigParser()
-        Preferences.read(conf_dir+"pychemqtrc")
-        kwargs = eval(Preferences.get("NumericFormat", "Dimensionless"))
+        kwargs = getSnapshot().preferences.NumericFormat.Dimensionless
         return representacion(self, **kwargs)
 
     @property
@@ -400,43 +527,25 @@ class Temperature(unidad):
     __test__ = [{"input": {"value": 25, "unit": "C"},
                  "prop": {"K": 298.15, "C": 25, "F": 77}}]
 
-    def __init__(self, data, unit="K", magnitud=""):
-
-        if not magnitud:
-            magnitud = self.__class__.__name__
-        self.magnitud = magnitud
+    @property
+    def K(self):
+        return self._data
 
-        if data is None:
-            data = 0
-            self.code = "n/a"
-        else:
-            data = float(data)
-            self.code = ""
+    @property
+    def C(self):
+        return K2C(self._data)
 
-        if unit == "conf":
-            Config = getMainWindowConfig()
-            unit = self.__units__[Config.getint('Units', magnitud)]
+    @property
+    def F(self):
+        return K2F(self._data)
 
-        if unit == "K":
-            self._data = data
-        elif unit == "C":
-            self._data = C2K(data)
-        elif unit == "F":
-            self._data = F2K(data)
-        elif unit == "R":
-            self._data = R2K(data)
-        elif unit == "Re":
-            self._data = Re2K(data)
-        else:
-            raise ValueError(
-                QApplication.translate("pychemqt", "Wrong input code"))
+    @property
+    def R(self):
+        return K2R(self._data)
 
-        self.K = self._data
-        self.C = K2C(self._data)
-        self.F = K2F(self._data)
-        self.R = K2R(self._data)
-        self.Re = K2Re(self._data)
-        logging.debug("%s, %f" % (self.__class__.__name__, self._data))
+    @property
+    def Re(self):
+        return K2Re(self._data)
 
     @classmethod
     def _getBaseValue(cls, data, unit, magnitud):
@@ -446,8 +555,7 @@ class Temperature(unidad):
             magnitud = cls.__name__
 
         if unit == "conf":
-            Config = getMainWindowConfig()
-            unit = cls.__units__[Config.getint('Units', magnitud)]
+            unit = cls.__units__[getattr(getSnapshot().Units, magnitud)]
         elif not unit:
             unit = "K"
 
@@ -460,8 +568,7 @@ class Temperature(unidad):
         elif unit == "Re":
             data = Re2K(data)
         elif unit != "K":
-            raise ValueError(
-                QApplication.translate("pychemqt", "Wrong input code"))
+            raise ValueError("Wrong input code: %s" % unit)
 
         return data
 
@@ -1027,39 +1134,17 @@ class Pressure(unidad):
                  "prop": {"bar": 1.01325, "atm": 1, "psi": 14.6959487755,
                           "kgcm2g": 0}}]
 
-    def __init__(self, data, unit="Pa", magnitud=""):
-
-        if data is None:
-            data = 0
-            self.code = "n/a"
-        else:
-            self.code = ""
-            data = float(data)
-
-        if not magnitud:
-            magnitud = self.__class__.__name__
-        self.magnitud = magnitud
-
-        if unit == "conf":
-            Config = getMainWindowConfig()
-            unit = self.__units__[Config.getint('Units', magnitud)]
-
-        if unit == "barg":
-            self._data = data*k.bar+k.atm
-        elif unit == "psig":
-            self._data = data*k.psi+k.atm
-        elif unit == "kgcm2g":
-            self._data = data*k.g/k.centi**2+k.atm
-        else:
-            self._data = data * self.__class__.rates[unit]
+    @property
+    def barg(self):
+        return (self._data-k.atm)/k.bar
 
-        for key in self.__class__.rates:
-            self.__setattr__(key, self._data/self.__class__.rates[key])
+    @property
+    def psig(self):
+        return (self._data-k.atm)/k.psi
 
-        self.barg = (self.Pa-k.atm)/k.bar
-        self.psig = (self.Pa-k.atm)/k.psi
-        self.kgcm2g = (self.Pa-k.atm)*k.centi**2/k.g
-        logging.debug("%s, %f" % (self.__class__.__name__, self._data))
+    @property
+    def kgcm2g(self):
+        return (self._data-k.atm)*k.centi**2/k.g
 
     @classmethod
     def _getBaseValue(cls, data, unit, magnitud):
@@ -1069,8 +1154,7 @@ class Pressure(unidad):
             magnitud = cls.__name__
 
         if unit == "conf":
-            Config = getMainWindowConfig()
-            unit = cls.__units__[Config.getint('Units', magnitud)]
+            unit = cls.__units__[getattr(getSnapshot().Units, magnitud)]
         elif not unit:
             unit = "Pa"
 
@@ -1083,8 +1167,7 @@ class Pressure(unidad):
         elif unit in cls.rates:
             data = data * cls.rates[unit]
         else:
-            raise ValueError(
-                QApplication.translate("pychemqt", "Wrong input code"))
+            raise ValueError("Wrong input code: %s" % unit)
 
         return data
 
@@ -25,9 +25,12 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 #   - colors: Function to generate colors
 #   - exportTable; Save data to a file
 #   - formatLine: Return a matplotlib line formatting kw
+#   - hashable: Convert a value in a hashable key for memoization
+#   - LRUCache: Dict with bounded size discarding the least recently used
 ###############################################################################
 
 
+from collections import OrderedDict
 import os
 import random
 
@@ -341,6 +344,95 @@ def refDoc(doi, refs, tab=4):
     return decorator
 
 
+def hashable(value, digits=12):
+    """Convert a value in a hashable key, the float values are rounded to the
+    significant digits to avoid cache misses for numerical noise, the list and
+    dict are converted to tuples recursively and the objects with a stateKey
+    method use it
+
+    Examples
+    --------
+    >>> hashable([1/3, {"a": 2}]) == hashable((0.3333333333333333, {"a": 2}))
+    True
+    >>> hashable(1.0) == hashable(1.0+1e-15)
+    True
+    """
+    if hasattr(value, "stateKey"):
+        return value.stateKey()
+    if isinstance(value, (bool, int, str)) or value is None:
+        return value
+    if isinstance(value, float):
+        return float("%.*g" % (digits, value))
+    if isinstance(value, dict):
+        return tuple((key, hashable(value[key], digits))
+                     for key in sorted(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(hashable(x, digits) for x in value)
+    if hasattr(value, "tolist"):
+        return hashable(value.tolist(), digits)
+    try:
+        hash(value)
+    except TypeError:
+        # Unknown object, the identity avoid false hits
+        return (value.__class__.__name__, id(value))
+    return value
+
+
+class LRUCache(object):
+    """Dict like cache with bounded size, when it's full the least recently
+    used item is discarded
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of items saved, 0 to disable the cache
+
+    Examples
+    --------
+    >>> cache = LRUCache(2)
+    >>> cache.set("a", 1)
+    >>> cache.set("b", 2)
+    >>> cache.get("a")
+    1
+    >>> cache.set("c", 3)
+    >>> cache.get("b") is None, len(cache), cache.hits, cache.misses
+    (True, 2, 1, 1)
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Return the item saved with key, None if it's not available"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Save a item, discarding the oldest item if it's full"""
+        if not self.maxsize:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+
 if __name__ == "__main__":
     import math
     print(representacion(math.pi*1000, decimales=6, tol=5))
@@ -28,7 +28,7 @@ import json
 import os
 
 from PyQt5 import QtGui, QtWidgets
-from scipy import logspace, log10
+from numpy import array, logspace, log10
 from matplotlib.patches import ConnectionPatch
 from matplotlib import image
 
@@ -64,12 +64,13 @@ def calculate(config):
 
     # turbulent
     turb = {}
-    for e in eD:
-        turb[e] = [F(Rei, e)/x for Rei in Re_turbulent]
-        dat["turbulent"] = turb
+    f = F(Re_turbulent[:, None], array(eD))/x
+    for i, e in enumerate(eD):
+        turb[e] = f[:, i].tolist()
+    dat["turbulent"] = turb
 
     # Line to define the fully desarrolled turbulent flux
-    dat["fully"] = [(1/(1.14-2*log10(3500/R)))**2/x for R in Re_fully]
+    dat["fully"] = ((1/(1.14-2*log10(3500/Re_fully)))**2/x).tolist()
 
     # Save to file
     with open(conf_dir+"moody.dat", "w") as file:
@@ -375,7 +375,7 @@ splash.showMessage(msg + "...")
 logging.info(msg)
 
 if change:
-    config.Preferences = Preferences
+    config.setPreferences(Preferences)
 
 filename = []
 if config.Preferences.getboolean("General", "Load_Last_Project"):
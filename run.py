@@ -0,0 +1,320 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Headless batch runner of pychemqt projects, the project files are loaded and
+solved without the graphical interface, so it can be used in servers without
+display. The results of streams and equipments are saved in json or csv
+format, in SI units, and the calculation time of each equipment is reported.
+
+Usage::
+
+    python -m pychemqt.run project.pcq [project2.pcq ...] [-o dir] [-f csv]
+
+or running directly the script::
+
+    python run.py Samples/pump.pcq
+"""
+
+
+import argparse
+import csv
+import json
+import logging
+import os
+import shutil
+import sys
+
+
+# Add pychemqt folder to python path and define the pychemqt environment
+# before import any internal library
+path = os.path.dirname(os.path.realpath(__file__))
+if path not in sys.path:
+    sys.path.insert(0, path)
+os.environ["pychemqt"] = path + os.sep
+conf_dir = os.path.expanduser("~") + os.sep + ".pychemqt" + os.sep
+
+
+def checkConfig():
+    """Create the configuration files with the default values if they don't
+    exist, the same procedure done at first run of the graphical interface
+    without the network access"""
+    from tools import firstrun
+
+    if not os.path.isdir(conf_dir):
+        os.mkdir(conf_dir)
+    if not os.path.isfile(conf_dir + "pychemqtrc"):
+        firstrun.Preferences().write(open(conf_dir + "pychemqtrc", "w"))
+    if not os.path.isfile(conf_dir + "pychemqtrc_temporal"):
+        firstrun.config().write(open(conf_dir + "pychemqtrc_temporal", "w"))
+    if not os.path.isfile(conf_dir + "CostIndex.dat"):
+        orig = os.path.join(os.environ["pychemqt"], "dat", "costindex.dat")
+        with open(orig) as cost_index:
+            lista = cost_index.readlines()[-1].split(" ")
+        with open(conf_dir + "CostIndex.dat", "w") as archivo:
+            for data in lista:
+                archivo.write(data.replace(os.linesep, "") + os.linesep)
+    if not os.path.isfile(conf_dir + "moneda.dat"):
+        orig = os.path.join(os.environ["pychemqt"], "dat", "moneda.dat")
+        shutil.copy(orig, conf_dir + "moneda.dat")
+    if not os.path.isfile(conf_dir + "databank.db"):
+        firstrun.createDatabase(conf_dir + "databank.db")
+
+
+def checkDependences():
+    """Define the availability of optional dependences in environment"""
+    from tools.dependences import optional_modules
+    for module, use in optional_modules:
+        try:
+            __import__(module)
+            os.environ[module] = "True"
+        except ImportError:
+            os.environ[module] = ""
+
+
+def load(fname):
+    """Load a project file and return the :class:`lib.project.Project`
+    instance, with its configuration as the current configuration"""
+    from lib import projectFile
+    from lib.config import setMainWindowConfig
+    from lib.project import Project
+
+    data = projectFile.load(fname)
+
+    # Check availability of optional dependences necessary for the file
+    missing = [dep for dep in data.get("external_dependences", [])
+               if os.environ.get(dep) != "True"]
+    if missing:
+        raise ImportError("%s: This project require %s" % (
+            fname, ", ".join(missing)))
+
+    project = Project()
+    project.readFromJSON(data)
+    setMainWindowConfig(project.config)
+    return project
+
+
+def _value(entity, attr, unit):
+    """Return the value of a entity property in a serializable format"""
+    try:
+        value = entity._prop(attr)
+    except (AttributeError, KeyError, IndexError):
+        # Property unavailable for the entity state
+        return None
+    except Exception as er:
+        # Error in the property calculation, reported but the project
+        # results are saved anyway
+        logging.warning("%s %s property failed, %s: %s" % (
+            entity.__class__.__name__, attr, er.__class__.__name__, er))
+        logging.debug("Traceback", exc_info=True)
+        return None
+
+    if isinstance(value, list):
+        return [_value_scalar(v) for v in value]
+    return _value_scalar(value)
+
+
+def _value_scalar(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value is None:
+        return None
+    return str(value)
+
+
+def results(project):
+    """Return a dict with the results of project, the streams and equipments
+    properties in SI units and the calculation time of equipments"""
+    streams = {}
+    for id in sorted(project.streams):
+        up, down, ind_up, ind_down, stream = project.streams[id]
+        data = {"up": up, "down": down, "status": stream.status}
+        if stream.status:
+            for name, attr, unit in stream.propertiesNames():
+                if unit is not str:
+                    data[attr] = _value(stream, attr, unit)
+            data["components"] = [cmp.name for cmp in stream.componente]
+        streams[id] = data
+
+    equipments = {}
+    for name in sorted(project.items):
+        if name[0] != "e":
+            continue
+        equip = project.items[name]
+        data = {"class": equip.__class__.__name__,
+                "status": equip.status,
+                "msg": equip.msg}
+        if equip.status:
+            for title, attr, unit in equip.propertiesEquipment():
+                key = attr if isinstance(attr, str) else attr[1]
+                data[key] = _value(equip, attr, unit)
+        equipments[name] = data
+
+    return {"streams": streams,
+            "equipment": equipments,
+            "timing": project.timing,
+            "convergence": {"-".join("s%i" % s for s in tears): {
+                "status": solver.status,
+                "iterations": solver.iterations,
+                "error": solver.err}
+                for tears, solver in project.convergence.items()}}
+
+
+def writeJSON(data, fname):
+    """Save the project results in a json file"""
+    with open(fname, "w") as file:
+        json.dump(data, file, indent=4)
+    return [fname]
+
+
+def writeCSV(data, fname):
+    """Save the project results in two csv file, one with the streams
+    properties, a row for each stream, and other with the equipment
+    properties, a row for each property"""
+    root = os.path.splitext(fname)[0]
+
+    streamFile = root + "_streams.csv"
+    columns = []
+    for stream in data["streams"].values():
+        for key, value in stream.items():
+            if key not in columns and not isinstance(value, list):
+                columns.append(key)
+    components = []
+    for stream in data["streams"].values():
+        for cmp in stream.get("components", []):
+            if cmp not in components:
+                components.append(cmp)
+
+    with open(streamFile, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id"] + columns + ["x_%s" % c for c in components])
+        for id, stream in data["streams"].items():
+            row = [id] + [stream.get(key) for key in columns]
+            fraction = dict(zip(stream.get("components", []),
+                                stream.get("fraccion") or []))
+            row += [fraction.get(cmp) for cmp in components]
+            writer.writerow(row)
+
+    equipFile = root + "_equipment.csv"
+    with open(equipFile, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "class", "property", "value"])
+        for id, equip in data["equipment"].items():
+            for key, value in equip.items():
+                if key == "class":
+                    continue
+                if isinstance(value, list):
+                    for i, val in enumerate(value):
+                        writer.writerow(
+                            [id, equip["class"], "%s[%i]" % (key, i), val])
+                else:
+                    writer.writerow([id, equip["class"], key, value])
+            writer.writerow([id, equip["class"], "time",
+                             data["timing"].get(id)])
+    return [streamFile, equipFile]
+
+
+def reportTiming(project, stream=sys.stdout):
+    """Print the calculation time of each equipment of project"""
+    total = 0
+    stream.write("%-8s%-24s%12s\n" % ("Item", "Equipment", "Time, s"))
+    for name, time in sorted(project.timing.items(), key=lambda x: -x[1]):
+        equip = project.items[name]
+        stream.write("%-8s%-24s%12.4f\n" % (
+            name, equip.__class__.__name__, time))
+        total += time
+    stream.write("%-32s%12.4f\n" % ("Total", total))
+
+
+def main(argv=None):
+    desc = """Solve pychemqt project files without graphical interface and \
+save the results of streams and equipments."""
+    parser = argparse.ArgumentParser(prog="pychemqt.run", description=desc)
+    parser.add_argument("projectFile", nargs="+",
+                        help="pychemqt project files to solve")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Directory to save the results, default the "
+                        "project file directory")
+    parser.add_argument("-f", "--format", choices=("json", "csv"),
+                        default="json", help="Format of results files")
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help="Number of process to calculate the independent "
+                        "equipments in parallel")
+    parser.add_argument("-l", "--log", dest="loglevel", default="WARNING",
+                        help="Set level of report in console")
+    parser.add_argument("-p", "--profile", default=None, metavar="FILE",
+                        help="Profile the calculations, print the spans "
+                        "report and save the chrome trace in FILE")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, args.loglevel.upper()),
+                        format="%(levelname)s: %(message)s")
+
+    checkDependences()
+    checkConfig()
+
+    from lib import profiling
+    if args.profile:
+        profiling.enable()
+
+    write = {"json": writeJSON, "csv": writeCSV}[args.format]
+    error = 0
+    for fname in args.projectFile:
+        try:
+            project = load(fname)
+        except Exception as e:
+            logging.error("Failed to load %s, %s: %s" % (
+                fname, e.__class__.__name__, e))
+            logging.debug("Traceback", exc_info=True)
+            error = 1
+            continue
+
+        project.workers = args.workers
+        output = args.output or os.path.dirname(os.path.abspath(fname))
+        root = os.path.splitext(os.path.basename(fname))[0]
+        try:
+            project.solve()
+            files = write(results(project),
+                          os.path.join(output, root + "." + args.format))
+        except Exception as e:
+            # A failed project mustn't abort the rest of files
+            logging.error("Failed to solve %s, %s: %s" % (
+                fname, e.__class__.__name__, e))
+            logging.debug("Traceback", exc_info=True)
+            print("%s failed" % fname)
+            error = 1
+            continue
+        finally:
+            project.close()
+
+        print("%s solved, results saved in %s" % (fname, ", ".join(files)))
+        reportTiming(project)
+        for name, equip in sorted(project.items.items()):
+            if name[0] == "e" and not equip.status:
+                logging.warning("%s %s: %s" % (
+                    name, equip.__class__.__name__, equip.msg))
+
+    if args.profile:
+        print(profiling.report())
+        profiling.exportChromeTrace(args.profile)
+    return error
+
+
+if __name__ == "__main__":
+    sys.exit(main())
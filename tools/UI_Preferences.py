@@ -84,6 +84,20 @@ class ConfGeneral(QtWidgets.QDialog):
         self.showTrayIcon = QtWidgets.QCheckBox(
             QtWidgets.QApplication.translate("pychemqt", "Show tray icon"))
         layout.addWidget(self.showTrayIcon, 6, 1)
+        lyt = QtWidgets.QHBoxLayout()
+        lyt.addWidget(QtWidgets.QLabel(QtWidgets.QApplication.translate(
+            "pychemqt", "Parallel calculation processes:")))
+        self.workers = QtWidgets.QSpinBox()
+        self.workers.setRange(0, os.cpu_count() or 1)
+        self.workers.setToolTip(QtWidgets.QApplication.translate(
+            "pychemqt", "Number of processes used to calculate the "
+            "independent equipments of project, 0 to calculate all in the "
+            "main process"))
+        lyt.addWidget(self.workers)
+        lyt.addItem(QtWidgets.QSpacerItem(
+            10, 0, QtWidgets.QSizePolicy.Expanding,
+            QtWidgets.QSizePolicy.Fixed))
+        layout.addLayout(lyt, 7, 1, 1, 4)
 
         layout.addItem(QtWidgets.QSpacerItem(
             10, 0, QtWidgets.QSizePolicy.Expanding,
@@ -98,6 +112,8 @@ class ConfGeneral(QtWidgets.QDialog):
             self.loadLastProject.setChecked(
                 config.getboolean("General", 'Load_Last_Project'))
             self.showTrayIcon.setChecked(config.getboolean("General", 'Tray'))
+            self.workers.setValue(config.getint(
+                "General", 'Workers', fallback=max((os.cpu_count() or 1)-1, 0)))
 
     def value(self, config):
         if not config.has_section("General"):
@@ -110,6 +126,7 @@ class ConfGeneral(QtWidgets.QDialog):
         config.set("General", "Load_Last_Project",
                    str(self.loadLastProject.isChecked()))
         config.set("General", "Tray", str(self.showTrayIcon.isChecked()))
+        config.set("General", "Workers", str(self.workers.value()))
         return config
 
 
@@ -228,6 +228,7 @@ class plugin(object):
         if dlg.exec_():
             Config = dlg.value(Config)
             Config.write(open(config.conf_dir+"pychemqtrc", "w"))
+            config.setPreferences(Config)
 
     def showSaturation(self):
         """Show dialog to define input for a two-phase saturation table"""
@@ -35,7 +35,7 @@ import os
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
-from lib import meos, mEoS, unidades
+from lib import meos, mEoS, sql, unidades
 from tools.codeEditor import SimplePythonEditor
 from UI.widgets import Entrada_con_unidades, Tabla, QLabelMath
 
@@ -52,6 +52,13 @@ class Ui_ChooseFluid(QtWidgets.QDialog):
             QtWidgets.QApplication.translate("pychemqt", "Choose fluid"))
         layout = QtWidgets.QGridLayout(self)
 
+        self.searchText = QtWidgets.QLineEdit()
+        self.searchText.setPlaceholderText(
+            QtWidgets.QApplication.translate("pychemqt", "Search"))
+        self.searchText.setToolTip(QtWidgets.QApplication.translate(
+            "pychemqt", "Search by name, formula, synonym or CAS number"))
+        self.searchText.textChanged.connect(self.search)
+        layout.addWidget(self.searchText, 0, 1)
         self.lista = QtWidgets.QListWidget()
         self.fill(mEoS.__all__)
         self.lista.itemDoubleClicked.connect(self.accept)
@@ -155,12 +162,25 @@ class Ui_ChooseFluid(QtWidgets.QDialog):
         """Fill list fluid
         compounds: List of MEoS subclasses to show"""
         self.lista.clear()
+        self.compounds = compounds
         for fluido in compounds:
             txt = fluido.name
             if fluido.synonym:
                 txt += " ("+fluido.synonym+")"
             self.lista.addItem(txt)
 
+    def search(self, text):
+        """Show only the fluids matching text, searched in the pychemqt
+        database index, the rows are hidden so the row index of fluids don't
+        change"""
+        text = text.strip().lower()
+        ids = set(sql.search(text))
+        for row, fluido in enumerate(self.compounds):
+            # The fluids without compound in database use its list name
+            match = not text or fluido.id in ids or \
+                text in self.lista.item(row).text().lower()
+            self.lista.setRowHidden(row, not match)
+
     def filter(self):
         """Show dialog with group compound filter"""
         dlg = DialogFilterFluid(self.all, self.group)
@@ -179,6 +199,7 @@ class Ui_ChooseFluid(QtWidgets.QDialog):
                     else:
                         self.group.append(False)
             self.fill(cmps)
+            self.search(self.searchText.text())
 
     def info(self):
         """Show info dialog for fluid"""
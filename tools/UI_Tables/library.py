@@ -28,8 +28,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ###############################################################################
 
 
-from configparser import ConfigParser
-
 from lib import mEoS, coolProp, refProp, config, unidades
 from lib.thermo import ThermoAdvanced
 
@@ -42,16 +40,7 @@ UNITS = ThermoAdvanced.propertiesUnit()
 def getMethod(pref=None):
     """Return the thermo method name to use"""
     if pref is None:
-        pref = ConfigParser()
-        pref.read(config.conf_dir + "pychemqtrc")
-
-        if pref.getboolean("MEOS", 'coolprop') and \
-                pref.getboolean("MEOS", 'refprop'):
-            txt = "refprop"
-        elif pref.getboolean("MEOS", 'coolprop'):
-            txt = "coolprop"
-        else:
-            txt = "meos"
+        txt = config.getSnapshot().method
     else:
         txt = pref["method"]
     return txt
@@ -232,7 +221,8 @@ def _getData(fluid, keys, phase=True, unit=None, table=True):
     return fila
 
 def saveProperties(fluids):
-    """Save all available properties of a list of fluids"""
+    """Save all available properties of a list of fluids, the properties
+    with unit are saved as unidadArray"""
     dat = {}
     for key in ThermoAdvanced.propertiesKey():
         prop = []
@@ -242,5 +232,20 @@ def saveProperties(fluids):
                 if key in ["fi", "f"]:
                     p = p[0]
                 prop.append(p)
-        dat[key] = prop
+        dat[key] = _array(prop)
     return dat
+
+
+def _array(values):
+    """Return the values as unidadArray if all are of the same unidad class,
+    the undefined values are saved as nan, any other list is returned
+    unchanged"""
+    cls = {type(p) for p in values if p is not None}
+    if len(cls) != 1:
+        return values
+    cls = cls.pop()
+    if not issubclass(cls, (unidades.unidad, unidades.Dimensionless)):
+        return values
+
+    magnitud = getattr([p for p in values if p is not None][0], "magnitud", "")
+    return cls.array(values, magnitud=magnitud)
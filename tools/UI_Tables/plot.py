@@ -43,16 +43,19 @@ from math import log10, atan, pi
 import os
 
 from PyQt5 import QtCore, QtGui, QtWidgets
-from numpy import concatenate, linspace, logspace, transpose, log, nan
+from numpy import (concatenate, linspace, logspace, transpose, log, nan,
+                   ndarray)
 from matplotlib.font_manager import FontProperties
 
 from lib import meos, mEoS, unidades, plot, config
 from lib.thermo import ThermoAdvanced
+from lib.thread import checkCancel
 from lib.utilities import formatLine
 from UI.widgets import (Entrada_con_unidades, createAction, LineStyleCombo,
                         MarkerCombo, ColorSelector, InputFont)
 
-from .library import calcPoint, getLimit, getClassFluid, getMethod
+from .library import (calcPoint, getLimit, getClassFluid, getMethod,
+                      saveProperties)
 
 
 # FIXME: Plot3D save/load support
@@ -230,7 +233,7 @@ class PlotMEoS(QtWidgets.QWidget):
     def _saveData(self, data):
         """Save changes in data to file"""
         with open(config.conf_dir+self.filename, 'w') as file:
-            json.dump(data, file)
+            json.dump(data, file, default=_jsonArray)
 
     def click(self, event):
         """Update input and graph annotate when mouse click over chart"""
@@ -1093,20 +1096,7 @@ class EditPlot(QtWidgets.QDialog):
                 name = "Isoquality"
                 unit = unidades.Dimensionless
 
-            line = {value: {}}
-            for x in ThermoAdvanced.propertiesKey():
-                dat_propiedad = []
-                for fluido in fluidos:
-                    num = fluido.__getattribute__(x)
-                    if isinstance(num, str):
-                        dat_propiedad.append(num)
-                    elif x in ("f", "fi"):
-                        dat_propiedad.append(num[0])
-                    elif num is not None:
-                        dat_propiedad.append(num._data)
-                    else:
-                        dat_propiedad.append(None)
-                line[value][x] = dat_propiedad
+            line = {value: saveProperties(fluidos)}
 
             style = getLineFormat(config.Preferences, name)
             functionx = _getunitTransform(self.plotMEoS.x)
@@ -1444,6 +1434,7 @@ def calcIsoline(f, conf, var, fix, vvar, vfix, ini, step, end, total, bar):
     rhoo = 0
     To = 0
     for Ti in vvar:
+        checkCancel()
         kwargs = {var: Ti, fix: vfix, "rho0": rhoo, "T0": To}
         print(kwargs)
         fluido = calcPoint(f, conf, **kwargs)
@@ -1719,6 +1710,15 @@ def _getunitTransform(eje):
         # return lambda val: val*factor if val is not None else nan
 
 
+def _jsonArray(obj):
+    """Serialize the unidadArray of calculated properties to json as a list
+    of values in base unit"""
+    if isinstance(obj, ndarray):
+        return obj.tolist()
+    raise TypeError("Object of type %s is not JSON serializable" %
+                    obj.__class__.__name__)
+
+
 if __name__ == "__main__":
     import sys
     app = QtWidgets.QApplication(sys.argv)
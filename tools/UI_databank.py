@@ -124,17 +124,14 @@ class UI_databank_widget(QtWidgets.QWidget):
     def buscar(self):
         """Search str at database"""
         self.indice = 0
-        texto = "%"+self.Busqueda.text()+"%"
-        query = "select * from compuestos where "
-        query += "name LIKE '%s' or formula LIKE '%s'" % (texto, texto)
-        sql.databank.execute(query)
-        self.correctos = []
-        for i in sql.databank:
-            self.correctos.append(i[0])
-        self.BaseDatos.setCurrentCell(self.correctos[self.indice]-1, 0)
+        self.correctos = sql.search(self.Busqueda.text())
+        if self.correctos:
+            self.BaseDatos.setCurrentCell(self.correctos[self.indice]-1, 0)
 
     def Next(self):
         """Show next coincidence with search string"""
+        if not self.correctos:
+            return
         if self.indice < len(self.correctos)-1:
             self.indice += 1
         else:
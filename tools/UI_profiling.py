@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Dialog to show the calculation profiling spans tree
+###############################################################################
+
+from PyQt5 import QtCore, QtWidgets
+
+from lib import profiling
+
+
+class Profiling(QtWidgets.QDialog):
+    """Dialog to show the profiling spans tree of calculations"""
+    def __init__(self, parent=None):
+        super(Profiling, self).__init__(parent)
+        self.setWindowTitle(
+            QtWidgets.QApplication.translate("pychemqt", "Profiling"))
+        layout = QtWidgets.QGridLayout(self)
+
+        self.enabled = QtWidgets.QCheckBox(
+            QtWidgets.QApplication.translate("pychemqt", "Enable profiling"))
+        self.enabled.setChecked(profiling.isEnabled())
+        self.enabled.toggled.connect(profiling.enable)
+        layout.addWidget(self.enabled, 1, 1)
+
+        self.tree = QtWidgets.QTreeWidget()
+        header = QtWidgets.QTreeWidgetItem([
+            QtWidgets.QApplication.translate("pychemqt", "Span"),
+            QtWidgets.QApplication.translate("pychemqt", "Calls"),
+            QtWidgets.QApplication.translate("pychemqt", "Total, s"),
+            QtWidgets.QApplication.translate("pychemqt", "Self, s"),
+            QtWidgets.QApplication.translate("pychemqt", "Counters")])
+        self.tree.setHeaderItem(header)
+        layout.addWidget(self.tree, 2, 1, 1, 4)
+
+        refresh = QtWidgets.QPushButton(
+            QtWidgets.QApplication.translate("pychemqt", "Refresh"))
+        refresh.clicked.connect(self.fill)
+        layout.addWidget(refresh, 3, 1)
+        clear = QtWidgets.QPushButton(
+            QtWidgets.QApplication.translate("pychemqt", "Clear"))
+        clear.clicked.connect(self.clear)
+        layout.addWidget(clear, 3, 2)
+        export = QtWidgets.QPushButton(
+            QtWidgets.QApplication.translate("pychemqt", "Export trace"))
+        export.clicked.connect(self.export)
+        layout.addWidget(export, 3, 3)
+        button = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        button.rejected.connect(self.reject)
+        layout.addWidget(button, 3, 4)
+
+        self.fill()
+        self.resize(750, 450)
+
+    def fill(self):
+        self.tree.clear()
+        self._addNodes(self.tree.invisibleRootItem(), profiling.tree())
+        self.tree.expandAll()
+        for column in range(5):
+            self.tree.resizeColumnToContents(column)
+
+    def _addNodes(self, parent, nodes):
+        for name, node in sorted(nodes.items(), key=lambda x: -x[1]["time"]):
+            child = sum(n["time"] for n in node["children"].values())
+            counters = ", ".join("%s=%s" % (key, value)
+                                 for key, value in node["counters"].items())
+            item = QtWidgets.QTreeWidgetItem(parent, [
+                name, str(node["calls"]), "%0.4f" % node["time"],
+                "%0.4f" % (node["time"]-child), counters])
+            for column in range(1, 4):
+                item.setTextAlignment(column, QtCore.Qt.AlignRight)
+            self._addNodes(item, node["children"])
+
+    def clear(self):
+        profiling.clear()
+        self.fill()
+
+    def export(self):
+        fname = QtWidgets.QFileDialog.getSaveFileName(
+            self, QtWidgets.QApplication.translate(
+                "pychemqt", "Export chrome trace"),
+            "./trace.json", "Chrome trace (*.json)")[0]
+        if fname:
+            profiling.exportChromeTrace(fname)
+
+
+if __name__ == "__main__":
+    import sys
+    app = QtWidgets.QApplication(sys.argv)
+    dialog = Profiling()
+    dialog.show()
+    sys.exit(app.exec_())
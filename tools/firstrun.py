@@ -28,6 +28,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 from configparser import ConfigParser
 import json
+import os
 import sqlite3
 import sys
 import urllib.request
@@ -126,6 +127,7 @@ def Preferences():
     config.set("General", "Recent_Files", "10")
     config.set("General", "Load_Last_Project", "True")
     config.set("General", "Tray", "False")
+    config.set("General", "Workers", str(max((os.cpu_count() or 1)-1, 0)))
 
     # PFD
     config.add_section("PFD")